@@ -1,4 +1,3 @@
-```python
 """add article management
 
 Revision ID: add_article_management
@@ -37,4 +36,3 @@ def downgrade() -> None:
         batch_op.drop_column('published_at')
         batch_op.drop_column('institution_id')
         batch_op.drop_column('psychologist_id')
-```
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""add article full-text search index
+
+Revision ID: add_article_search
+Revises: add_city_keys
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from api.core.text import search_text
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_article_search'
+down_revision: Union[str, None] = 'add_city_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('title', 'preview', 'content', 'tags')
+
+def upgrade() -> None:
+    op.create_table(
+        'article_search_docs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('article_id')
+    )
+    op.execute(
+        'CREATE VIRTUAL TABLE article_search USING fts5('
+        + ', '.join(SEARCH_COLUMNS)
+        + ", tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+    # Backfill the stemmed text, doc ids in article order
+    conn = op.get_bind()
+    result = conn.execute(sa.text(
+        'SELECT id, status, ' + ', '.join(SEARCH_COLUMNS) + ' FROM articles ORDER BY id'
+    ))
+    for doc_id, (article_id, status, *values) in enumerate(result.all(), start=1):
+        row = dict(zip(SEARCH_COLUMNS, values))
+        tags = json.loads(row['tags']) if isinstance(row['tags'], str) else row['tags']
+        row['tags'] = ' '.join(tags or [])
+        row = {name: search_text(text) for name, text in row.items()}
+        conn.execute(
+            sa.text(
+                'INSERT INTO article_search_docs (id, article_id, status) '
+                'VALUES (:id, :article_id, :status)'
+            ),
+            {'id': doc_id, 'article_id': article_id, 'status': status}
+        )
+        conn.execute(
+            sa.text(
+                'INSERT INTO article_search (rowid, ' + ', '.join(SEARCH_COLUMNS) + ') '
+                'VALUES (:rowid, ' + ', '.join(f':{name}' for name in SEARCH_COLUMNS) + ')'
+            ),
+            {'rowid': doc_id, **row}
+        )
+
+def downgrade() -> None:
+    op.execute('DROP TABLE article_search')
+    op.drop_table('article_search_docs')
\ No newline at end of file
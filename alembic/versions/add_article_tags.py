@@ -0,0 +1,56 @@
+"""add article tag side table and published tag counts
+
+Revision ID: add_article_tags
+Revises: add_institution_counts
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_article_tags'
+down_revision: Union[str, None] = 'add_institution_counts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    tags = op.create_table(
+        'article_tags',
+        sa.Column('value', sa.String(), nullable=False),
+        sa.Column('article_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('value', 'article_id')
+    )
+    op.create_index(op.f('ix_article_tags_article_id'), 'article_tags', ['article_id'], unique=False)
+    op.create_table(
+        'article_tag_counts',
+        sa.Column('value', sa.String(), nullable=False),
+        sa.Column('published', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('value')
+    )
+    op.create_index(
+        'ix_article_tag_counts_published_value', 'article_tag_counts', ['published', 'value'], unique=False
+    )
+
+    # Backfill from the JSON lists, then count the published articles per tag
+    conn = op.get_bind()
+    for article_id, raw in conn.execute(sa.text('SELECT id, tags FROM articles')):
+        values = json.loads(raw) if isinstance(raw, str) else raw
+        rows = [{'value': value, 'article_id': article_id} for value in dict.fromkeys(values or [])]
+        if rows:
+            op.bulk_insert(tags, rows)
+    op.execute(
+        'INSERT INTO article_tag_counts (value, published) '
+        'SELECT article_tags.value, COUNT(*) FROM article_tags '
+        'JOIN articles ON articles.id = article_tags.article_id '
+        "WHERE articles.status = 'published' GROUP BY article_tags.value"
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_article_tag_counts_published_value', table_name='article_tag_counts')
+    op.drop_table('article_tag_counts')
+    op.drop_index(op.f('ix_article_tags_article_id'), table_name='article_tags')
+    op.drop_table('article_tags')
@@ -0,0 +1,45 @@
+"""add indexed city keys to psychologists and institutions
+
+Revision ID: add_city_keys
+Revises: add_psychologist_terms
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from api.core.text import city_from_address, normalize_city
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_city_keys'
+down_revision: Union[str, None] = 'add_psychologist_terms'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('psychologists', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('city_key', sa.String(), nullable=True))
+    with op.batch_alter_table('institutions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('city_key', sa.String(), nullable=True))
+
+    # Backfill in Python: SQLite's lower() only folds ASCII
+    conn = op.get_bind()
+    update = sa.text('UPDATE psychologists SET city_key = :key WHERE id = :id')
+    for psychologist_id, raw in conn.execute(sa.text('SELECT id, location FROM psychologists')).all():
+        location = json.loads(raw) if isinstance(raw, str) else raw
+        conn.execute(update, {'id': psychologist_id, 'key': normalize_city((location or {}).get('city'))})
+    update = sa.text('UPDATE institutions SET city_key = :key WHERE id = :id')
+    for institution_id, address in conn.execute(sa.text('SELECT id, address FROM institutions')).all():
+        conn.execute(update, {'id': institution_id, 'key': normalize_city(city_from_address(address))})
+
+    op.create_index('ix_psychologists_city_key_rating_id', 'psychologists', ['city_key', 'rating', 'id'], unique=False)
+    op.create_index('ix_institutions_city_key_id', 'institutions', ['city_key', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_institutions_city_key_id', table_name='institutions')
+    op.drop_index('ix_psychologists_city_key_rating_id', table_name='psychologists')
+    with op.batch_alter_table('institutions', schema=None) as batch_op:
+        batch_op.drop_column('city_key')
+    with op.batch_alter_table('psychologists', schema=None) as batch_op:
+        batch_op.drop_column('city_key')
\ No newline at end of file
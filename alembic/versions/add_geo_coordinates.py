@@ -0,0 +1,37 @@
+"""add coordinates and geohash indexes to psychologists and institutions
+
+Revision ID: add_geo_coordinates
+Revises: add_article_tags
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_geo_coordinates'
+down_revision: Union[str, None] = 'add_article_tags'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('psychologists', 'institutions')
+
+def upgrade() -> None:
+    # No backfill: no row has coordinates yet
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('geohash', sa.String(), nullable=True))
+        op.create_index(
+            f'ix_{table}_geohash', table, ['geohash', 'latitude', 'longitude', 'id'], unique=False
+        )
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_geohash', table_name=table)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('geohash')
+            batch_op.drop_column('longitude')
+            batch_op.drop_column('latitude')
@@ -0,0 +1,27 @@
+"""backfill institution psychologists_count
+
+Revision ID: add_institution_counts
+Revises: add_reviews
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_institution_counts'
+down_revision: Union[str, None] = 'add_reviews'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # From here on the psychologist hooks keep the column in step
+    op.execute(
+        'UPDATE institutions SET psychologists_count = ('
+        'SELECT COUNT(*) FROM psychologists '
+        'WHERE psychologists.institution_id = institutions.id)'
+    )
+
+def downgrade() -> None:
+    # The counts stay; they were only stale before
+    pass
\ No newline at end of file
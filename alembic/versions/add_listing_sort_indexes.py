@@ -0,0 +1,44 @@
+"""add listing sort indexes
+
+Revision ID: add_listing_sort_indexes
+Revises: add_article_management
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_listing_sort_indexes'
+down_revision: Union[str, None] = 'add_article_management'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Keyset pagination cannot seek past NULL sort keys
+    op.execute("UPDATE psychologists SET rating = 0 WHERE rating IS NULL")
+    # Written in SQLAlchemy's SQLite datetime format, so that cursors built
+    # from these values compare equal to the stored text
+    op.execute(
+        "UPDATE articles SET published_at = "
+        "strftime('%Y-%m-%d %H:%M:%S.000000', COALESCE(created_at, 'now')) "
+        "WHERE status = 'published' AND published_at IS NULL"
+    )
+    with op.batch_alter_table('psychologists') as batch_op:
+        batch_op.alter_column(
+            'rating', existing_type=sa.Float(), nullable=False, server_default='0'
+        )
+
+    op.create_index('ix_psychologists_rating_id', 'psychologists', ['rating', 'id'])
+    op.create_index(
+        'ix_articles_status_published_at_id', 'articles', ['status', 'published_at', 'id']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_status_published_at_id', table_name='articles')
+    op.drop_index('ix_psychologists_rating_id', table_name='psychologists')
+    with op.batch_alter_table('psychologists') as batch_op:
+        batch_op.alter_column(
+            'rating', existing_type=sa.Float(), nullable=True, server_default=None
+        )
\ No newline at end of file
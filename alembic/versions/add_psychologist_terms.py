@@ -0,0 +1,52 @@
+"""add psychologist specialization and language side tables
+
+Revision ID: add_psychologist_terms
+Revises: add_listing_sort_indexes
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_psychologist_terms'
+down_revision: Union[str, None] = 'add_listing_sort_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TERM_TABLES = {
+    'specializations': 'psychologist_specializations',
+    'languages': 'psychologist_languages',
+}
+
+def upgrade() -> None:
+    tables = {}
+    for column, name in TERM_TABLES.items():
+        tables[column] = op.create_table(
+            name,
+            sa.Column('value', sa.String(), nullable=False),
+            sa.Column('psychologist_id', sa.String(), nullable=False),
+            sa.ForeignKeyConstraint(['psychologist_id'], ['psychologists.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('value', 'psychologist_id')
+        )
+        op.create_index(op.f(f'ix_{name}_psychologist_id'), name, ['psychologist_id'], unique=False)
+
+    # Backfill from the JSON lists
+    conn = op.get_bind()
+    result = conn.execute(sa.text('SELECT id, specializations, languages FROM psychologists'))
+    for psychologist_id, *lists in result:
+        for column, raw in zip(TERM_TABLES, lists):
+            values = json.loads(raw) if isinstance(raw, str) else raw
+            rows = [
+                {'value': value, 'psychologist_id': psychologist_id}
+                for value in dict.fromkeys(values or [])
+            ]
+            if rows:
+                op.bulk_insert(tables[column], rows)
+
+def downgrade() -> None:
+    for name in TERM_TABLES.values():
+        op.drop_index(op.f(f'ix_{name}_psychologist_id'), table_name=name)
+        op.drop_table(name)
\ No newline at end of file
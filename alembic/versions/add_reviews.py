@@ -0,0 +1,61 @@
+"""add reviews and psychologist rating aggregates
+
+Revision ID: add_reviews
+Revises: add_article_search
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_reviews'
+down_revision: Union[str, None] = 'add_article_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HISTOGRAM = ('ratings_1', 'ratings_2', 'ratings_3', 'ratings_4', 'ratings_5')
+
+def upgrade() -> None:
+    op.create_table('reviews',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('author_id', sa.String(), nullable=False),
+    sa.Column('psychologist_id', sa.String(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('reply', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['psychologist_id'], ['psychologists.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+    op.create_index(op.f('ix_reviews_author_id'), 'reviews', ['author_id'], unique=False)
+    op.create_index('ix_reviews_psychologist_id_created_at_id', 'reviews', ['psychologist_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('psychologists', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        for name in HISTOGRAM:
+            batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    # There are no reviews yet, so carry the existing ratings over as a sum
+    # that new reviews are averaged into. The histogram starts empty;
+    # `python -m api.db.reconcile ratings` replaces all of it with figures
+    # computed from the reviews.
+    op.execute(
+        'UPDATE psychologists SET rating_sum = '
+        'CAST(ROUND(COALESCE(rating, 0) * COALESCE(reviews_count, 0)) AS INTEGER)'
+    )
+
+def downgrade() -> None:
+    with op.batch_alter_table('psychologists', schema=None) as batch_op:
+        for name in reversed(HISTOGRAM):
+            batch_op.drop_column(name)
+        batch_op.drop_column('rating_sum')
+    op.drop_index('ix_reviews_psychologist_id_created_at_id', table_name='reviews')
+    op.drop_index(op.f('ix_reviews_author_id'), table_name='reviews')
+    op.drop_index(op.f('ix_reviews_id'), table_name='reviews')
+    op.drop_table('reviews')
\ No newline at end of file
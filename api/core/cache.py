@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from api.core.config import settings
+
+class TTLCache:
+    """
+    Thread-safe LRU mapping whose entries expire `ttl` seconds after they are
+    stored. Holds at most `maxsize` entries, evicting the least recently used.
+    With `weigh`, `maxsize` bounds the total weight of the values instead
+    (bytes, say) and a value heavier than that is not stored at all.
+
+    invalidate() bumps a generation counter. A reader that misses takes
+    `generation` before going to the database and passes it to set(), which
+    drops the value if an invalidation happened in between, so a write that
+    commits during the read can't be overwritten with the stale row.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._weigh = weigh
+        self._lock = threading.Lock()
+        # key -> (expires at, value, weight)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._weight = 0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, *, generation: Optional[int] = None) -> None:
+        weight = self._weigh(value) if self._weigh else 1
+        if self.ttl <= 0 or weight > self.maxsize:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._pop(key)
+            self._data[key] = (self._clock() + self.ttl, value, weight)
+            self._weight += weight
+            while self._weight > self.maxsize:
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def _pop(self, key: Hashable) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._weight -= entry[2]
+        return True
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._pop(key):
+                    self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches; a scan, so keep it off hot paths."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._data if predicate(key)]:
+                self._pop(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "weight": self._weight,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+# Authenticated users by token subject (email), as column snapshots; see
+# UserQuery.snapshot(). Per process: other workers catch up within the TTL.
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+# Rendered public catalog listings, see api.core.middleware.ResponseCacheMiddleware.
+# Keys start with the catalog name; CRUD writes drop a catalog with
+# invalidate_catalogs(). Bounded by body bytes.
+response_cache = TTLCache(
+    settings.RESPONSE_CACHE_BYTES,
+    settings.RESPONSE_CACHE_TTL,
+    weigh=lambda response: len(response.body),
+)
+
+def invalidate_catalogs(*catalogs: str) -> None:
+    if catalogs:
+        response_cache.invalidate_where(lambda key: key[0] in catalogs)
\ No newline at end of file
@@ -9,9 +9,69 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "development_secret_key"  # Change in production
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+
+    # Password hashing, see api.core.security.password_hasher. Raising
+    # BCRYPT_ROUNDS rehashes each user's password on their next login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4  # threads; 0 hashes on the event loop
+    PASSWORD_HASH_QUEUE: int = 64  # waiting hashes before logins get a 503
     
     # Database
     DATABASE_URL: str = "sqlite:///./cbt_marketplace.db"
+
+    # Connection pool, shared by the sync and async engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 3600  # seconds; -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite PRAGMA profile applied to every connection, see
+    # api.db.engine.STORAGE_PROFILES: default, dev, prod-read-heavy, bulk-load
+    DB_STORAGE_PROFILE: str = "dev"
+
+    # In-process cache of authenticated users, see api.core.cache.user_cache;
+    # a TTL or size of 0 disables it
+    USER_CACHE_TTL: float = 60.0  # seconds
+    USER_CACHE_SIZE: int = 10000
+
+    # Rendered public listings (psychologists, institutions, articles), see
+    # api.core.cache.response_cache; a TTL or budget of 0 disables it
+    RESPONSE_CACHE_TTL: float = 300.0  # seconds
+    RESPONSE_CACHE_BYTES: int = 32 * 1024 * 1024
+
+    # Seconds between writes of buffered article view counts, see
+    # api.db.counters.article_views
+    VIEW_FLUSH_INTERVAL: float = 5.0
+
+    # Serve the public read routes through the precompiled serializers of
+    # api.schemas.serializers and orjson instead of validating each row into
+    # its response_model; the documented responses stay the same
+    FAST_JSON: bool = False
+
+    # Seconds between full rebuilds of the in-memory catalog facet counts,
+    # see api.db.facets; writes made in this process are applied as they
+    # commit, the rebuild catches those of other processes
+    FACETS_REBUILD_INTERVAL: float = 300.0
+
+    # Dev/test: report each request's SQL statements in an X-DB-Queries
+    # header and log a warning for a statement run QUERY_REPEAT_THRESHOLD
+    # times or more in one request (a likely N+1), see api.db.query_stats
+    QUERY_STATS: bool = False
+    QUERY_REPEAT_THRESHOLD: int = 5
+
+    # Sampling profiler, see api.core.profiler. Admins profile a request by
+    # sending X-Profile: 1; PROFILE_SAMPLE_RATE profiles that share of all
+    # requests. Profiles go to PROFILE_DIR, the newest PROFILE_KEEP are kept
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL: float = 0.001  # seconds between samples
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_KEEP: int = 200
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        # Same database, served through the aiosqlite driver
+        return self.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
     
     class Config:
         case_sensitive = True
@@ -1,13 +1,13 @@
-from typing import Generator, Optional
+from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.config import settings
-from api.core.security import verify_password
-from api.db.session import SessionLocal
+from api.crud import async_crud_user
+from api.db.session import SessionLocal, get_async_db
 from api.models.user import User
 from api.schemas.token import TokenPayload
 
@@ -20,10 +20,12 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+async def user_from_token(db: AsyncSession, token: str) -> User:
+    """
+    The active user a bearer token was issued to. Raises the HTTPException
+    to answer with otherwise: 403 for a token that doesn't verify, 404 for
+    an unknown user, 400 for an inactive one.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=["HS256"]
@@ -34,7 +36,15 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud_user.get_by_email(db, email=token_data.sub)
+    user = await async_crud_user.get_by_email_cached(db, email=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    return await user_from_token(db, token)
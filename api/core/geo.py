@@ -0,0 +1,141 @@
+"""
+Coordinates, geohashes and distances for the near= catalog searches.
+
+A geohash interleaves the bits of longitude and latitude and writes them in
+base 32, so the points of one grid cell share a prefix and sort together:
+an index on the geohash column turns "points in this cell" into a range
+scan. cover() picks the cells around a search circle; distances use the
+equirectangular approximation, plain arithmetic that SQLite evaluates
+without math functions and that is exact enough at city scale.
+"""
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # of latitude, everywhere
+
+# Stored precision: cells of about 5 x 5 m
+GEOHASH_PRECISION = 9
+
+# near= searches: radius when none is given, and the largest accepted
+DEFAULT_RADIUS_KM = 25.0
+MAX_RADIUS_KM = 500.0
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Sorts after every base 32 digit: prefix <= geohash < prefix + _AFTER
+_AFTER = "{"
+
+def encode_geohash(
+    latitude: Optional[float], longitude: Optional[float], precision: int = GEOHASH_PRECISION
+) -> Optional[str]:
+    """Geohash of a point, None unless both coordinates are set."""
+    if latitude is None or longitude is None:
+        return None
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate, longitude first
+        target, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of the cells of a geohash precision."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+def km_per_degree_lon(latitude: float) -> float:
+    return KM_PER_DEGREE * math.cos(math.radians(latitude))
+
+def bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) around a circle, clamped to the globe."""
+    d_lat = radius_km / KM_PER_DEGREE
+    scale = km_per_degree_lon(latitude)
+    d_lon = radius_km / scale if scale > radius_km / 180 else 180.0
+    return (
+        max(latitude - d_lat, -90.0),
+        min(latitude + d_lat, 90.0),
+        max(longitude - d_lon, -180.0),
+        min(longitude + d_lon, 180.0),
+    )
+
+def cover(latitude: float, longitude: float, radius_km: float, max_cells: int = 16) -> List[str]:
+    """
+    Geohash prefixes of the cells covering the circle's bounding box, at the
+    finest precision that needs at most `max_cells` of them. The box is not
+    continued across the antimeridian.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows, cols = round(180 / height), round(360 / width)
+        first_row = int((min_lat + 90) // height)
+        last_row = min(int((max_lat + 90) // height), rows - 1)
+        first_col = int((min_lon + 180) // width)
+        last_col = min(int((max_lon + 180) // width), cols - 1)
+        if (last_row - first_row + 1) * (last_col - first_col + 1) <= max_cells or precision == 1:
+            # Each cell by the geohash of its center
+            return sorted({
+                encode_geohash(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)
+            })
+    return []
+
+def prefix_ranges(prefixes: List[str]) -> List[Tuple[str, str]]:
+    """
+    Bounds of the geohashes starting with one of `prefixes` (all of the same
+    length, as cover() gives them): low <= geohash < high. Prefixes that
+    follow each other in base 32 share one range.
+    """
+    ranges: List[Tuple[str, str]] = []
+    previous = None
+    for prefix in sorted(prefixes):
+        value = 0
+        for char in prefix:
+            value = value * 32 + _BASE32.index(char)
+        if ranges and value == previous + 1:
+            ranges[-1] = (ranges[-1][0], prefix + _AFTER)
+        else:
+            ranges.append((prefix, prefix + _AFTER))
+        previous = value
+    return ranges
+
+def squared_scales(latitude: float) -> Tuple[float, float]:
+    """km² per squared degree of latitude and of longitude around `latitude`."""
+    return KM_PER_DEGREE * KM_PER_DEGREE, km_per_degree_lon(latitude) ** 2
+
+def squared_km(latitude: float, longitude: float, origin: Tuple[float, float]) -> float:
+    """
+    Squared distance in km² from `origin`, as api.crud.base.NearQuery
+    computes it in SQL: the same operations in the same order, so both give
+    the same float.
+    """
+    lat_scale, lon_scale = squared_scales(origin[0])
+    d_lat = latitude - origin[0]
+    d_lon = longitude - origin[1]
+    return d_lon * d_lon * lon_scale + d_lat * d_lat * lat_scale
+
+def parse_near(value: str) -> Tuple[float, float]:
+    """Parse "lat,lon" into degrees; ValueError if malformed or out of range."""
+    try:
+        latitude, longitude = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("near must be latitude,longitude") from None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("near is outside -90..90, -180..180")
+    return latitude, longitude
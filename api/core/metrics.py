@@ -0,0 +1,92 @@
+import bisect
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Route label of requests no route matched, so unknown paths don't each get
+# their own series
+UNMATCHED = "<unmatched>"
+
+class RouteStats:
+    """Counters of one (method, route) pair; buckets hold per-bucket counts."""
+
+    __slots__ = ("buckets", "count", "seconds", "size", "statuses")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.buckets = [0] * (bucket_count + 1)  # the last one is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.size = 0
+        self.statuses: Dict[int, int] = {}
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """
+    Request counters per route template, rendered in the Prometheus text
+    format.
+
+    observe() runs on the event loop thread only, so the counters are plain
+    ints without a lock: nothing else can interleave between a read and a
+    write. A request allocates nothing here but its (method, route) key;
+    the stats object is made once per pair.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bucket_bounds = tuple(buckets)
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[method, route] = RouteStats(len(self.bucket_bounds))
+        stats.buckets[bisect.bisect_left(self.bucket_bounds, seconds)] += 1
+        stats.count += 1
+        stats.seconds += seconds
+        stats.size += size
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+    def render(self) -> str:
+        bounds = [repr(bound) for bound in self.bucket_bounds] + ["+Inf"]
+        requests: List[str] = [
+            "# HELP http_requests_total Requests by route template, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        latency: List[str] = [
+            "# HELP http_request_duration_seconds Time to the last byte of the response.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        size: List[str] = [
+            "# HELP http_response_size_bytes Response body sizes.",
+            "# TYPE http_response_size_bytes summary",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            for status, count in sorted(stats.statuses.items()):
+                requests.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+            cumulative = 0
+            for bound, count in zip(bounds, stats.buckets):
+                cumulative += count
+                latency.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            latency.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.seconds!r}")
+            latency.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+            size.append(f"http_response_size_bytes_sum{{{labels}}} {stats.size}")
+            size.append(f"http_response_size_bytes_count{{{labels}}} {stats.count}")
+        in_flight = [
+            "# HELP http_requests_in_flight Requests being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        return "\n".join(requests + latency + size + in_flight) + "\n"
+
+metrics = Metrics()
@@ -0,0 +1,298 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import random
+import sys
+import time
+from email.utils import formatdate
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+from fastapi import HTTPException
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from api.core.cache import TTLCache, response_cache
+from api.core.deps import user_from_token
+from api.core.metrics import UNMATCHED, Metrics, metrics
+from api.core.profiler import RequestProfiler, new_profile_id, save_profile
+from api.db.query_stats import track_queries
+from api.db.session import AsyncSessionLocal
+from api.models.user import UserRole
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Response headers kept in the cache, besides the validators added below
+_KEPT_HEADERS = {b"content-type", b"x-next-cursor"}
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Headers
+    etag: bytes
+
+def _etag(body: bytes) -> bytes:
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+def _etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate == b"*" or candidate == etag:
+            return True
+    return False
+
+def cache_key(catalog: str, scope: Scope) -> Tuple[str, str, str]:
+    """Catalog, path and query with the parameters sorted, so order doesn't matter."""
+    query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+    return catalog, scope["path"], urlencode(sorted(query))
+
+class ResponseCacheMiddleware:
+    """
+    Serves GET requests for the given paths from `cache`, keyed by
+    cache_key(), and stores every 200 response they produce.
+
+    Responses carry an ETag (a hash of the body) and the Last-Modified time
+    they were rendered at, and If-None-Match gets a 304 when the ETag still
+    matches, cached or not. Cache-Control: no-cache makes clients revalidate
+    each time, which is cheap here; CRUD writes drop the affected catalog.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, routes: Mapping[str, str], cache: TTLCache = response_cache
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        catalog = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if catalog is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(catalog, scope)
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        cached = self.cache.get(key)
+        if cached is None:
+            generation = self.cache.generation
+            cached = await self._render(scope, receive, send)
+            if cached is None:
+                return
+            self.cache.set(key, cached, generation=generation)
+        await self._send(send, cached, not_modified=_etag_matches(if_none_match, cached.etag))
+
+    async def _render(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> Optional[CachedResponse]:
+        """
+        Run the app, holding back the response. Anything but a 200 is sent
+        through as is and gives None.
+        """
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        if start is None or start["status"] != 200:
+            if start is not None:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+            return None
+        etag = _etag(body)
+        headers = [
+            (name, value) for name, value in start["headers"] if name.lower() in _KEPT_HEADERS
+        ]
+        headers += [
+            (b"etag", etag),
+            (b"last-modified", formatdate(usegmt=True).encode()),
+            (b"cache-control", b"no-cache"),
+        ]
+        return CachedResponse(body, headers, etag)
+
+    async def _send(self, send: Send, response: CachedResponse, *, not_modified: bool) -> None:
+        if not_modified:
+            headers = [
+                (name, value) for name, value in response.headers
+                if name in (b"etag", b"last-modified", b"cache-control")
+            ]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = response.headers + [(b"content-length", str(len(response.body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+class MetricsMiddleware:
+    """
+    Records each HTTP request in `metrics` under its route template, such as
+    /api/psychologists/{psychologist_id}, with its status, time to the last
+    byte and body size.
+
+    FastAPI's router leaves the matched route in the scope. Requests the app
+    never routed, such as listings served by ResponseCacheMiddleware, are
+    matched against `routes` afterwards.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, routes: Sequence[BaseRoute], metrics: Metrics = metrics
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.metrics = metrics
+        # Path -> template of the parameterless routes matched here, so that
+        # cache hits skip the scan over all routes; bounded by the route count
+        self._static: Dict[str, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        path = scope["path"]
+        template = self._static.get(path)
+        if template is not None:
+            return template
+        for candidate in self.routes:
+            if candidate.matches(scope)[0] != Match.NONE:
+                template = getattr(candidate, "path", UNMATCHED)
+                if template == path:
+                    self._static[path] = template
+                return template
+        return UNMATCHED
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500  # if the app raises before starting a response
+        size = 0
+
+        async def observe(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, observe)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(
+                scope["method"], self._route(scope), status, time.perf_counter() - started, size
+            )
+
+class QueryStatsMiddleware:
+    """
+    Collects the SQL statements of each request (api.db.query_stats) and
+    reports their count, total and slowest time in an X-DB-Queries header
+    and a debug log line. Statements repeated `repeat_threshold` times or
+    more get a warning as a likely N+1. Meant for dev and test: the
+    per-statement bookkeeping isn't free.
+    """
+
+    def __init__(self, app: ASGIApp, *, repeat_threshold: int) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+            async def add_header(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    repeated = len(stats.repeated(self.repeat_threshold))
+                    header = f"{stats.summary()}; repeated={repeated}".encode()
+                    message = dict(message, headers=[*message["headers"], (b"x-db-queries", header)])
+                await send(message)
+
+            await self.app(scope, receive, add_header)
+        request = f"{scope['method']} {scope['path']}"
+        logger.debug("%s: %s", request, stats.summary())
+        for statement, count in stats.repeated(self.repeat_threshold):
+            logger.warning("%s: statement ran %d times, likely N+1: %s", request, count, statement)
+
+class ProfilerMiddleware:
+    """
+    Profiles a request with api.core.profiler when an admin sends
+    X-Profile: 1, and a random `sample_rate` share of all requests. The
+    response of a profiled request names its profile in X-Profile-Id; the
+    admin routes under /api/admin/profiles serve them.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, directory: str, interval: float, sample_rate: float, keep: int
+    ) -> None:
+        self.app = app
+        self.directory = directory
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.keep = keep
+
+    async def _requested_by_admin(self, scope: Scope) -> bool:
+        headers = scope["headers"]
+        if (b"x-profile", b"1") not in headers:
+            return False
+        authorization = dict(headers).get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        async with AsyncSessionLocal() as db:
+            try:
+                user = await user_from_token(db, token)
+            except HTTPException:
+                return False
+        return user.role == UserRole.ADMIN
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (
+            random.random() < self.sample_rate or await self._requested_by_admin(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        profile_id = new_profile_id(scope["method"], scope["path"])
+        status = 500
+
+        async def add_header(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = dict(
+                    message, headers=[*message["headers"], (b"x-profile-id", profile_id.encode())]
+                )
+            await send(message)
+
+        profiler = RequestProfiler(self.interval)
+        started = time.perf_counter()
+        profiler.start(sys._getframe())
+        try:
+            await self.app(scope, receive, add_header)
+        finally:
+            profiler.stop()
+            save = functools.partial(
+                save_profile,
+                self.directory,
+                profile_id,
+                profiler,
+                keep=self.keep,
+                method=scope["method"],
+                path=scope["path"],
+                query=scope["query_string"].decode("latin-1"),
+                status=status,
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            await asyncio.get_running_loop().run_in_executor(None, save)
@@ -0,0 +1,162 @@
+"""
+Wall-clock sampling profiler for single requests.
+
+A RequestProfiler thread wakes every `interval` seconds and records where
+the profiled request is: if the event loop thread is running the request's
+code, its live stack; otherwise the chain of coroutines the request's task
+is suspended in, under a "[waiting]" frame. Waiting covers the database
+(aiosqlite runs queries on a thread of its own), the bcrypt pool and other
+requests holding the loop.
+
+Profiles are saved as folded stacks ("frame;frame;frame count" lines), the
+input format of flamegraph.pl and speedscope, next to a JSON file with the
+request details.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+# The sampler needs the GIL to take a sample, and a busy loop thread only
+# gives it up every sys.getswitchinterval() (5 ms by default). While any
+# profile runs, the switch interval is lowered to the sampling interval.
+_switch_lock = threading.Lock()
+_profiling = 0
+_switch_interval = sys.getswitchinterval()
+
+def _profiling_started(interval: float) -> None:
+    global _profiling, _switch_interval
+    with _switch_lock:
+        if _profiling == 0:
+            _switch_interval = sys.getswitchinterval()
+        _profiling += 1
+        sys.setswitchinterval(min(interval, sys.getswitchinterval()))
+
+def _profiling_stopped() -> None:
+    global _profiling
+    with _switch_lock:
+        _profiling -= 1
+        if _profiling == 0:
+            sys.setswitchinterval(_switch_interval)
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class RequestProfiler:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: "Counter[str]" = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, anchor: FrameType) -> None:
+        """Start sampling the current task; `anchor` is the outermost frame kept."""
+        self._anchor = anchor
+        self._loop_thread = threading.get_ident()
+        self._task = asyncio.current_task()
+        _profiling_started(self.interval)
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            _profiling_stopped()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            stack = self._running() or self._waiting()
+            if stack:
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+
+    def _running(self) -> Optional[List[str]]:
+        frame = sys._current_frames().get(self._loop_thread)
+        names: List[str] = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            if frame is self._anchor:
+                names.reverse()
+                return names
+            frame = frame.f_back
+        return None
+
+    def _waiting(self) -> List[str]:
+        names = ["[waiting]"]
+        awaitable: Any = self._task.get_coro() if self._task is not None else None
+        found = False
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                # A future or other object at the bottom of the chain
+                names.append(f"<{type(awaitable).__name__}>")
+                break
+            found = found or frame is self._anchor
+            if found:
+                names.append(_frame_name(frame))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        return names if found else []
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+def new_profile_id(method: str, path: str) -> str:
+    """Sorts by creation time and names the request, safe as a file name."""
+    slug = _UNSAFE.sub("-", f"{method} {path}").strip("-")
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{slug[:60]}-{uuid.uuid4().hex[:8]}"
+
+def save_profile(
+    directory: str, profile_id: str, profiler: RequestProfiler, *, keep: int, **details: Any
+) -> None:
+    """Write the profile and its details, dropping the oldest beyond `keep` profiles."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{profile_id}.folded"), "w", encoding="utf-8") as out:
+        for stack, count in profiler.stacks.most_common():
+            out.write(f"{stack} {count}\n")
+    meta = dict(
+        details,
+        id=profile_id,
+        samples=profiler.samples,
+        interval_ms=profiler.interval * 1000,
+        created=datetime.utcnow().isoformat(timespec="seconds"),
+    )
+    with open(os.path.join(directory, f"{profile_id}.json"), "w", encoding="utf-8") as out:
+        json.dump(meta, out)
+    for old in list_profiles(directory)[keep:]:
+        for suffix in (".folded", ".json"):
+            try:
+                os.remove(os.path.join(directory, old["id"] + suffix))
+            except FileNotFoundError:
+                pass
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    """Details of the saved profiles, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8") as meta:
+                    profiles.append(json.load(meta))
+            except (OSError, ValueError):
+                continue
+    profiles.sort(key=lambda profile: profile["id"], reverse=True)
+    return profiles
+
+def profile_path(directory: str, profile_id: str) -> Optional[str]:
+    """Path of a saved folded profile, None for unknown or malformed ids."""
+    if not re.fullmatch(r"[A-Za-z0-9-]+", profile_id):
+        return None
+    path = os.path.join(directory, f"{profile_id}.folded")
+    return path if os.path.isfile(path) else None
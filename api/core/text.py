@@ -0,0 +1,127 @@
+import bisect
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+# Leading "г." / "город" in Russian addresses and city names
+_CITY_PREFIX = re.compile(r"^(?:г\.|г\s|город\s)\s*", re.IGNORECASE)
+
+def normalize_city(city: Optional[str]) -> Optional[str]:
+    """
+    Normalized lookup key of a city name: prefix and extra whitespace removed,
+    case-folded, with ё folded to е. str.casefold() handles Cyrillic, which
+    SQLite's lower() and LIKE do not.
+    """
+    if not city:
+        return None
+    key = " ".join(_CITY_PREFIX.sub("", city.strip()).split())
+    return key.casefold().replace("ё", "е") or None
+
+def city_from_address(address: Optional[str]) -> Optional[str]:
+    """
+    City of a free-text address: the part marked with "г."/"город", otherwise
+    the first comma-separated part ("г. Москва, ул. Ленина, 1" -> "Москва").
+    """
+    if not address:
+        return None
+    parts = [part.strip() for part in address.split(",") if part.strip()]
+    for part in parts:
+        if _CITY_PREFIX.match(part):
+            return part
+    return parts[0] if parts else None
+
+# Full-text search helpers. SQLite has no Russian stemmer, so text is reduced
+# to stems here before it is indexed, and queries are stemmed the same way:
+# "тревога", "тревоги" and "тревогой" are all indexed and searched as "тревог".
+
+_WORD = re.compile(r"\w+")
+_CYRILLIC = re.compile(r"[а-я]")
+_RU_ENDINGS = sorted(
+    {
+        # nouns
+        "остями", "остям", "остях", "остью", "остей", "ости", "ость",
+        "иями", "иям", "иях", "ией", "ями", "ами", "ия", "ии", "ию", "ие", "ий",
+        "ам", "ям", "ах", "ях", "ом", "ем", "ов", "ев", "ей", "ью",
+        # adjectives
+        "ого", "его", "ому", "ему", "ыми", "ими", "ый", "ой", "ая", "яя", "ое",
+        "ее", "ые", "ых", "их", "ым", "им", "ую", "юю",
+        # verbs
+        "ать", "ять", "ить", "еть", "ешь", "ете", "ть", "ся",
+        "а", "я", "ы", "и", "у", "ю", "е", "о", "ь", "й",
+    },
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+
+def fold(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Strip one Russian inflectional ending, keeping at least 3 letters."""
+    word = fold(word)
+    if not _CYRILLIC.search(word):
+        return word
+    for ending in _RU_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            word = word[: -len(ending)]
+            break
+    # "мысль" and "мыслью" -> "мысл"
+    if word.endswith("ь") and len(word) > _MIN_STEM:
+        word = word[:-1]
+    return word
+
+def search_text(text: Optional[str]) -> str:
+    """Indexed form of `text`: its words' stems, space separated."""
+    return " ".join(stem(word) for word in _WORD.findall(text or ""))
+
+def search_stems(query: str) -> List[str]:
+    # Single letters are Russian function words (и, в, с, к) and match nearly
+    # every article
+    return list(dict.fromkeys(stem(word) for word in _WORD.findall(query) if len(word) > 1))
+
+def stems_pattern(stems: Sequence[str]) -> "re.Pattern[str]":
+    """Regex finding the words of a text that start with one of `stems`."""
+    parts = [re.escape(stem).replace("е", "[её]") for stem in stems]
+    return re.compile(r"(?<!\w)(?:" + "|".join(parts) + r")\w*", re.IGNORECASE)
+
+def highlight(
+    text: Optional[str],
+    stems: Sequence[str],
+    *,
+    length: int = 160,
+    mark: Tuple[str, str] = ("<mark>", "</mark>"),
+) -> Optional[str]:
+    """
+    About `length` characters of `text` around the densest run of words that
+    `stems` match, matches wrapped in `mark`. None when nothing matches.
+    """
+    if not text or not stems:
+        return None
+    # The pattern finds candidates cheaply; a hit is a word with a query stem
+    wanted = set(stems)
+    hits = [hit for hit in stems_pattern(stems).finditer(text) if stem(hit.group()) in wanted]
+    if not hits:
+        return None
+
+    # Window covering the most distinct stems, then the most hits
+    starts = [hit.start() for hit in hits]
+
+    def score(i: int) -> Tuple[int, int]:
+        inside = hits[i:bisect.bisect_left(starts, starts[i] + length)]
+        return len({stem(hit.group()) for hit in inside}), len(inside)
+
+    best = max(range(len(hits)), key=lambda i: (score(i), -i))
+    start = text.rfind(" ", 0, max(starts[best] - 20, 0)) + 1
+    end = text.find(" ", start + length)
+    end = len(text) if end == -1 else end
+
+    parts, position = [], start
+    for hit in hits:
+        if start <= hit.start() and hit.end() <= end:
+            parts += [text[position:hit.start()], mark[0], hit.group(), mark[1]]
+            position = hit.end()
+    parts.append(text[position:end])
+    snippet = " ".join("".join(parts).split())
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
\ No newline at end of file
@@ -1 +1,7 @@
-# CRUD package initialization
\ No newline at end of file
+# CRUD package initialization
+from .crud_user import crud_user, async_crud_user  # noqa
+from .crud_psychologist import crud_psychologist, async_crud_psychologist  # noqa
+from .crud_institution import crud_institution, async_crud_institution  # noqa
+from .crud_client import crud_client, async_crud_client  # noqa
+from .crud_article import crud_article, async_crud_article  # noqa
+from .crud_review import crud_review, async_crud_review  # noqa
\ No newline at end of file
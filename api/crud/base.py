@@ -1,33 +1,585 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import binascii
+import itertools
+import json
+import uuid
+from datetime import datetime
+from typing import (
+    Any, Callable, Collection, Dict, Generic, Iterable, Iterator, List, Mapping, NamedTuple,
+    Optional, Sequence, Tuple, Type, TypeVar, Union,
+)
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    JSON, ColumnElement, Row, Select, Text, and_, bindparam, inspect, or_, select, tuple_, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import StatementError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    Session, defaultload, defer, joinedload, lazyload, noload, raiseload, selectinload,
+    subqueryload,
+)
+from api.core.cache import invalidate_catalogs
+from api.core.geo import (
+    DEFAULT_RADIUS_KM, cover, encode_geohash, prefix_ranges, squared_km, squared_scales,
+)
 from api.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
-class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+# Loading plan: relationship path -> loader strategy, for example
+# {"user": "joined", "institution.user": "selectin"}. The "*" path applies
+# a strategy to every relationship the plan does not name. Column paths
+# take "defer": the column is left out of the SELECT.
+LoadPlan = Mapping[str, str]
+
+LOADERS = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+    "lazy": lazyload,
+    "raise": raiseload,
+    "noload": noload,
+    "defer": defer,
+}
+
+# Sort key columns and direction of a listing
+SortKey = Tuple[List[Any], bool]
+
+# Latitude and longitude in degrees, the origin of a near= listing
+Point = Tuple[float, float]
+
+# Input position and message of a row a bulk call could not write
+BulkError = Tuple[int, str]
+
+class BulkResult(NamedTuple):
+    ids: List[Any]  # rows written, in input order
+    errors: List[BulkError]
+
+# One bulk chunk: (input position, column values) pairs
+BulkRows = List[Tuple[int, Dict[str, Any]]]
+
+# Largest page the listing routes accept
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque keyset cursor holding the sort key of the last row on a page."""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into values for `keys`; ValueError if it does not fit."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Malformed cursor") from None
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Cursor does not match the listing sort key")
+    decoded = []
+    for key, value in zip(keys, values):
+        if not isinstance(value, (str, int, float)):
+            raise ValueError("Cursor does not match the listing sort key")
+        if key.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+class QueryBase(Generic[ModelType]):
+    # Merged under every per-call plan
+    default_load: LoadPlan = {}
+
+    # Listing order, most significant column first. Keyset cursors seek on
+    # these columns, so they must be NOT NULL, backed by an index, and end
+    # with a unique column.
+    sort_columns: Tuple[str, ...] = ("id",)
+    sort_descending: bool = False
+
+    # Cached public listings (api.core.cache.response_cache) that show this
+    # model, dropped after every write made through the CRUD object
+    catalogs: Tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         """
-        CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+        Statement builders shared by the sync and async CRUD objects.
         """
         self.model = model
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    def loader_options(self, load: Optional[LoadPlan] = None) -> List[Any]:
+        options = []
+        for path, strategy in {**self.default_load, **(load or {})}.items():
+            try:
+                loader = LOADERS[strategy]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown loader strategy {strategy!r} for {path!r}"
+                ) from None
+            if path == "*":
+                options.append(loader("*"))
+                continue
+            *parents, leaf = path.split(".")
+            entity, option = self.model, None
+            for name in parents:
+                attr = getattr(entity, name)
+                option = defaultload(attr) if option is None else option.defaultload(attr)
+                entity = attr.property.mapper.class_
+            attr = getattr(entity, leaf)
+            if option is None:
+                options.append(loader(attr))
+            else:
+                options.append(getattr(option, loader.__name__)(attr))
+        return options
+
+    def projection_load(self, load: Optional[LoadPlan], fields: Collection[str]) -> Dict[str, str]:
+        """
+        `load` for a response showing only the top-level `fields`: relations
+        outside them aren't loaded, and Text and JSON columns outside them
+        aren't read, so large bodies are never fetched or parsed.
+        """
+        plan = {
+            path: strategy if path == "*" or path.split(".")[0] in fields else "noload"
+            for path, strategy in {**self.default_load, **(load or {})}.items()
+        }
+        for column in self.model.__table__.c:
+            if isinstance(column.type, (Text, JSON)) and column.key not in fields:
+                plan[column.key] = "defer"
+        return plan
+
+    def sort_key(self, **filters: Any) -> SortKey:
+        return [getattr(self.model, name) for name in self.sort_columns], self.sort_descending
+
+    def paginate(
+        self,
+        stmt: Select,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: Optional[SortKey] = None,
+    ) -> Select:
+        """
+        Order by the sort key and either seek past `cursor` or, for backward
+        compatibility, skip `skip` rows.
+        """
+        keys, descending = sort or self.sort_key()
+        if cursor is not None:
+            values = decode_cursor(cursor, keys)
+            if len(keys) == 1:
+                left, right = keys[0], values[0]
+            else:
+                left, right = tuple_(*keys), tuple_(*values)
+            stmt = stmt.where(left < right if descending else left > right)
+        elif skip:
+            stmt = stmt.offset(skip)
+        return stmt.order_by(*(key.desc() if descending else key for key in keys)).limit(limit)
+
+    def _page(
+        self, rows: Sequence[ModelType], limit: int, **filters: Any
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        # Pages are fetched with limit + 1 rows; the extra row only tells
+        # whether a next page exists
+        if limit <= 0:
+            return [], None
+        if len(rows) <= limit:
+            return list(rows), None
+        rows = list(rows[:limit])
+        return rows, encode_cursor(self.cursor_values(rows[-1], **filters))
+
+    def cursor_values(self, row: ModelType, **filters: Any) -> List[Any]:
+        """Sort key of `row`, for the cursor of the page it ends."""
+        keys, _ = self.sort_key(**filters)
+        return [getattr(row, key.key) for key in keys]
+
+    def select_one(self, id: Any, *, load: Optional[LoadPlan] = None) -> Select:
+        return (
+            select(self.model)
+            .options(*self.loader_options(load))
+            .where(self.model.id == id)
+        )
+
+    def select_multi(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        load: Optional[LoadPlan] = None,
+    ) -> Select:
+        query = select(self.model).options(*self.loader_options(load))
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+
+    def select_pages(self, *, limit: int, **params: Any) -> Iterator[Select]:
+        """
+        Statements for one page of select_multi(**params), run in turn until
+        one returns `limit` rows; the rows of the last one run are the page.
+        A single select_multi() unless a listing narrows its search first.
+        """
+        yield self.select_multi(limit=limit, **params)
+
+    def _apply_update(
+        self, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> None:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in inspect(self.model).column_attrs.keys():
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+
+    # Bulk writes (create_many, update_many, remove_many) are Core executemany
+    # statements, so the mapper hooks and @validates don't run for them.
+    # Subclasses redo those side effects in the bulk_* methods below, which
+    # run on the same connection, inside the savepoint of the chunk.
+
+    # Columns whose values before the write bulk_updated()/bulk_deleting() need
+    bulk_tracked: Tuple[str, ...] = ()
+    bulk_batch_size = 1000
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        """
+        Fill in derived columns of one row about to be inserted or updated.
+        Keys that aren't columns are dropped afterwards.
+        """
+        return values
+
+    def bulk_inserted(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        pass
+
+    def bulk_updated(
+        self, connection: Connection, rows: List[Dict[str, Any]], old: Dict[Any, Row]
+    ) -> None:
+        """`rows` hold only the columns that were set; `old` the tracked ones before."""
+
+    def bulk_deleting(self, connection: Connection, old: Dict[Any, Row]) -> None:
+        pass
+
+    def _bulk_rows(
+        self, objs_in: Iterable[Union[BaseModel, Dict[str, Any]]], *, insert: bool
+    ) -> BulkRows:
+        columns = self.model.__table__.c
+        rows = []
+        for position, obj_in in enumerate(objs_in):
+            data = dict(obj_in) if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
+            data = self.bulk_values(data, insert=insert)
+            rows.append((position, {key: data[key] for key in data if key in columns}))
+        return rows
+
+    def _bulk_old(self, connection: Connection, ids: List[Any]) -> Dict[Any, Row]:
+        table = self.model.__table__
+        columns = [table.c.id, *(table.c[name] for name in self.bulk_tracked)]
+        return {
+            row.id: row
+            for row in connection.execute(select(*columns).where(table.c.id.in_(ids)))
+        }
+
+    @staticmethod
+    def _by_keys(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        # executemany needs the same parameter names in every row
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        return list(groups.values())
+
+    def _insert_chunk(self, connection: Connection, rows: BulkRows) -> BulkResult:
+        table = self.model.__table__
+        values = [row for _, row in rows]
+        for group in self._by_keys(values):
+            connection.execute(table.insert(), group)
+        self.bulk_inserted(connection, values)
+        return BulkResult([row["id"] for row in values], [])
+
+    def _update_chunk(self, connection: Connection, rows: BulkRows) -> BulkResult:
+        table = self.model.__table__
+        old = self._bulk_old(connection, [row["id"] for _, row in rows])
+        errors = [(position, "Not found") for position, row in rows if row["id"] not in old]
+        values = [row for _, row in rows if row["id"] in old]
+        for group in self._by_keys(values):
+            names = [name for name in group[0] if name != "id"]
+            if not names:
+                continue
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("_id"))
+                .values({
+                    name: bindparam(f"_{name}", type_=table.c[name].type) for name in names
+                })
+            )
+            connection.execute(stmt, [
+                {f"_{name}": value for name, value in row.items()} for row in group
+            ])
+        self.bulk_updated(connection, values, old)
+        return BulkResult([row["id"] for row in values], errors)
+
+    def _delete_chunk(self, connection: Connection, rows: BulkRows) -> BulkResult:
+        table = self.model.__table__
+        old = self._bulk_old(connection, [row["id"] for _, row in rows])
+        errors = [(position, "Not found") for position, row in rows if row["id"] not in old]
+        if old:
+            self.bulk_deleting(connection, old)
+            connection.execute(table.delete().where(table.c.id.in_(list(old))))
+        return BulkResult([row["id"] for _, row in rows if row["id"] in old], errors)
+
+    def _bulk_write(
+        self,
+        session: Session,
+        rows: BulkRows,
+        write: Callable[[Connection, BulkRows], BulkResult],
+        batch_size: Optional[int] = None,
+    ) -> BulkResult:
+        """
+        Run `write` over `rows` in chunks, each in a savepoint. A chunk that
+        fails (a constraint violation, a value of the wrong type, a database
+        error) is retried one row at a time, so only the offending rows are
+        reported and the rest of the batch is kept.
+        """
+        ids: List[Any] = []
+        errors: List[BulkError] = []
+        seen = set()
+        unique = []
+        for position, row in rows:
+            if row.get("id") in seen:
+                errors.append((position, "Duplicate id in batch"))
+            else:
+                seen.add(row.get("id"))
+                unique.append((position, row))
+        chunks = iter(unique)
+        while True:
+            chunk = list(itertools.islice(chunks, batch_size or self.bulk_batch_size))
+            if not chunk:
+                break
+            try:
+                # The savepoint is only emitted when the connection is taken
+                # inside the block
+                with session.begin_nested():
+                    result = write(session.connection(), chunk)
+            except StatementError:
+                result = BulkResult([], [])
+                for one in chunk:
+                    try:
+                        with session.begin_nested():
+                            single = write(session.connection(), [one])
+                    except StatementError as exc:
+                        # Also the base of DBAPIError; orig is the driver's
+                        # exception or the one a type's bind processor raised
+                        result.errors.append((one[0], str(exc.orig)))
+                    else:
+                        result.ids.extend(single.ids)
+                        result.errors.extend(single.errors)
+            ids.extend(result.ids)
+            errors.extend(result.errors)
+        return BulkResult(ids, sorted(errors))
+
+    def _create_many(
+        self, session: Session, objs_in: Iterable[Any], batch_size: Optional[int] = None
+    ) -> BulkResult:
+        rows = self._bulk_rows(objs_in, insert=True)
+        for _, row in rows:
+            if row.get("id") is None:
+                row["id"] = str(uuid.uuid4())
+        return self._bulk_write(session, rows, self._insert_chunk, batch_size)
+
+    def _update_many(
+        self, session: Session, objs_in: Iterable[Any], batch_size: Optional[int] = None
+    ) -> BulkResult:
+        rows = self._bulk_rows(objs_in, insert=False)
+        missing = [(position, "Missing id") for position, row in rows if row.get("id") is None]
+        rows = [(position, row) for position, row in rows if row.get("id") is not None]
+        result = self._bulk_write(session, rows, self._update_chunk, batch_size)
+        return BulkResult(result.ids, sorted(result.errors + missing))
+
+    def _remove_many(
+        self, session: Session, ids: Iterable[Any], batch_size: Optional[int] = None
+    ) -> BulkResult:
+        rows = [(position, {"id": id}) for position, id in enumerate(ids)]
+        return self._bulk_write(session, rows, self._delete_chunk, batch_size)
+
+class NearQuery(QueryBase[ModelType]):
+    """
+    Nearest-first listings for models with latitude, longitude and geohash
+    columns (see api.core.geo). Given `near`, select_multi() implementations
+    paginate with paginate_near() and the listing is ordered by distance,
+    then id. get_page() searches growing circles: the first radius that
+    holds a full page gives it, since every row outside is farther than
+    those inside. Each search reads only the geohash index ranges of its
+    circle; the models index (geohash, latitude, longitude, id), so the
+    distances and the ids of a page come from the index alone.
+    """
+
+    # Radius of the first search, grown by near_growth up to the requested one
+    near_first_radius_km = 1.0
+    near_growth = 4
+
+    def near_distance(self, near: Point) -> ColumnElement:
+        """Squared distance from `near` in km², see api.core.geo.squared_km()."""
+        lat_scale, lon_scale = squared_scales(near[0])
+        d_lat = self.model.latitude - near[0]
+        d_lon = self.model.longitude - near[1]
+        return d_lon * d_lon * lon_scale + d_lat * d_lat * lat_scale
+
+    def near_clauses(self, near: Point, radius_km: float) -> List[ColumnElement]:
+        geohash = self.model.geohash
+        ranges = prefix_ranges(cover(near[0], near[1], radius_km))
+        return [
+            or_(*(and_(geohash >= low, geohash < high) for low, high in ranges)),
+            self.near_distance(near) <= radius_km * radius_km,
+        ]
+
+    def paginate_near(
+        self,
+        stmt: Select,
+        near: Point,
+        radius_km: float,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Select:
+        """
+        paginate() by distance from `near`, within `radius_km`. The ids of
+        the page are picked first, under the filters of `stmt`; only the
+        rows of those ids are then read in full, rather than every row in
+        the circle.
+        """
+        sort = self.sort_key(near=near)
+        ids = select(self.model.id).where(*self.near_clauses(near, radius_km))
+        if stmt.whereclause is not None:
+            ids = ids.where(stmt.whereclause)
+        ids = self.paginate(ids, skip=skip, limit=limit, cursor=cursor, sort=sort)
+        keys, _ = sort
+        return stmt.where(self.model.id.in_(ids)).order_by(*keys)
+
+    def sort_key(self, *, near: Optional[Point] = None, **filters: Any) -> SortKey:
+        if near is not None:
+            return [self.near_distance(near), self.model.id], False
+        return super().sort_key(**filters)
+
+    def cursor_values(
+        self, row: ModelType, *, near: Optional[Point] = None, **filters: Any
+    ) -> List[Any]:
+        if near is not None:
+            return [squared_km(row.latitude, row.longitude, near), row.id]
+        return super().cursor_values(row, **filters)
+
+    def select_pages(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        near: Optional[Point] = None,
+        radius_km: float = DEFAULT_RADIUS_KM,
+        **params: Any
+    ) -> Iterator[Select]:
+        if near is None:
+            yield self.select_multi(limit=limit, cursor=cursor, **params)
+            return
+        # A next page starts past the cursor's distance
+        reached = 0.0
+        if cursor is not None:
+            keys, _ = self.sort_key(near=near)
+            distance = decode_cursor(cursor, keys)[0]
+            if not isinstance(distance, (int, float)) or distance < 0:
+                raise ValueError("Cursor does not match the listing sort key")
+            reached = distance ** 0.5
+        radius = self.near_first_radius_km
+        while radius < radius_km:
+            if radius > reached:
+                yield self.select_multi(
+                    limit=limit, cursor=cursor, near=near, radius_km=radius, **params
+                )
+            radius *= self.near_growth
+        yield self.select_multi(
+            limit=limit, cursor=cursor, near=near, radius_km=radius_km, **params
+        )
+
+    # Bulk counterpart of the validate_coordinates hooks of the models
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        if insert:
+            values["geohash"] = encode_geohash(values.get("latitude"), values.get("longitude"))
+        return values
+
+    def bulk_updated(
+        self, connection: Connection, rows: List[Dict[str, Any]], old: Dict[Any, Row]
+    ) -> None:
+        # An update may set one coordinate; the other is the stored one.
+        # Subclasses list latitude and longitude in bulk_tracked.
+        moved = [
+            {
+                "_id": row["id"],
+                "_geohash": encode_geohash(
+                    row.get("latitude", old[row["id"]].latitude),
+                    row.get("longitude", old[row["id"]].longitude),
+                ),
+            }
+            for row in rows
+            if "latitude" in row or "longitude" in row
+        ]
+        if moved:
+            table = self.model.__table__
+            connection.execute(
+                update(table)
+                .where(table.c.id == bindparam("_id"))
+                .values(geohash=bindparam("_geohash")),
+                moved,
+            )
+
+class CRUDBase(QueryBase[ModelType], Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+    """
+
+    def get(
+        self, db: Session, id: Any, *, load: Optional[LoadPlan] = None
+    ) -> Optional[ModelType]:
+        return db.scalars(self.select_one(id, load=load)).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        load: Optional[LoadPlan] = None,
+        **filters: Any
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        stmt = self.select_multi(skip=skip, limit=limit, load=load, **filters)
+        return db.scalars(stmt).unique().all()
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        load: Optional[LoadPlan] = None,
+        **filters: Any
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        One listing page and the cursor of the next one (None on the last page).
+        Raises ValueError for a cursor that does not belong to this listing.
+        """
+        for stmt in self.select_pages(
+            skip=skip, limit=limit + 1, cursor=cursor, load=load, **filters
+        ):
+            rows = db.scalars(stmt).unique().all()
+            if len(rows) > limit:
+                break
+        return self._page(rows, limit, **filters)
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         db.commit()
+        invalidate_catalogs(*self.catalogs)
         db.refresh(db_obj)
         return db_obj
 
@@ -38,21 +590,173 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        self._apply_update(db_obj, obj_in)
         db.add(db_obj)
         db.commit()
+        invalidate_catalogs(*self.catalogs)
         db.refresh(db_obj)
         return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
+    def remove(self, db: Session, *, id: Any) -> ModelType:
+        obj = db.get(self.model, id)
         db.delete(obj)
         db.commit()
-        return obj
\ No newline at end of file
+        invalidate_catalogs(*self.catalogs)
+        return obj
+
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Iterable[Union[CreateSchemaType, Dict[str, Any]]],
+        batch_size: Optional[int] = None
+    ) -> BulkResult:
+        """
+        Insert many rows in one transaction with executemany, without loading
+        them back. Rows without an id get a UUID. Rows that fail are reported
+        by input position in the result; the others are committed.
+        """
+        result = self._create_many(db, objs_in, batch_size)
+        db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
+
+    def update_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Iterable[Union[UpdateSchemaType, Dict[str, Any]]],
+        batch_size: Optional[int] = None
+    ) -> BulkResult:
+        """Like create_many(), for partial updates; each row names its id."""
+        result = self._update_many(db, objs_in, batch_size)
+        db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
+
+    def remove_many(
+        self, db: Session, *, ids: Iterable[Any], batch_size: Optional[int] = None
+    ) -> BulkResult:
+        result = self._remove_many(db, ids, batch_size)
+        db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
+
+class AsyncCRUDBase(QueryBase[ModelType], Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Async counterpart of CRUDBase, working on an AsyncSession.
+
+    An AsyncSession cannot lazy load, so relationships missing from the
+    loading plan raise on access instead of failing inside the driver.
+    """
+
+    default_load: LoadPlan = {"*": "raise"}
+
+    async def get(
+        self, db: AsyncSession, id: Any, *, load: Optional[LoadPlan] = None
+    ) -> Optional[ModelType]:
+        return (await db.scalars(self.select_one(id, load=load))).first()
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        load: Optional[LoadPlan] = None,
+        **filters: Any
+    ) -> List[ModelType]:
+        stmt = self.select_multi(skip=skip, limit=limit, load=load, **filters)
+        return (await db.scalars(stmt)).unique().all()
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        load: Optional[LoadPlan] = None,
+        **filters: Any
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        for stmt in self.select_pages(
+            skip=skip, limit=limit + 1, cursor=cursor, load=load, **filters
+        ):
+            rows = (await db.scalars(stmt)).unique().all()
+            if len(rows) > limit:
+                break
+        return self._page(rows, limit, **filters)
+
+    async def _save(
+        self, db: AsyncSession, db_obj: ModelType, load: Optional[LoadPlan] = None
+    ) -> ModelType:
+        db.add(db_obj)
+        await db.commit()
+        invalidate_catalogs(*self.catalogs)
+        # Reload server-side defaults and the relations in the plan in one go
+        stmt = self.select_one(db_obj.id, load=load).execution_options(
+            populate_existing=True
+        )
+        return (await db.scalars(stmt)).one()
+
+    async def create(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: CreateSchemaType,
+        load: Optional[LoadPlan] = None
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        return await self._save(db, self.model(**obj_in_data), load)
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        load: Optional[LoadPlan] = None
+    ) -> ModelType:
+        self._apply_update(db_obj, obj_in)
+        return await self._save(db, db_obj, load)
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return obj
+
+    # The bulk writes run the sync implementation on the session's greenlet
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Iterable[Union[CreateSchemaType, Dict[str, Any]]],
+        batch_size: Optional[int] = None
+    ) -> BulkResult:
+        result = await db.run_sync(self._create_many, objs_in, batch_size)
+        await db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Iterable[Union[UpdateSchemaType, Dict[str, Any]]],
+        batch_size: Optional[int] = None
+    ) -> BulkResult:
+        result = await db.run_sync(self._update_many, objs_in, batch_size)
+        await db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
+
+    async def remove_many(
+        self, db: AsyncSession, *, ids: Iterable[Any], batch_size: Optional[int] = None
+    ) -> BulkResult:
+        result = await db.run_sync(self._remove_many, ids, batch_size)
+        await db.commit()
+        invalidate_catalogs(*self.catalogs)
+        return result
@@ -1,42 +1,282 @@
-```python
-from typing import List, Optional
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
+from sqlalchemy import ColumnElement, Row, Select, and_, func, literal_column, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from api.crud.base import CRUDBase
-from api.models.article import Article, ArticleStatus
+from api.core.text import highlight, search_stems
+from api.crud.base import AsyncCRUDBase, CRUDBase, LoadPlan, QueryBase, SortKey
+from api.models.article import (
+    SEARCH_COLUMNS, Article, ArticleSearchDoc, ArticleStatus, ArticleTag, ArticleTagCount,
+    article_search, count_tags, index_article, replace_tags, shift_tag_counts, stored_tags,
+    unindex_article,
+)
 from api.schemas.article import ArticleCreate, ArticleUpdate
 
-class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
-    def get_multi(
+# bm25 weights, in article_search column order: title, preview, content, tags
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+SearchHit = Tuple[Article, Optional[str]]
+
+class ArticleQuery(QueryBase[Article]):
+    catalogs = ("articles",)
+
+    def sort_key(
+        self, *, status: Optional[str] = ArticleStatus.PUBLISHED, **filters: Any
+    ) -> SortKey:
+        # Published listings go newest first; published_at is always set for
+        # them. Drafts and mixed listings have no such key and go by id.
+        if status == ArticleStatus.PUBLISHED:
+            return [self.model.published_at, self.model.id], True
+        return [self.model.id], False
+
+    def select_multi(
         self,
-        db: Session,
         *,
         skip: int = 0,
         limit: int = 100,
-        tag: Optional[str] = None,
+        cursor: Optional[str] = None,
+        load: Optional[LoadPlan] = None,
+        tag: Optional[Union[str, Sequence[str]]] = None,
+        tag_match: str = "any",
         author_id: Optional[str] = None,
         institution_id: Optional[str] = None,
         psychologist_id: Optional[str] = None,
         status: Optional[str] = ArticleStatus.PUBLISHED
-    ) -> List[Article]:
-        query = db.query(self.model)
+    ) -> Select:
+        query = select(self.model).options(*self.loader_options(load))
+        query = query.filter(*self.filter_clauses(
+            tag=tag,
+            tag_match=tag_match,
+            author_id=author_id,
+            institution_id=institution_id,
+            psychologist_id=psychologist_id,
+        ))
+            
+        if status:
+            query = query.filter(self.model.status == status)
+        
+        return self.paginate(
+            query, skip=skip, limit=limit, cursor=cursor, sort=self.sort_key(status=status)
+        )
+
+    def filter_clauses(
+        self,
+        *,
+        tag: Optional[Union[str, Sequence[str]]] = None,
+        tag_match: str = "any",
+        author_id: Optional[str] = None,
+        institution_id: Optional[str] = None,
+        psychologist_id: Optional[str] = None,
+    ) -> List[ColumnElement]:
+        clauses = []
         
         if tag:
-            query = query.filter(self.model.tags.contains([tag]))
+            clauses.append(self.has_tags(tag, tag_match))
         
         if author_id:
-            query = query.filter(self.model.author_id == author_id)
+            clauses.append(self.model.author_id == author_id)
             
         if institution_id:
-            query = query.filter(self.model.institution_id == institution_id)
+            clauses.append(self.model.institution_id == institution_id)
             
         if psychologist_id:
-            query = query.filter(self.model.psychologist_id == psychologist_id)
-            
-        if status:
-            query = query.filter(self.model.status == status)
+            clauses.append(self.model.psychologist_id == psychologist_id)
         
-        return query.offset(skip).limit(limit).all()
+        return clauses
+
+    def has_tags(self, values: Union[str, Sequence[str]], match: str = "any") -> ColumnElement:
+        """
+        Filter on article_tags: articles having any (OR) or all (AND) of
+        `values`. Each tag is a lookup on the (value, article_id) key.
+        """
+        table = ArticleTag.__table__
+        if isinstance(values, str):
+            values = [values]
+        values = list(dict.fromkeys(values))
+        if match == "all":
+            return and_(*(
+                self.model.id.in_(select(table.c.article_id).where(table.c.value == value))
+                for value in values
+            ))
+        return self.model.id.in_(select(table.c.article_id).where(table.c.value.in_(values)))
+
+    def select_tag_counts(self, *, limit: int = 100) -> Select:
+        """Tags of published articles with their counts, most used first."""
+        counts = ArticleTagCount.__table__
+        return (
+            select(counts.c.value, counts.c.published)
+            .where(counts.c.published > 0)
+            .order_by(counts.c.published.desc(), counts.c.value)
+            .limit(limit)
+        )
+
+    # Search ranks in two tiers: articles matching every term in the title,
+    # preview or tags first, then those that need the body to match. Each tier
+    # is ranked by bm25 over all of its matches inside FTS5, and the body tier
+    # is only ranked once the first one runs out.
+
+    def search_match(self, stems: Sequence[str], *, head: bool) -> str:
+        """FTS5 query of one tier for the stems of a user query."""
+        terms = " ".join(f'"{stem}"' for stem in stems)
+        match = f"{{title preview tags}} : ({terms})"
+        if not head:
+            match = f"({terms}) NOT ({match})"
+        return match
+
+    def _select_matches(
+        self,
+        query: Select,
+        match: str,
+        *,
+        status: Optional[str] = None,
+        **filters: Any
+    ) -> Select:
+        docs = ArticleSearchDoc
+        query = query.select_from(article_search).join(
+            docs, docs.id == article_search.c.rowid
+        ).where(literal_column("article_search").op("MATCH")(match))
+        if status:
+            query = query.where(docs.status == status)
+        clauses = self.filter_clauses(**filters)
+        if clauses:
+            query = query.join(self.model, self.model.id == docs.article_id).where(*clauses)
+        return query
+
+    def select_search(self, match: str, *, skip: int = 0, limit: int = 100, **filters: Any) -> Select:
+        rank = func.bm25(literal_column("article_search"), *SEARCH_WEIGHTS)
+        query = self._select_matches(select(ArticleSearchDoc.article_id), match, **filters)
+        return query.order_by(rank, article_search.c.rowid).offset(skip).limit(limit)
+
+    def select_search_count(self, match: str, **filters: Any) -> Select:
+        return self._select_matches(select(func.count()), match, **filters)
+
+    def select_by_ids(self, ids: Sequence[str], *, load: Optional[LoadPlan] = None) -> Select:
+        # search_hits() highlights in these columns, whatever the plan defers
+        load = {
+            path: strategy for path, strategy in (load or {}).items()
+            if path not in ("title", "preview", "content")
+        }
+        return select(self.model).options(*self.loader_options(load)).where(self.model.id.in_(ids))
+
+    def search_hits(
+        self, articles: Sequence[Article], ids: Sequence[str], stems: Sequence[str]
+    ) -> List[SearchHit]:
+        by_id = {article.id: article for article in articles}
+        return [
+            (
+                by_id[id],
+                highlight(by_id[id].content, stems)
+                or highlight(by_id[id].preview, stems)
+                or highlight(by_id[id].title, stems),
+            )
+            for id in ids
+            if id in by_id
+        ]
+
+    # Bulk counterparts of validate_status and the search index and tag hooks
+    # in api.models.article
+
+    bulk_tracked = ("status",)
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        if insert and values.get("status") == ArticleStatus.PUBLISHED:
+            values.setdefault("published_at", datetime.utcnow())
+        return values
+
+    def bulk_inserted(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        replace_tags(connection, {row["id"]: row.get("tags") for row in rows})
+        deltas: Counter = Counter()
+        for row in rows:
+            count_tags(deltas, row.get("tags"), row.get("status"), 1)
+        shift_tag_counts(connection, deltas)
+        if connection.dialect.name == "sqlite":
+            for row in rows:
+                index_article(connection, row["id"], row)
+
+    def bulk_updated(
+        self, connection: Connection, rows: List[Dict[str, Any]], old: Dict[Any, Row]
+    ) -> None:
+        table = self.model.__table__
+        published = [row["id"] for row in rows if row.get("status") == ArticleStatus.PUBLISHED]
+        if published:
+            connection.execute(
+                update(table)
+                .where(table.c.id.in_(published), table.c.published_at.is_(None))
+                .values(published_at=datetime.utcnow())
+            )
+        tagged = [row for row in rows if "tags" in row or "status" in row]
+        if tagged:
+            before = stored_tags(connection, [row["id"] for row in tagged])
+            deltas: Counter = Counter()
+            for row in tagged:
+                status = old[row["id"]].status
+                tags = before.get(row["id"], [])
+                count_tags(deltas, tags, status, -1)
+                count_tags(deltas, row.get("tags", tags), row.get("status", status), 1)
+            replace_tags(connection, {row["id"]: row["tags"] for row in tagged if "tags" in row})
+            shift_tag_counts(connection, deltas)
+        if connection.dialect.name != "sqlite":
+            return
+        # article id -> whether the indexed text changed, or only the status
+        changed = {
+            row["id"]: any(name in row for name in SEARCH_COLUMNS)
+            for row in rows
+            if "status" in row or any(name in row for name in SEARCH_COLUMNS)
+        }
+        if not changed:
+            return
+        columns = [table.c.id, table.c.status, *(table.c[name] for name in SEARCH_COLUMNS)]
+        current = connection.execute(select(*columns).where(table.c.id.in_(list(changed))))
+        for row in current.mappings():
+            index_article(connection, row["id"], row, text=changed[row["id"]])
+
+    def bulk_deleting(self, connection: Connection, old: Dict[Any, Row]) -> None:
+        before = stored_tags(connection, list(old))
+        deltas: Counter = Counter()
+        for article_id, row in old.items():
+            count_tags(deltas, before.get(article_id, []), row.status, -1)
+        shift_tag_counts(connection, deltas)
+        replace_tags(connection, {article_id: [] for article_id in old})
+        if connection.dialect.name == "sqlite":
+            for article_id in old:
+                unindex_article(connection, article_id)
+
+class CRUDArticle(ArticleQuery, CRUDBase[Article, ArticleCreate, ArticleUpdate]):
+    def search(
+        self,
+        db: Session,
+        q: str,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        load: Optional[LoadPlan] = None,
+        status: Optional[str] = ArticleStatus.PUBLISHED,
+        **filters: Any
+    ) -> List[SearchHit]:
+        """Articles matching `q`, best first, each with a highlighted snippet."""
+        stems = search_stems(q)
+        ids: List[str] = []
+        for head in (True, False):
+            if not stems or len(ids) >= limit:
+                break
+            match = self.search_match(stems, head=head)
+            page = db.execute(self.select_search(
+                match, skip=skip, limit=limit - len(ids), status=status, **filters
+            )).scalars().all()
+            if skip and not page:
+                count = db.execute(self.select_search_count(
+                    match, status=status, **filters
+                )).scalar()
+                skip = max(skip - count, 0)
+            else:
+                skip = 0
+            ids.extend(page)
+        if not ids:
+            return []
+        articles = db.execute(self.select_by_ids(ids, load=load)).unique().scalars().all()
+        return self.search_hits(articles, ids, stems)
 
     def publish(
         self,
@@ -44,12 +284,11 @@ class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
         *,
         db_obj: Article,
     ) -> Article:
-        db_obj.status = ArticleStatus.PUBLISHED
-        db_obj.published_at = datetime.utcnow()
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.update(
+            db,
+            db_obj=db_obj,
+            obj_in={"status": ArticleStatus.PUBLISHED, "published_at": datetime.utcnow()},
+        )
 
     def archive(
         self,
@@ -57,11 +296,75 @@ class CRUDArticle(CRUDBase[Article, ArticleCreate, ArticleUpdate]):
         *,
         db_obj: Article,
     ) -> Article:
-        db_obj.status = ArticleStatus.ARCHIVED
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.update(db, db_obj=db_obj, obj_in={"status": ArticleStatus.ARCHIVED})
+
+    def get_tag_counts(self, db: Session, *, limit: int = 100) -> List[Tuple[str, int]]:
+        return [(value, count) for value, count in db.execute(self.select_tag_counts(limit=limit))]
+
+class AsyncCRUDArticle(ArticleQuery, AsyncCRUDBase[Article, ArticleCreate, ArticleUpdate]):
+    async def search(
+        self,
+        db: AsyncSession,
+        q: str,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        load: Optional[LoadPlan] = None,
+        status: Optional[str] = ArticleStatus.PUBLISHED,
+        **filters: Any
+    ) -> List[SearchHit]:
+        stems = search_stems(q)
+        ids: List[str] = []
+        for head in (True, False):
+            if not stems or len(ids) >= limit:
+                break
+            match = self.search_match(stems, head=head)
+            page = (await db.execute(self.select_search(
+                match, skip=skip, limit=limit - len(ids), status=status, **filters
+            ))).scalars().all()
+            if skip and not page:
+                count = (await db.execute(self.select_search_count(
+                    match, status=status, **filters
+                ))).scalar()
+                skip = max(skip - count, 0)
+            else:
+                skip = 0
+            ids.extend(page)
+        if not ids:
+            return []
+        articles = (await db.execute(self.select_by_ids(ids, load=load))).unique().scalars().all()
+        return self.search_hits(articles, ids, stems)
+
+    async def publish(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Article,
+        load: Optional[LoadPlan] = None,
+    ) -> Article:
+        return await self.update(
+            db,
+            db_obj=db_obj,
+            obj_in={"status": ArticleStatus.PUBLISHED, "published_at": datetime.utcnow()},
+            load=load,
+        )
+
+    async def archive(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Article,
+        load: Optional[LoadPlan] = None,
+    ) -> Article:
+        return await self.update(
+            db, db_obj=db_obj, obj_in={"status": ArticleStatus.ARCHIVED}, load=load
+        )
+
+    async def get_tag_counts(
+        self, db: AsyncSession, *, limit: int = 100
+    ) -> List[Tuple[str, int]]:
+        result = await db.execute(self.select_tag_counts(limit=limit))
+        return [(value, count) for value, count in result]
 
 crud_article = CRUDArticle(Article)
-```
\ No newline at end of file
+async_crud_article = AsyncCRUDArticle(Article)
\ No newline at end of file
@@ -1,8 +1,30 @@
-from api.crud.base import CRUDBase
+from typing import Any, Optional
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from api.crud.base import AsyncCRUDBase, CRUDBase, LoadPlan, QueryBase
 from api.models.client import Client
 from api.schemas.client import ClientCreate, ClientUpdate
 
-class CRUDClient(CRUDBase[Client, ClientCreate, ClientUpdate]):
-    pass
+class ClientQuery(QueryBase[Client]):
+    def select_by_user_id(self, user_id: Any, *, load: Optional[LoadPlan] = None) -> Select:
+        return (
+            select(self.model)
+            .options(*self.loader_options(load))
+            .where(self.model.user_id == user_id)
+        )
 
-crud_client = CRUDClient(Client)
\ No newline at end of file
+class CRUDClient(ClientQuery, CRUDBase[Client, ClientCreate, ClientUpdate]):
+    def get_by_user_id(
+        self, db: Session, *, user_id: Any, load: Optional[LoadPlan] = None
+    ) -> Optional[Client]:
+        return db.scalars(self.select_by_user_id(user_id, load=load)).first()
+
+class AsyncCRUDClient(ClientQuery, AsyncCRUDBase[Client, ClientCreate, ClientUpdate]):
+    async def get_by_user_id(
+        self, db: AsyncSession, *, user_id: Any, load: Optional[LoadPlan] = None
+    ) -> Optional[Client]:
+        return (await db.scalars(self.select_by_user_id(user_id, load=load))).first()
+
+crud_client = CRUDClient(Client)
+async_crud_client = AsyncCRUDClient(Client)
\ No newline at end of file
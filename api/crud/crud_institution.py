@@ -1,26 +1,54 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from api.crud.base import CRUDBase
+from typing import Any, Dict, Optional
+from sqlalchemy import Select, select
+from api.core.geo import DEFAULT_RADIUS_KM
+from api.core.text import city_from_address, normalize_city
+from api.crud.base import AsyncCRUDBase, CRUDBase, LoadPlan, NearQuery, Point
 from api.models.institution import Institution
 from api.schemas.institution import InstitutionCreate, InstitutionUpdate
 
-class CRUDInstitution(CRUDBase[Institution, InstitutionCreate, InstitutionUpdate]):
-    def get_multi(
+class InstitutionQuery(NearQuery[Institution]):
+    catalogs = ("institutions",)
+
+    def select_multi(
         self,
-        db: Session,
         *,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
+        load: Optional[LoadPlan] = None,
         city: Optional[str] = None,
         is_verified: Optional[bool] = None,
-    ) -> List[Institution]:
-        query = db.query(self.model)
+        near: Optional[Point] = None,
+        radius_km: float = DEFAULT_RADIUS_KM,
+    ) -> Select:
+        query = select(self.model).options(*self.loader_options(load))
         
         if city:
-            query = query.filter(self.model.address.ilike(f'%{city}%'))
+            query = query.filter(self.model.city_key == normalize_city(city))
         if is_verified is not None:
             query = query.filter(self.model.is_verified == is_verified)
+        if near is not None:
+            return self.paginate_near(
+                query, near, radius_km, skip=skip, limit=limit, cursor=cursor
+            )
         
-        return query.offset(skip).limit(limit).all()
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+
+    # Institution.validate_address and validate_coordinates, for bulk writes
+
+    bulk_tracked = ("latitude", "longitude")
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        values = super().bulk_values(values, insert=insert)
+        if "address" in values:
+            values["city_key"] = normalize_city(city_from_address(values["address"]))
+        return values
+
+class CRUDInstitution(InstitutionQuery, CRUDBase[Institution, InstitutionCreate, InstitutionUpdate]):
+    pass
+
+class AsyncCRUDInstitution(InstitutionQuery, AsyncCRUDBase[Institution, InstitutionCreate, InstitutionUpdate]):
+    pass
 
-crud_institution = CRUDInstitution(Institution)
\ No newline at end of file
+crud_institution = CRUDInstitution(Institution)
+async_crud_institution = AsyncCRUDInstitution(Institution)
\ No newline at end of file
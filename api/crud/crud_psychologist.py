@@ -1,29 +1,151 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from api.crud.base import CRUDBase
-from api.models.psychologist import Psychologist
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Union
+from sqlalchemy import ColumnElement, Row, Select, Table, and_, exists, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.core.text import normalize_city
+from api.core.geo import DEFAULT_RADIUS_KM
+from api.crud.base import AsyncCRUDBase, CRUDBase, LoadPlan, NearQuery, Point
+from api.db.facets import Facets, psychologist_facets
+from api.models.psychologist import (
+    Psychologist, TERM_TABLES, mark_changed, shift_psychologists_counts, term_rows,
+)
+from api.models.review import Review, delete_reviews
 from api.schemas.psychologist import PsychologistCreate, PsychologistUpdate
 
-class CRUDPsychologist(CRUDBase[Psychologist, PsychologistCreate, PsychologistUpdate]):
-    def get_multi(
+class PsychologistQuery(NearQuery[Psychologist]):
+    sort_columns = ("rating", "id")
+    sort_descending = True
+    # Institutions show how many psychologists they have
+    catalogs = ("psychologists", "institutions")
+
+    def has_terms(
+        self, column: str, values: Union[str, Sequence[str]], match: str = "any"
+    ) -> ColumnElement:
+        """
+        Filter on the side table of a JSON list column: psychologists having
+        any (OR) or all (AND) of `values`. Each test is a correlated primary
+        key probe, so a catalog page stops after `limit` matches.
+        """
+        table: Table = TERM_TABLES[column]
+        if isinstance(values, str):
+            values = [values]
+        values = list(dict.fromkeys(values))
+        owner = table.c.psychologist_id == self.model.id
+        if match == "all":
+            return and_(*(
+                exists().where(table.c.value == value, owner) for value in values
+            ))
+        return exists().where(table.c.value.in_(values), owner)
+
+    def select_multi(
         self,
-        db: Session,
         *,
         skip: int = 0,
         limit: int = 100,
-        specialization: Optional[str] = None,
+        cursor: Optional[str] = None,
+        load: Optional[LoadPlan] = None,
+        specialization: Optional[Union[str, Sequence[str]]] = None,
+        language: Optional[Union[str, Sequence[str]]] = None,
+        match: str = "any",
         city: Optional[str] = None,
         min_rating: Optional[float] = None,
-    ) -> List[Psychologist]:
-        query = db.query(self.model)
+        near: Optional[Point] = None,
+        radius_km: float = DEFAULT_RADIUS_KM,
+    ) -> Select:
+        query = select(self.model).options(*self.loader_options(load))
         
         if specialization:
-            query = query.filter(self.model.specializations.contains([specialization]))
+            query = query.filter(self.has_terms("specializations", specialization, match))
+        if language:
+            query = query.filter(self.has_terms("languages", language, match))
         if city:
-            query = query.filter(self.model.location['city'].astext == city)
+            query = query.filter(self.model.city_key == normalize_city(city))
         if min_rating is not None:
             query = query.filter(self.model.rating >= min_rating)
+        if near is not None:
+            return self.paginate_near(
+                query, near, radius_km, skip=skip, limit=limit, cursor=cursor
+            )
         
-        return query.offset(skip).limit(limit).all()
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+
+    # Bulk counterparts of validate_location and the term/count hooks in
+    # api.models.psychologist
+
+    bulk_tracked = ("institution_id", "latitude", "longitude")
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        values = super().bulk_values(values, insert=insert)
+        if "location" in values:
+            values["city_key"] = normalize_city((values["location"] or {}).get("city"))
+        return values
+
+    def _insert_terms(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        for column, table in TERM_TABLES.items():
+            terms = [term for row in rows for term in term_rows(row["id"], row.get(column))]
+            if terms:
+                connection.execute(table.insert(), terms)
+
+    def bulk_inserted(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        mark_changed(connection, (row["id"] for row in rows))
+        self._insert_terms(connection, rows)
+        shift_psychologists_counts(connection, Counter(row.get("institution_id") for row in rows))
+
+    def bulk_updated(
+        self, connection: Connection, rows: List[Dict[str, Any]], old: Dict[Any, Row]
+    ) -> None:
+        super().bulk_updated(connection, rows, old)
+        mark_changed(connection, (row["id"] for row in rows))
+        for column, table in TERM_TABLES.items():
+            changed = [row for row in rows if column in row]
+            if changed:
+                ids = [row["id"] for row in changed]
+                connection.execute(table.delete().where(table.c.psychologist_id.in_(ids)))
+                terms = [term for row in changed for term in term_rows(row["id"], row[column])]
+                if terms:
+                    connection.execute(table.insert(), terms)
+        deltas: Counter = Counter()
+        for row in rows:
+            before = old[row["id"]].institution_id
+            if "institution_id" in row and row["institution_id"] != before:
+                deltas[before] -= 1
+                deltas[row["institution_id"]] += 1
+        shift_psychologists_counts(connection, deltas)
+
+    def bulk_deleting(self, connection: Connection, old: Dict[Any, Row]) -> None:
+        mark_changed(connection, old)
+        delete_reviews(connection, Review.__table__.c.psychologist_id.in_(list(old)))
+        for table in TERM_TABLES.values():
+            connection.execute(table.delete().where(table.c.psychologist_id.in_(list(old))))
+        deltas: Counter = Counter()
+        for row in old.values():
+            deltas[row.institution_id] -= 1
+        shift_psychologists_counts(connection, deltas)
+
+class CRUDPsychologist(PsychologistQuery, CRUDBase[Psychologist, PsychologistCreate, PsychologistUpdate]):
+    pass
+
+class AsyncCRUDPsychologist(PsychologistQuery, AsyncCRUDBase[Psychologist, PsychologistCreate, PsychologistUpdate]):
+    async def get_facets(
+        self,
+        db: AsyncSession,
+        *,
+        specialization: Sequence[str] = (),
+        language: Sequence[str] = (),
+        match: str = "any",
+        city: Optional[str] = None,
+        min_rating: Optional[float] = None,
+    ) -> Facets:
+        """Counts per facet value under the get_multi filters, see api.db.facets."""
+        return await psychologist_facets.counts(
+            db,
+            specialization=specialization,
+            language=language,
+            match=match,
+            city=city,
+            min_rating=min_rating,
+        )
 
-crud_psychologist = CRUDPsychologist(Psychologist)
\ No newline at end of file
+crud_psychologist = CRUDPsychologist(Psychologist)
+async_crud_psychologist = AsyncCRUDPsychologist(Psychologist)
\ No newline at end of file
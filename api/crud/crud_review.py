@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from api.core.cache import invalidate_catalogs
+from sqlalchemy import Row, Select, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from api.crud.base import AsyncCRUDBase, CRUDBase, LoadPlan, QueryBase
+from api.models.review import Review, apply_reviews
+from api.schemas.review import ReviewCreate, ReviewUpdate
+
+class ReviewQuery(QueryBase[Review]):
+    sort_columns = ("created_at", "id")
+    sort_descending = True
+    # Writes move the psychologist's rating and reviews_count
+    catalogs = ("psychologists",)
+
+    def select_multi(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        load: Optional[LoadPlan] = None,
+        psychologist_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+    ) -> Select:
+        query = select(self.model).options(*self.loader_options(load))
+
+        if psychologist_id:
+            query = query.filter(self.model.psychologist_id == psychologist_id)
+        if author_id:
+            query = query.filter(self.model.author_id == author_id)
+
+        return self.paginate(query, skip=skip, limit=limit, cursor=cursor)
+
+    # Bulk counterparts of the rating hooks in api.models.review
+
+    bulk_tracked = ("psychologist_id", "rating")
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        if insert:
+            values.setdefault("created_at", datetime.utcnow())
+        return values
+
+    def bulk_inserted(self, connection: Connection, rows: List[Dict[str, Any]]) -> None:
+        apply_reviews(connection, [(row.get("psychologist_id"), row.get("rating"), 1) for row in rows])
+
+    def bulk_updated(
+        self, connection: Connection, rows: List[Dict[str, Any]], old: Dict[Any, Row]
+    ) -> None:
+        changes = []
+        for row in rows:
+            before = old[row["id"]]
+            after = (
+                row.get("psychologist_id", before.psychologist_id),
+                row.get("rating", before.rating),
+            )
+            if after != (before.psychologist_id, before.rating):
+                changes += [(before.psychologist_id, before.rating, -1), (*after, 1)]
+        apply_reviews(connection, changes)
+
+    def bulk_deleting(self, connection: Connection, old: Dict[Any, Row]) -> None:
+        apply_reviews(connection, [(row.psychologist_id, row.rating, -1) for row in old.values()])
+
+    def _new_review(self, obj_in: ReviewCreate, author_id: Any) -> Review:
+        return Review(**jsonable_encoder(obj_in), author_id=author_id)
+
+class CRUDReview(ReviewQuery, CRUDBase[Review, ReviewCreate, ReviewUpdate]):
+    def create_with_author(
+        self, db: Session, *, obj_in: ReviewCreate, author_id: Any
+    ) -> Review:
+        db_obj = self._new_review(obj_in, author_id)
+        db.add(db_obj)
+        db.commit()
+        invalidate_catalogs(*self.catalogs)
+        db.refresh(db_obj)
+        return db_obj
+
+class AsyncCRUDReview(ReviewQuery, AsyncCRUDBase[Review, ReviewCreate, ReviewUpdate]):
+    async def create_with_author(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: ReviewCreate,
+        author_id: Any,
+        load: Optional[LoadPlan] = None
+    ) -> Review:
+        return await self._save(db, self._new_review(obj_in, author_id), load)
+
+crud_review = CRUDReview(Review)
+async_crud_review = AsyncCRUDReview(Review)
\ No newline at end of file
@@ -1,22 +1,79 @@
-from typing import Any, Dict, Optional, Union
-from sqlalchemy.orm import Session
-from api.core.security import get_password_hash, verify_password
-from api.crud.base import CRUDBase
+from typing import Any, Dict, Optional, Tuple, Union
+from sqlalchemy import Row, Select, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from api.core.cache import user_cache
+from api.core.security import (
+    async_get_password_hash,
+    async_verify_and_update,
+    get_password_hash,
+    verify_and_update,
+)
+from api.crud.base import AsyncCRUDBase, BulkResult, CRUDBase, QueryBase
+from api.models.review import Review, delete_reviews
 from api.models.user import User
 from api.schemas.user import UserCreate, UserUpdate
 
-class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+class UserQuery(QueryBase[User]):
+    # Every listing embeds its owner's user (name, avatar, verification)
+    catalogs = ("psychologists", "institutions", "articles")
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        db_obj = User(
+    def select_by_email(self, email: str) -> Select:
+        return select(User).options(*self.loader_options()).where(User.email == email)
+
+    # Hashing is left to the callers: the async class runs it on
+    # api.core.security.password_hasher instead of the event loop
+
+    def _new_user(self, obj_in: UserCreate, hashed_password: str) -> User:
+        return User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password,
             name=obj_in.name,
             role=obj_in.role,
             avatar=obj_in.avatar,
         )
+
+    def _update_data(
+        self, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Split the update into column values and the new plain password."""
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        return update_data, update_data.pop("password", None)
+
+    # Cached users are stored as column values, never as instances: an ORM
+    # object can only belong to one session, and requests run concurrently.
+
+    def bulk_values(self, values: Dict[str, Any], *, insert: bool) -> Dict[str, Any]:
+        # Hashed inline, on the caller's thread: bulk user writes are meant for
+        # offline imports, not request handlers
+        if values.get("password"):
+            values["hashed_password"] = get_password_hash(values.pop("password"))
+        return values
+
+    def bulk_deleting(self, connection: Connection, old: Dict[Any, Row]) -> None:
+        # The before_delete hook of api.models.review, for bulk deletes
+        delete_reviews(connection, Review.__table__.c.author_id.in_(list(old)))
+
+    def snapshot(self, user: User) -> Dict[str, Any]:
+        return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+    def restore(self, db: Union[Session, AsyncSession], values: Dict[str, Any]) -> User:
+        """Attach a cached user to `db` as if it had been loaded, without a query."""
+        user = User(**values)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+class CRUDUser(UserQuery, CRUDBase[User, UserCreate, UserUpdate]):
+    def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
+        return db.scalars(self.select_by_email(email)).first()
+
+    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        db_obj = self._new_user(obj_in, get_password_hash(obj_in.password))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -25,22 +82,103 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
-            del update_data["password"]
-            update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        update_data, password = self._update_data(obj_in)
+        if password:
+            update_data["hashed_password"] = get_password_hash(password)
+        email = db_obj.email
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        user_cache.invalidate(email, user.email)
+        return user
+
+    def remove(self, db: Session, *, id: Any) -> User:
+        user = super().remove(db, id=id)
+        user_cache.invalidate(user.email)
+        return user
+
+    # Bulk writes don't load the old emails, so drop the whole cache
+
+    def update_many(self, db: Session, **kwargs: Any) -> BulkResult:
+        result = super().update_many(db, **kwargs)
+        user_cache.clear()
+        return result
+
+    def remove_many(self, db: Session, **kwargs: Any) -> BulkResult:
+        result = super().remove_many(db, **kwargs)
+        user_cache.clear()
+        return result
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = verify_and_update(password, user.hashed_password)
+        if not verified:
+            return None
+        if new_hash:
+            user = self.update(db, db_obj=user, obj_in={"hashed_password": new_hash})
+        return user
+
+class AsyncCRUDUser(UserQuery, AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        return (await db.scalars(self.select_by_email(email))).first()
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        hashed_password = await async_get_password_hash(obj_in.password)
+        return await self._save(db, self._new_user(obj_in, hashed_password))
+
+    async def get_by_email_cached(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        """get_by_email() through user_cache, for the authenticated user lookup."""
+        values = user_cache.get(email)
+        if values is not None:
+            return self.restore(db, values)
+        generation = user_cache.generation
+        user = await self.get_by_email(db, email=email)
+        if user is not None:
+            user_cache.set(email, self.snapshot(user), generation=generation)
+        return user
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        update_data, password = self._update_data(obj_in)
+        if password:
+            update_data["hashed_password"] = await async_get_password_hash(password)
+        email = db_obj.email
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        user_cache.invalidate(email, user.email)
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> User:
+        user = await super().remove(db, id=id)
+        user_cache.invalidate(user.email)
+        return user
+
+    async def update_many(self, db: AsyncSession, **kwargs: Any) -> BulkResult:
+        result = await super().update_many(db, **kwargs)
+        user_cache.clear()
+        return result
+
+    async def remove_many(self, db: AsyncSession, **kwargs: Any) -> BulkResult:
+        result = await super().remove_many(db, **kwargs)
+        user_cache.clear()
+        return result
+
+    async def authenticate(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        user = await self.get_by_email(db, email=email)
+        if not user:
+            return None
+        # End the read transaction so the connection goes back to the pool
+        # while bcrypt runs (the session keeps its objects, expire_on_commit=False)
+        await db.commit()
+        verified, new_hash = await async_verify_and_update(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # The cost settings changed since this hash was made
+            user = await self.update(db, db_obj=user, obj_in={"hashed_password": new_hash})
         return user
 
-crud_user = CRUDUser(User)
\ No newline at end of file
+crud_user = CRUDUser(User)
+async_crud_user = AsyncCRUDUser(User)
\ No newline at end of file
@@ -1,24 +1,9 @@
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from api.core.config import settings
-
-# Create SQLite engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
-
-# Create sessionmaker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create declarative base
-Base = declarative_base()
-
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+# Import the declarative base and all models, so that Base.metadata is
+# complete before it is used by create_all() or Alembic
+from api.db.base_class import Base  # noqa
+from api.models.user import User  # noqa
+from api.models.institution import Institution  # noqa
+from api.models.psychologist import Psychologist  # noqa
+from api.models.client import Client  # noqa
+from api.models.article import Article, ArticleSearchDoc  # noqa
+from api.models.review import Review  # noqa
\ No newline at end of file
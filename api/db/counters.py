@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, bindparam, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from api.models.article import Article
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindCounter:
+    """
+    In-memory increments of an integer column, written back in batches.
+
+    hit() only bumps a dict entry under a lock; flush() swaps the pending
+    counts out and applies them with one executemany UPDATE in a single
+    transaction, so a popular row costs one write per flush instead of one
+    per hit. If the flush fails the counts go back into the buffer.
+
+    Counts pending in this process are lost if it dies without flushing; the
+    app flushes on shutdown (see api.main).
+    """
+
+    def __init__(self, column: Column) -> None:
+        table = column.table
+        self.column = column
+        self._lock = threading.Lock()
+        self._pending: Dict[Any, int] = {}
+        self._stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values({column.key: column + bindparam("hits")})
+        )
+
+    def hit(self, id: Any, count: int = 1) -> None:
+        with self._lock:
+            self._pending[id] = self._pending.get(id, 0) + count
+
+    def pending(self, id: Any) -> int:
+        with self._lock:
+            return self._pending.get(id, 0)
+
+    def total(self, id: Any, persisted: Optional[int]) -> int:
+        """The persisted value plus the increments not flushed yet."""
+        return (persisted or 0) + self.pending(id)
+
+    def _drain(self) -> Dict[Any, int]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore(self, counts: Dict[Any, int]) -> None:
+        with self._lock:
+            for id, count in counts.items():
+                self._pending[id] = self._pending.get(id, 0) + count
+
+    async def flush(self, engine: AsyncEngine) -> int:
+        """Write the pending counts; returns the number of rows touched."""
+        counts = self._drain()
+        if not counts:
+            return 0
+        params = [{"row_id": id, "hits": hits} for id, hits in sorted(counts.items())]
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(self._stmt, params)
+        except BaseException:
+            self._restore(counts)
+            raise
+        return len(params)
+
+    async def run(self, engine: AsyncEngine, interval: float) -> None:
+        """Flush every `interval` seconds until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.flush(engine)
+                except Exception:
+                    logger.exception("Flushing %s failed, will retry", self.column)
+        finally:
+            try:
+                await self.flush(engine)
+            except Exception:
+                # Nothing flushes after this one: log rather than fail the shutdown
+                with self._lock:
+                    lost = len(self._pending)
+                logger.exception("Final flush of %s failed, %d rows not written", self.column, lost)
+
+# Article.views, incremented by GET /api/articles/{id}
+article_views = WriteBehindCounter(Article.views)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from api.core.config import Settings
+
+# Named SQLite storage profiles, applied as PRAGMAs on every new connection.
+# busy_timeout goes first so the journal_mode switch waits for other writers.
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Stock SQLite settings: rollback journal, 2 MB page cache, no mmap
+    "default": {},
+    "dev": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -8192,  # negative values are KiB: 8 MB
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+    },
+    "prod-read-heavy": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # 64 MB
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,  # 256 MB
+    },
+    # One-off imports only: a crash mid-load can corrupt the database
+    "bulk-load": {
+        "busy_timeout": 30000,
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -262144,  # 256 MB
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+    },
+}
+
+def storage_pragmas(profile: str) -> Dict[str, Any]:
+    try:
+        return STORAGE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB_STORAGE_PROFILE {profile!r}, "
+            f"expected one of {sorted(STORAGE_PROFILES)}"
+        ) from None
+
+def apply_storage_profile(engine: Engine, profile: str) -> None:
+    pragmas = storage_pragmas(profile)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+class PoolStats:
+    """
+    Running counters for one connection pool.
+
+    Checkouts, wait time and overflow events accumulate from process start;
+    the live size/checked-out/overflow figures are read from the pool itself.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.overflow_events = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def listen(self, engine: Engine) -> None:
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+                # The pool bumps its overflow counter before connecting, so a
+                # positive value means this connection is beyond pool_size
+                if isinstance(engine.pool, QueuePool) and engine.pool.overflow() > 0:
+                    self.overflow_events += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checked_out -= 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "pool": pool.__class__.__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "overflow_events": self.overflow_events,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_avg_ms": round(
+                    self.wait_total * 1000 / self.checkouts, 3
+                ) if self.checkouts else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), overflow=max(pool.overflow(), 0))
+        return data
+
+def _timed_pool_class(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    # Pool.recreate() rebuilds from self.__class__, so the timing survives
+    # engine.dispose()
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                stats.record_wait(time.perf_counter() - started)
+
+    TimedPool.__name__ = base.__name__
+    return TimedPool
+
+def _is_memory_db(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+def _pool_kwargs(
+    settings: Settings, url: str, pool_class: Type[QueuePool], stats: PoolStats
+) -> Dict[str, Any]:
+    if _is_memory_db(url):
+        # In-memory SQLite lives in a single connection; keep the dialect's
+        # default static pool
+        return {}
+    return {
+        "poolclass": _timed_pool_class(pool_class, stats),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _storage_profile(settings: Settings, url: str) -> Optional[str]:
+    if not url.startswith("sqlite"):
+        return None
+    # Fail on a typo at startup rather than on the first connection
+    storage_pragmas(settings.DB_STORAGE_PROFILE)
+    return settings.DB_STORAGE_PROFILE
+
+def build_engine(settings: Settings, stats: PoolStats) -> Engine:
+    url = settings.DATABASE_URL
+    profile = _storage_profile(settings, url)
+    connect_args = {}
+    if profile is not None:
+        connect_args["check_same_thread"] = False  # Needed for SQLite
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        **_pool_kwargs(settings, url, QueuePool, stats),
+    )
+    if profile is not None:
+        apply_storage_profile(engine, profile)
+    stats.listen(engine)
+    return engine
+
+def build_async_engine(settings: Settings, stats: PoolStats) -> AsyncEngine:
+    url = settings.ASYNC_DATABASE_URL
+    profile = _storage_profile(settings, url)
+    engine = create_async_engine(
+        url, **_pool_kwargs(settings, url, AsyncAdaptedQueuePool, stats)
+    )
+    if profile is not None:
+        apply_storage_profile(engine.sync_engine, profile)
+    stats.listen(engine.sync_engine)
+    return engine
@@ -0,0 +1,435 @@
+"""
+In-memory facet counts of the psychologist catalog.
+
+FacetIndex gives every psychologist a slot and keeps, per facet value
+(specialization, language, city) and per hundredth of a rating point, a bitmap
+of the slots that have it: a Python int, so AND/OR over 100k psychologists
+are single C loops over 12.5 KB, and int.bit_count() counts the result.
+Counting a value under the current filters is one AND and one popcount.
+
+Writes are picked up incrementally: the psychologist and review hooks and
+the bulk CRUD hooks mark the psychologists they touch on their connection
+(api.models.psychologist.mark_changed). When the connection goes back to
+the pool after the commit, track() moves the ids to the index; a rollback
+drops them. The next counts() reloads only those rows.
+
+Full builds run off the event loop: run(), started with the app (see
+api.main), builds a new set of bitmaps in a worker thread on the sync
+engine and swaps it in when it is done, every `ttl` seconds (for writes
+made by other processes) and when invalidate() asks for it. Readers keep
+counting on the previous build meanwhile.
+"""
+import asyncio
+import contextlib
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from api.core.config import settings
+from api.core.text import normalize_city
+from api.models.psychologist import (
+    CHANGED_PSYCHOLOGISTS, Psychologist, PsychologistLanguage, PsychologistSpecialization,
+)
+
+logger = logging.getLogger(__name__)
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(bitmap: int) -> int:
+        return bin(bitmap).count("1")
+
+def _bitmap(slots: Iterable[int], size: int) -> int:
+    """One int with the bits of `slots` set, built in a single pass."""
+    buffer = bytearray((size >> 3) + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+def _bucket(rating: float) -> int:
+    # Hundredths of a point, so few rows share the bucket a min_rating falls
+    # in; the epsilon keeps 4.35 * 100 == 434.999... in bucket 435
+    return math.floor(rating * 100 + 1e-9)
+
+# Facet name -> side table of the psychologists' values
+TERM_FACETS = {
+    "specialization": PsychologistSpecialization.__table__,
+    "language": PsychologistLanguage.__table__,
+}
+FACETS = tuple(TERM_FACETS) + ("city",)
+
+class Row(NamedTuple):
+    city: Optional[str]  # normalize_city() key
+    terms: Dict[str, Tuple[str, ...]]  # term facet -> values
+    rating: float
+
+class Facets(NamedTuple):
+    total: int
+    counts: Dict[str, List[Tuple[str, int]]]  # facet -> (value, count), most first
+
+class Bitmaps:
+    """
+    One build of the index: the slots of the psychologists and the bitmaps
+    of their facet values, as loaded by FacetIndex._load(). Cities are
+    counted by their normalize_city() key.
+    """
+
+    def __init__(self, rows: Dict[Any, Row]) -> None:
+        self.slots: Dict[Any, int] = {id: slot for slot, id in enumerate(rows)}
+        self.rows: Dict[int, Row] = {self.slots[id]: row for id, row in rows.items()}
+        self.free: List[int] = []
+        self.size = len(rows)  # slots ever allocated
+        members: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        buckets: Dict[int, List[int]] = {}
+        for slot, row in self.rows.items():
+            if row.city:
+                members["city"].setdefault(row.city, []).append(slot)
+            for facet, values in row.terms.items():
+                for value in values:
+                    members[facet].setdefault(value, []).append(slot)
+            buckets.setdefault(_bucket(row.rating), []).append(slot)
+        self.alive = _bitmap(self.rows, self.size)
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            facet: {value: _bitmap(slots, self.size) for value, slots in values.items()}
+            for facet, values in members.items()
+        }
+        self.buckets = {bucket: _bitmap(slots, self.size) for bucket, slots in buckets.items()}
+        # The rating buckets as sets
+        self.bucket_slots = {bucket: set(slots) for bucket, slots in buckets.items()}
+        self._ratings: Dict[float, int] = {}  # min_rating -> bitmap, until the next write
+
+    def _set(self, bitmaps: Dict[Any, int], key: Any, bit: int, on: bool) -> None:
+        bitmap = bitmaps.get(key, 0)
+        bitmap = bitmap | bit if on else bitmap & ~bit
+        if bitmap:
+            bitmaps[key] = bitmap
+        else:
+            bitmaps.pop(key, None)
+
+    def _place(self, slot: int, row: Optional[Row], on: bool) -> None:
+        if row is None:
+            return
+        bit = 1 << slot
+        if row.city:
+            self._set(self.bitmaps["city"], row.city, bit, on)
+        for facet, values in row.terms.items():
+            for value in values:
+                self._set(self.bitmaps[facet], value, bit, on)
+        bucket = _bucket(row.rating)
+        self._set(self.buckets, bucket, bit, on)
+        if on:
+            self.bucket_slots.setdefault(bucket, set()).add(slot)
+        else:
+            self.bucket_slots.get(bucket, set()).discard(slot)
+
+    def refresh(self, rows: Dict[Any, Row], ids: Sequence[Any]) -> None:
+        """Replace the rows of `ids` with `rows`; ids missing from it are deleted."""
+        for id in ids:
+            slot = self.slots.get(id)
+            if slot is not None:
+                self._place(slot, self.rows.pop(slot, None), False)
+            row = rows.get(id)
+            if row is None:
+                if slot is not None:
+                    del self.slots[id]
+                    self.free.append(slot)
+                    self.alive &= ~(1 << slot)
+                continue
+            if slot is None:
+                if self.free:
+                    slot = self.free.pop()
+                else:
+                    slot, self.size = self.size, self.size + 1
+                self.slots[id] = slot
+                self.alive |= 1 << slot
+            self.rows[slot] = row
+            self._place(slot, row, True)
+        self._ratings = {}
+
+    def _min_rating(self, min_rating: float) -> int:
+        bitmap = self._ratings.get(min_rating)
+        if bitmap is not None:
+            return bitmap
+        edge = _bucket(min_rating)
+        bitmap = 0
+        for bucket, members in self.buckets.items():
+            if bucket > edge:
+                bitmap |= members
+        # The bucket of min_rating and the one below, against float rounding,
+        # are checked row by row
+        slots = [
+            slot
+            for bucket in (edge - 1, edge)
+            for slot in self.bucket_slots.get(bucket, ())
+            if self.rows[slot].rating >= min_rating
+        ]
+        bitmap |= _bitmap(slots, self.size)
+        self._ratings[min_rating] = bitmap
+        return bitmap
+
+    def _terms(self, facet: str, values: Sequence[str], match: str) -> int:
+        bitmaps = self.bitmaps[facet]
+        if match == "all":
+            result = self.alive
+            for value in values:
+                result &= bitmaps.get(value, 0)
+            return result
+        result = 0
+        for value in values:
+            result |= bitmaps.get(value, 0)
+        return result
+
+    def count(
+        self,
+        *,
+        specialization: Sequence[str] = (),
+        language: Sequence[str] = (),
+        match: str = "any",
+        city: Optional[str] = None,
+        min_rating: Optional[float] = None,
+    ) -> Facets:
+        """FacetIndex.count(), with the cities by key."""
+        selected = {"specialization": list(specialization), "language": list(language)}
+        filters: Dict[str, int] = {}
+        for facet, values in selected.items():
+            if values:
+                filters[facet] = self._terms(facet, values, match)
+        city_key = normalize_city(city) if city else None
+        if city:
+            filters["city"] = self.bitmaps["city"].get(city_key, 0)
+        if min_rating is not None:
+            filters["rating"] = self._min_rating(min_rating)
+
+        def matching(*, without: Optional[str] = None) -> int:
+            result = self.alive
+            for name, bitmap in filters.items():
+                if name != without:
+                    result &= bitmap
+            return result
+
+        everything = matching()
+        counts: Dict[str, List[Tuple[str, int]]] = {}
+        for facet in FACETS:
+            ignore_own = facet == "city" or match != "all"
+            base = matching(without=facet) if ignore_own else everything
+            keep = set(selected.get(facet, ())) | ({city_key} if facet == "city" and city_key else set())
+            values = [
+                (value, _popcount(base & bitmap)) for value, bitmap in self.bitmaps[facet].items()
+            ]
+            values = [(value, n) for value, n in values if n or value in keep]
+            values.sort(key=lambda item: (-item[1], item[0]))
+            counts[facet] = values
+        return Facets(_popcount(everything), counts)
+
+class FacetIndex:
+    """
+    Bitmaps of the psychologist catalog. `state` is only touched on the event
+    loop thread and replaced whole by a rebuild; the set of changed ids and
+    the city labels are also written from other threads.
+    """
+
+    # More changed rows than this are reloaded with a full rebuild
+    rebuild_threshold = 5000
+    # Seconds before run() tries again after a failed build
+    retry_interval = 5.0
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        self.ttl = ttl
+        self.built_at: Optional[float] = None
+        self.state: Optional[Bitmaps] = None
+        self.labels: Dict[str, str] = {}  # city key -> city as written, kept across builds
+        self._changed: Set[Any] = set()
+        self._changed_lock = threading.Lock()
+        self._lock: Optional[asyncio.Lock] = None
+        self._due = False  # rebuild asked for by invalidate()
+        # Set while run() is running
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        # The build in progress, and the ids refreshed into the stale
+        # bitmaps meanwhile, to refresh again into the new ones
+        self._building: Optional["asyncio.Future[Bitmaps]"] = None
+        self._rebuilding: Optional[Set[Any]] = None
+
+    # Change tracking
+
+    def touch(self, psychologist_ids: Iterable[Any]) -> None:
+        with self._changed_lock:
+            self._changed.update(psychologist_ids)
+
+    def _drain(self) -> Set[Any]:
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def invalidate(self) -> None:
+        """
+        Schedule a rebuild, after Core writes to many rows. Counts keep
+        coming from the current bitmaps until it is done.
+        """
+        self._due = True
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            loop.call_soon_threadsafe(wake.set)
+
+    def _stale(self) -> bool:
+        return self._due or self.built_at is None or time.monotonic() - self.built_at > self.ttl
+
+    def track(self, engine: Engine) -> None:
+        """Feed the ids that commits on `engine` marked changed into the index."""
+
+        @event.listens_for(engine, "rollback")
+        def rollback(conn):
+            conn.info.pop(CHANGED_PSYCHOLOGISTS, None)
+
+        @event.listens_for(engine, "checkin")
+        def checkin(dbapi_connection, connection_record):
+            changed = connection_record.info.pop(CHANGED_PSYCHOLOGISTS, None)
+            if changed:
+                self.touch(changed)
+
+    # Loading
+
+    def _load(self, session: Session, ids: Optional[Sequence[Any]] = None) -> Dict[Any, Row]:
+        p = Psychologist.__table__
+        query = select(p.c.id, p.c.city_key, p.c.rating)
+        if ids is not None:
+            query = query.where(p.c.id.in_(ids))
+        rows: Dict[Any, Row] = {}
+        for id, city, rating in session.execute(query):
+            rows[id] = Row(city, {facet: () for facet in TERM_FACETS}, rating or 0.0)
+        for facet, table in TERM_FACETS.items():
+            query = select(table.c.psychologist_id, table.c.value)
+            if ids is not None:
+                query = query.where(table.c.psychologist_id.in_(ids))
+            values: Dict[Any, List[str]] = {}
+            for id, value in session.execute(query):
+                values.setdefault(id, []).append(value)
+            for id, terms in values.items():
+                if id in rows:
+                    rows[id].terms[facet] = tuple(terms)
+        self._load_labels(session, {row.city for row in rows.values() if row.city})
+        return rows
+
+    def _load_labels(self, session: Session, cities: Set[str]) -> None:
+        """The city as written of the keys not labelled yet, from one row each."""
+        missing = sorted(cities - self.labels.keys())
+        if not missing:
+            return
+        p = Psychologist.__table__
+        first = (
+            select(func.min(p.c.id))
+            .where(p.c.city_key.in_(missing))
+            .group_by(p.c.city_key)
+        )
+        query = select(p.c.city_key, p.c.location).where(p.c.id.in_(first))
+        for city, location in session.execute(query):
+            self.labels[city] = (location or {}).get("city") or city
+
+    def _build(self, session: Session) -> Bitmaps:
+        return Bitmaps(self._load(session))
+
+    def _refresh(self, session: Session, ids: List[Any]) -> None:
+        self.state.refresh(self._load(session, ids), ids)
+
+    def _build_with(self, engine: Engine) -> Bitmaps:
+        with Session(engine) as session:
+            return self._build(session)
+
+    async def _rebuild(self, engine: Engine) -> None:
+        # Committed before the build reads anything, so it includes them
+        changed = self._drain()
+        self._rebuilding = set()
+        try:
+            self._building = asyncio.get_running_loop().run_in_executor(
+                None, self._build_with, engine
+            )
+            state = await self._building
+        except BaseException:
+            self.touch(changed)
+            raise
+        finally:
+            self._building = None
+            rebuilding, self._rebuilding = self._rebuilding, None
+        # May have been committed after the build read them
+        self.touch(rebuilding)
+        self.state = state
+        self.built_at = time.monotonic()
+
+    async def run(self, engine: Engine) -> None:
+        """
+        Build the bitmaps in a worker thread on `engine`, a sync engine: at
+        once, then every `ttl` seconds and on invalidate(), until cancelled.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                if not self._stale():
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(
+                            self._wake.wait(), self.built_at + self.ttl - time.monotonic()
+                        )
+                    self._wake.clear()
+                    continue
+                self._due = False
+                try:
+                    await self._rebuild(engine)
+                except Exception:
+                    logger.exception("Building the facet index failed, will retry")
+                    self._due = True
+                    await asyncio.sleep(self.retry_interval)
+        finally:
+            self._loop = self._wake = None
+
+    async def _sync(self, db: AsyncSession) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.state is None and self._building is not None:
+                # The first build of run()
+                await asyncio.shield(self._building)
+            changed = self._drain()
+            if len(changed) > self.rebuild_threshold:
+                # Left to the rebuild, which reloads every row anyway
+                self.touch(changed)
+                self.invalidate()
+                changed = set()
+            if self.state is None or (self._loop is None and self._stale()):
+                # Nothing to count on and no build to wait for, or run() is
+                # not running (scripts, benchmarks): build here
+                self._due = False
+                self._drain()
+                self.state = await db.run_sync(self._build)
+                self.built_at = time.monotonic()
+                return
+            if self._rebuilding is not None:
+                self._rebuilding.update(changed)
+            changed_ids = sorted(changed)
+            for start in range(0, len(changed_ids), 500):
+                await db.run_sync(self._refresh, changed_ids[start:start + 500])
+
+    # Counting
+
+    def count(self, **filters: Any) -> Facets:
+        """
+        Number of psychologists per facet value under the filters. A value
+        counts the results the filters would give with it selected: with
+        `match` "any" a facet's own selection is ignored, since selecting one
+        more value widens the result; with "all" it narrows it and is kept.
+        City is single-valued, so its own filter is always ignored.
+        """
+        facets = self.state.count(**filters)
+        facets.counts["city"] = [(self.labels.get(key, key), n) for key, n in facets.counts["city"]]
+        return facets
+
+    async def counts(self, db: AsyncSession, **filters: Any) -> Facets:
+        """count() over an index brought up to date with the committed writes."""
+        await self._sync(db)
+        return self.count(**filters)
+
+psychologist_facets = FacetIndex(settings.FACETS_REBUILD_INTERVAL)
@@ -0,0 +1,331 @@
+"""
+Streaming fixture loader.
+
+Reads fixtures one record at a time and writes them with the bulk CRUD
+methods (create_many) in chunks, so memory stays flat and the side tables
+and aggregates are maintained as for any other bulk write. Accepted inputs:
+
+- a JSON document {"users": [record, ...], "institutions": [...], ...}, as
+  in api/fixtures/initial_data.json;
+- a JSON array of records, as written by Django's dumpdata;
+- NDJSON (.ndjson/.jsonl), one record per line.
+
+A record is {"model": "api.user", "pk": 1, "fields": {...}} or a flat dict
+with an "id". Foreign keys are checked with one query per chunk and column;
+records pointing at missing rows are reported and skipped.
+"""
+import json
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from sqlalchemy import DateTime, select
+from sqlalchemy.orm import Session
+from api.crud import (
+    crud_article, crud_client, crud_institution, crud_psychologist, crud_review, crud_user,
+)
+from api.models.user import UserRole
+
+class Section(NamedTuple):
+    crud: Any
+    renames: Dict[str, str]  # fixture field -> column
+    references: Dict[str, str]  # column -> section holding the referenced rows
+    # Aggregates the bulk hooks maintain from the loaded rows; fixture values
+    # for them would be counted twice
+    derived: Tuple[str, ...] = ()
+
+SECTIONS: Dict[str, Section] = {
+    "users": Section(crud_user, {}, {}),
+    "institutions": Section(
+        crud_institution, {"user": "user_id"}, {"user_id": "users"}, ("psychologists_count",)
+    ),
+    "psychologists": Section(
+        crud_psychologist,
+        {"user": "user_id", "institution": "institution_id"},
+        {"user_id": "users", "institution_id": "institutions"},
+        (
+            "rating", "reviews_count", "rating_sum",
+            "ratings_1", "ratings_2", "ratings_3", "ratings_4", "ratings_5",
+        ),
+    ),
+    "clients": Section(crud_client, {"user": "user_id"}, {"user_id": "users"}),
+    "articles": Section(
+        crud_article,
+        {"author": "author_id", "institution": "institution_id", "psychologist": "psychologist_id"},
+        {"author_id": "users", "institution_id": "institutions", "psychologist_id": "psychologists"},
+    ),
+    "reviews": Section(
+        crud_review,
+        {"author": "author_id", "psychologist": "psychologist_id"},
+        {"author_id": "users", "psychologist_id": "psychologists"},
+    ),
+}
+
+# Django model labels of the sections
+MODEL_SECTIONS = {f"api.{name[:-1]}": name for name in SECTIONS}
+
+# Role names of older fixtures
+ROLE_ALIASES = {"institute": UserRole.INSTITUTION}
+
+# A single record larger than this is treated as a syntax error rather than
+# read into memory to the end of the file
+MAX_RECORD_SIZE = 1 << 24
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+class _Reader:
+    """Decodes JSON values one at a time from a text stream."""
+
+    def __init__(self, stream: TextIO, chunk_size: int = 1 << 16) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof or len(self._buffer) - self._pos > MAX_RECORD_SIZE:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-blank character, "" at the end of the stream."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def take(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in fixture, got {self.peek()!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal may go on in the next chunk
+            if end == len(self._buffer) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self) -> Iterator[Any]:
+        self.take("[")
+        if self.peek() == "]":
+            self.take("]")
+            return
+        while True:
+            yield self.value()
+            if self.peek() != ",":
+                break
+            self.take(",")
+        self.take("]")
+
+def _record_section(record: Any) -> Optional[str]:
+    return MODEL_SECTIONS.get(record.get("model")) if isinstance(record, dict) else None
+
+def iter_records(
+    stream: TextIO,
+    *,
+    ndjson: bool = False,
+    on_error: Optional[Callable[[int, str], None]] = None,
+) -> Iterator[Tuple[Optional[str], Any]]:
+    """
+    Yield (section, record) pairs; section is None when it can't be told.
+    NDJSON lines that are not valid JSON are passed to `on_error` with their
+    line number and skipped; without it they raise.
+    """
+    if ndjson:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                if on_error is None:
+                    raise
+                on_error(number, f"Invalid JSON: {exc}")
+                continue
+            yield _record_section(record), record
+        return
+    reader = _Reader(stream)
+    if reader.peek() == "[":
+        for record in reader.array():
+            yield _record_section(record), record
+        return
+    reader.take("{")
+    while reader.peek() != "}":
+        section = reader.value()
+        reader.take(":")
+        for record in reader.array():
+            yield section, record
+        if reader.peek() == ",":
+            reader.take(",")
+    reader.take("}")
+
+def _parse_datetime(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        # Stored as naive UTC, like datetime.utcnow() elsewhere
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class SectionStats:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+class FixtureLoader:
+    """
+    Buffers records per section and writes full chunks with create_many,
+    each chunk in its own transaction. Before a chunk is written, the
+    pending rows of the sections it references are written first, so
+    parents seen earlier in the stream are found by the foreign key check.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        password_hash: str,
+        batch_size: int = 5000,
+        on_error: Optional[Callable[[str, int, str], None]] = None,
+        on_progress: Optional[Callable[[str, SectionStats], None]] = None,
+    ) -> None:
+        self.db = db
+        self.password_hash = password_hash
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda section, number, error: None)
+        self.on_progress = on_progress or (lambda section, stats: None)
+        self.stats: Dict[str, SectionStats] = {}
+        self.pending: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self.counts: Dict[str, int] = {}
+        self._datetimes = {
+            name: {
+                column.key for column in section.crud.model.__table__.c
+                if isinstance(column.type, DateTime)
+            }
+            for name, section in SECTIONS.items()
+        }
+
+    def _error(self, section: str, number: int, error: str) -> None:
+        self.stats.setdefault(section, SectionStats()).errors += 1
+        self.on_error(section, number, error)
+
+    def _row(self, name: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        section = SECTIONS[name]
+        fields = record.get("fields", record)
+        if not isinstance(fields, dict):
+            raise ValueError("Expected the fields as a JSON object")
+        columns = section.crud.model.__table__.c
+        pk = record.get("pk", fields.get("id"))
+        row = {} if pk is None else {"id": str(pk)}
+        for key, value in fields.items():
+            key = section.renames.get(key, key)
+            if key in columns and key not in section.derived and key != "id":
+                row[key] = value
+        for column in section.references:
+            if row.get(column) is not None:
+                row[column] = str(row[column])
+        for column in self._datetimes[name]:
+            if column in row:
+                row[column] = _parse_datetime(row[column])
+        if name == "users":
+            row.setdefault("hashed_password", self.password_hash)
+            if row.get("role") in ROLE_ALIASES:
+                row["role"] = ROLE_ALIASES[row["role"]]
+            UserRole(row.get("role"))  # ValueError on unknown roles
+        return row
+
+    def add(self, section: Optional[str], record: Any) -> None:
+        name = section or "?"
+        number = self.counts[name] = self.counts.get(name, 0) + 1
+        if section not in SECTIONS:
+            self._error(name, number, f"Unknown section, expected one of {sorted(SECTIONS)}")
+            return
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            row = self._row(section, record)
+        except ValueError as exc:
+            self._error(section, number, str(exc))
+            return
+        chunk = self.pending.setdefault(section, [])
+        chunk.append((number, row))
+        if len(chunk) >= self.batch_size:
+            self.flush(section)
+
+    def _dangling(self, name: str, rows: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, str]:
+        """Input number -> error, for rows referencing missing rows."""
+        errors: Dict[int, str] = {}
+        for column, target in SECTIONS[name].references.items():
+            wanted = {row[column] for _, row in rows if row.get(column) is not None}
+            if not wanted:
+                continue
+            table = SECTIONS[target].crud.model.__table__
+            found = set(self.db.scalars(select(table.c.id).where(table.c.id.in_(wanted))))
+            for number, row in rows:
+                if row.get(column) is not None and row[column] not in found:
+                    errors.setdefault(number, f"Unknown {column} {row[column]!r}")
+        return errors
+
+    def flush(self, name: str) -> None:
+        for target in SECTIONS[name].references.values():
+            if target != name and self.pending.get(target):
+                self.flush(target)
+        rows = self.pending.pop(name, [])
+        if not rows:
+            return
+        stats = self.stats.setdefault(name, SectionStats())
+        dangling = self._dangling(name, rows)
+        for number, error in sorted(dangling.items()):
+            self._error(name, number, error)
+        rows = [(number, row) for number, row in rows if number not in dangling]
+        result = SECTIONS[name].crud.create_many(
+            self.db, objs_in=[row for _, row in rows], batch_size=self.batch_size
+        )
+        for position, error in result.errors:
+            self._error(name, rows[position][0], error)
+        stats.rows += len(result.ids)
+        self.on_progress(name, stats)
+
+    def finish(self) -> Dict[str, SectionStats]:
+        for name in SECTIONS:
+            self.flush(name)
+        return self.stats
+
+def load_fixture(
+    db: Session, stream: TextIO, *, ndjson: bool = False, **options: Any
+) -> Dict[str, SectionStats]:
+    """Load every record of `stream`; see FixtureLoader for the options."""
+    loader = FixtureLoader(db, **options)
+    # Malformed NDJSON lines are reported as the "ndjson" section, numbered
+    # by line
+    records = iter_records(
+        stream, ndjson=ndjson, on_error=lambda number, error: loader._error("ndjson", number, error)
+    )
+    for section, record in records:
+        loader.add(section, record)
+    return loader.finish()
@@ -0,0 +1,118 @@
+"""
+Per-request SQL statistics.
+
+instrument() hooks the cursor events of an engine and adds every statement
+to the QueryStats of the current task: the one QueryStatsMiddleware sets for
+a request, or track_queries() for other code. Context variables follow the
+task into SQLAlchemy's async greenlets and into run_in_threadpool, so the
+statements of concurrent requests don't mix.
+
+A statement text run many times in one request, with different parameters,
+is the signature of an N+1 pattern: a lazy load per row of a listing.
+QueryStats.repeated() lists those.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest: Optional[str] = None
+        self.statements: "Counter[str]" = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest = statement
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least `threshold` times, most repeated first."""
+        return [
+            (statement, count) for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self) -> str:
+        return (
+            f"count={self.count}; time_ms={self.seconds * 1000:.1f}; "
+            f"slowest_ms={self.slowest_seconds * 1000:.1f}"
+        )
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Open query_budget() blocks. They count statements from every thread and
+# task; replaced, never mutated, so the event handlers can read it unlocked
+_budgets: Tuple[QueryStats, ...] = ()
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements run by the current task inside the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+def instrument(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        for budget in _budgets:
+            budget.record(statement, seconds)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute doesn't run for a failed statement
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@contextmanager
+def query_budget(max_queries: int, *, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Test helper: fails when the block runs more than `max_queries`
+    statements, or one statement more than `max_repeats` times. Statements
+    are counted from every thread, so requests made through TestClient,
+    which runs the app in a thread of its own, count too.
+
+        with query_budget(3, max_repeats=1):
+            client.get("/api/psychologists/")
+    """
+    global _budgets
+    stats = QueryStats()
+    _budgets = _budgets + (stats,)
+    try:
+        yield stats
+    finally:
+        _budgets = tuple(budget for budget in _budgets if budget is not stats)
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f"{stats.count} statements, budget {max_queries}")
+    if max_repeats is not None:
+        problems += [
+            f"{count}x (budget {max_repeats}): {statement}"
+            for statement, count in stats.repeated(max_repeats + 1)
+        ]
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems))
@@ -0,0 +1,41 @@
+"""
+Rebuild denormalized aggregates from their source tables.
+
+The aggregates are kept up to date incrementally as rows are written
+through the ORM; run this after bulk imports or Core writes that bypass
+those hooks, or to check for drift.
+
+    python -m api.db.reconcile ratings institutions tags
+"""
+import argparse
+from typing import Callable, Dict, Tuple
+from sqlalchemy.engine import Connection
+from api.db.session import engine
+from api.models.article import rebuild_article_tags
+from api.models.psychologist import recount_institutions
+from api.models.review import reconcile_ratings
+
+# Job name -> function rebuilding it on a connection, returning rows touched
+JOBS: Dict[str, Callable[[Connection], int]] = {
+    "ratings": reconcile_ratings,
+    "institutions": recount_institutions,
+    "tags": rebuild_article_tags,
+}
+
+# Cached listings showing each job's aggregates, see api.core.cache
+JOB_CATALOGS: Dict[str, Tuple[str, ...]] = {
+    "ratings": ("psychologists",),
+    "institutions": ("institutions",),
+    "tags": ("articles",),
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("job", nargs="+", choices=sorted(JOBS))
+    args = parser.parse_args()
+    for job in args.job:
+        with engine.begin() as conn:
+            print(f"{job}: {JOBS[job](conn)} rows")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
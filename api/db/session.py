@@ -1,13 +1,44 @@
-from sqlalchemy import create_engine
+from typing import Any, AsyncGenerator, Dict
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from api.core.config import settings
+from api.db.engine import PoolStats, build_async_engine, build_engine
+from api.db.facets import psychologist_facets
+from api.db.query_stats import instrument
 
-engine = create_engine(settings.DATABASE_URL)
+pool_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+# Sync engine, kept for Alembic, init_db and other scripts
+engine = build_engine(settings, pool_stats["sync"])
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request handlers
+async_engine = build_async_engine(settings, pool_stats["async"])
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Statement counts and timings per request, see api.db.query_stats
+instrument(engine)
+instrument(async_engine.sync_engine)
+
+# Committed psychologist writes update the catalog facets, see api.db.facets
+psychologist_facets.track(engine)
+psychologist_facets.track(async_engine.sync_engine)
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    return {
+        "sync": pool_stats["sync"].snapshot(engine.pool),
+        "async": pool_stats["async"].snapshot(async_engine.sync_engine.pool),
+    }
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,16 +1,60 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from api.core.config import settings
-from api.routes import auth, users, psychologists, institutions, clients, articles
-from api.db.base import Base, engine
+from api.core.metrics import metrics
+from api.core.middleware import (
+    MetricsMiddleware, ProfilerMiddleware, QueryStatsMiddleware, ResponseCacheMiddleware,
+)
+from api.core.security import PasswordHasherBusy, password_hasher
+from api.routes import auth, users, psychologists, institutions, clients, articles, reviews, admin
+from api.db.base import Base
+from api.db.counters import article_views
+from api.db.facets import psychologist_facets
+from api.db.session import async_engine, engine
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Buffered article views are written every VIEW_FLUSH_INTERVAL seconds
+    # and once more on shutdown
+    flusher = asyncio.create_task(
+        article_views.run(async_engine, settings.VIEW_FLUSH_INTERVAL)
+    )
+    # Catalog facet bitmaps, rebuilt in a worker thread every
+    # FACETS_REBUILD_INTERVAL seconds and when invalidated
+    facets = asyncio.create_task(psychologist_facets.run(engine))
+    yield
+    for task in (flusher, facets):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    # Let the password checks in progress finish and stop the hashing threads,
+    # off the loop since it waits for them
+    await asyncio.get_running_loop().run_in_executor(None, password_hasher.shutdown)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for CBT Marketplace platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Public listings served from api.core.cache.response_cache. Added before
+# CORS so that CORS stays the outermost layer and covers cached responses.
+app.add_middleware(
+    ResponseCacheMiddleware,
+    routes={
+        "/api/psychologists/": "psychologists",
+        "/api/psychologists/facets": "psychologists",
+        "/api/institutions/": "institutions",
+        "/api/articles/": "articles",
+        "/api/articles/tags": "articles",
+    },
 )
 
 # CORS middleware
@@ -20,8 +64,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+app.add_middleware(
+    ProfilerMiddleware,
+    directory=settings.PROFILE_DIR,
+    interval=settings.PROFILE_INTERVAL,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    keep=settings.PROFILE_KEEP,
 )
 
+if settings.QUERY_STATS:
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=settings.QUERY_REPEAT_THRESHOLD)
+
+# Outermost, so the timings include cached responses and the CORS layer
+app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    # Login/registration storm: shed load rather than queue without bound
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many password checks in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -29,7 +97,14 @@ app.include_router(psychologists.router, prefix="/api/psychologists", tags=["Psy
 app.include_router(institutions.router, prefix="/api/institutions", tags=["Institutions"])
 app.include_router(clients.router, prefix="/api/clients", tags=["Clients"])
 app.include_router(articles.router, prefix="/api/articles", tags=["Articles"])
+app.include_router(reviews.router, prefix="/api/reviews", tags=["Reviews"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to CBT Marketplace API"}
\ No newline at end of file
+    return {"message": "Welcome to CBT Marketplace API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Per-route request counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
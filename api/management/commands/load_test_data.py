@@ -1,41 +1,68 @@
-from django.core.management.base import BaseCommand
-from django.contrib.auth.hashers import make_password
-from api.models import User, Institution, Psychologist, Article
-import json
-
-class Command(BaseCommand):
-    help = 'Load test data into the database'
-
-    def handle(self, *args, **kwargs):
-        self.stdout.write('Loading test data...')
-
-        # Load data from fixture
-        with open('api/fixtures/initial_data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Create users
-        for user_data in data['users']:
-            fields = user_data['fields']
-            fields['password'] = make_password('password123')  # Set a default password
-            User.objects.create(**fields)
-
-        # Create institutions
-        for inst_data in data['institutions']:
-            fields = inst_data['fields']
-            fields['user'] = User.objects.get(pk=fields['user'])
-            Institution.objects.create(**fields)
-
-        # Create psychologists
-        for psych_data in data['psychologists']:
-            fields = psych_data['fields']
-            fields['user'] = User.objects.get(pk=fields['user'])
-            fields['institution'] = Institution.objects.get(pk=fields['institution'])
-            Psychologist.objects.create(**fields)
-
-        # Create articles
-        for article_data in data['articles']:
-            fields = article_data['fields']
-            fields['author'] = User.objects.get(pk=fields['author'])
-            Article.objects.create(**fields)
-
-        self.stdout.write(self.style.SUCCESS('Successfully loaded test data'))
\ No newline at end of file
+"""
+Load a fixture into the database, streaming it in chunks.
+
+Defaults to api/fixtures/initial_data.json. Users get --password, hashed
+once for all of them. Use the bulk-load storage profile for large imports
+into a scratch database.
+
+    python -m api.management.commands.load_test_data catalog.ndjson --profile bulk-load
+"""
+import argparse
+import sys
+import time
+from sqlalchemy.orm import sessionmaker
+from api.core.config import Settings, settings
+from api.core.security import get_password_hash
+from api.db.base import Base
+from api.db.engine import STORAGE_PROFILES, PoolStats, build_engine
+from api.db.loader import SectionStats, load_fixture
+
+# Errors printed per section before only counting them
+MAX_ERRORS_SHOWN = 20
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="api/fixtures/initial_data.json")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--password", default="password123")
+    parser.add_argument(
+        "--profile", default=settings.DB_STORAGE_PROFILE, choices=sorted(STORAGE_PROFILES)
+    )
+    parser.add_argument("--progress", type=float, default=2.0, help="seconds between reports")
+    args = parser.parse_args()
+
+    engine = build_engine(Settings(DB_STORAGE_PROFILE=args.profile), PoolStats())
+    Base.metadata.create_all(bind=engine)
+    shown = {}
+    last_report = [time.perf_counter()]
+
+    def on_error(section: str, number: int, error: str) -> None:
+        shown[section] = shown.get(section, 0) + 1
+        if shown[section] <= MAX_ERRORS_SHOWN:
+            print(f"{section} #{number}: {error}", file=sys.stderr)
+
+    def on_progress(section: str, stats: SectionStats) -> None:
+        now = time.perf_counter()
+        if now - last_report[0] >= args.progress:
+            last_report[0] = now
+            print(f"{section}: {stats.rows} rows, {stats.rate:.0f} rows/s", file=sys.stderr)
+
+    started = time.perf_counter()
+    with sessionmaker(bind=engine, autoflush=False)() as db, open(args.path, encoding="utf-8") as stream:
+        stats = load_fixture(
+            db,
+            stream,
+            ndjson=args.path.endswith((".ndjson", ".jsonl")),
+            password_hash=get_password_hash(args.password),
+            batch_size=args.batch_size,
+            on_error=on_error,
+            on_progress=on_progress,
+        )
+    elapsed = time.perf_counter() - started
+    for section, section_stats in stats.items():
+        print(f"{section}: {section_stats.rows} rows, {section_stats.errors} errors")
+    total = sum(section_stats.rows for section_stats in stats.values())
+    print(f"loaded {total} rows in {elapsed:.1f}s, {total / max(elapsed, 1e-9):.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from api.core.text import city_from_address, normalize_city
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -30,6 +31,7 @@ class Institution(models.Model):
     description = models.TextField('Описание')
     avatar = models.URLField('Логотип')
     address = models.TextField('Адрес')
+    city_key = models.CharField(max_length=255, null=True, blank=True, editable=False, db_index=True)
     psychologists_count = models.IntegerField('Количество специалистов', default=0)
     services = models.JSONField('Услуги', default=list)
     contacts = models.JSONField('Контакты', default=dict)
@@ -42,6 +44,10 @@ class Institution(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.city_key = normalize_city(city_from_address(self.address))
+        super().save(*args, **kwargs)
+
 class Psychologist(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='psychologist')
     description = models.TextField('Описание')
@@ -56,6 +62,7 @@ class Psychologist(models.Model):
     certifications = models.JSONField('Сертификаты', default=list)
     gallery = models.JSONField('Галерея', default=list)
     location = models.JSONField('Местоположение', default=dict)
+    city_key = models.CharField(max_length=255, null=True, blank=True, editable=False, db_index=True)
     contacts = models.JSONField('Контакты', default=dict)
 
     class Meta:
@@ -65,6 +72,10 @@ class Psychologist(models.Model):
     def __str__(self):
         return self.user.name
 
+    def save(self, *args, **kwargs):
+        self.city_key = normalize_city((self.location or {}).get('city'))
+        super().save(*args, **kwargs)
+
 class Client(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='client')
     preferences = models.JSONField('Предпочтения', default=dict)
@@ -1,8 +1,12 @@
-```python
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Text, DateTime, Enum
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Text, DateTime, Enum, Index, DDL, bindparam, event, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import column_property, relationship, validates
+from sqlalchemy.sql import column, func, table
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
 import enum
+from api.core.text import search_text
 from api.db.base_class import Base
 
 class ArticleStatus(str, enum.Enum):
@@ -12,6 +16,10 @@ class ArticleStatus(str, enum.Enum):
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # Sort key of published listings, see CRUDArticle keyset pagination
+        Index("ix_articles_status_published_at_id", "status", "published_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -20,8 +28,11 @@ class Article(Base):
     image = Column(String)
     author_id = Column(String, ForeignKey("users.id"), nullable=False)
     views = Column(Integer, default=0)
-    tags = Column(JSON)  # List of tags
-    status = Column(String, nullable=False, default=ArticleStatus.DRAFT)
+    tags = Column(JSON)  # List of tags, indexed in article_tags
+    # active_history: the tag count hooks need the old value even when it wasn't loaded
+    status = column_property(
+        Column(String, nullable=False, default=ArticleStatus.DRAFT), active_history=True
+    )
     published_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -33,4 +44,247 @@ class Article(Base):
     author = relationship("User", backref="articles")
     institution = relationship("Institution", backref="articles")
     psychologist = relationship("Psychologist", backref="articles")
-```
\ No newline at end of file
+
+    @validates("status")
+    def validate_status(self, key, status):
+        # Published articles always carry published_at, even when created as
+        # published rather than going through CRUDArticle.publish()
+        if status == ArticleStatus.PUBLISHED and self.published_at is None:
+            self.published_at = datetime.utcnow()
+        return status
+
+# Full-text index over articles: an SQLite FTS5 table of the stemmed text
+# (api.core.text.search_text), keyed by the integer id of an ArticleSearchDoc
+# row, since article ids are strings and FTS5 rows are addressed by rowid.
+# The doc row also carries the article status, so search filters on it in the
+# join it makes anyway, and publish/archive don't rewrite the text index.
+
+class ArticleSearchDoc(Base):
+    __tablename__ = "article_search_docs"
+
+    id = Column(Integer, primary_key=True)
+    article_id = Column(
+        String, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    status = Column(String)
+
+SEARCH_COLUMNS = ("title", "preview", "content", "tags")
+
+article_search = table("article_search", column("rowid"), *(column(name) for name in SEARCH_COLUMNS))
+
+event.listen(
+    ArticleSearchDoc.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5("
+        + ", ".join(SEARCH_COLUMNS)
+        + ", tokenize = 'unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    ArticleSearchDoc.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS article_search").execute_if(dialect="sqlite"),
+)
+
+def search_values(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Indexed text of an article from its column values."""
+    row = {name: values.get(name) for name in SEARCH_COLUMNS}
+    row["tags"] = " ".join(row["tags"] or [])
+    return {name: search_text(text) for name, text in row.items()}
+
+def index_article(
+    connection: Connection, article_id: Any, values: Mapping[str, Any], *, text: bool = True
+) -> None:
+    """
+    Add or refresh the search index entry of one article. With text=False
+    only the status is updated.
+    """
+    docs = ArticleSearchDoc.__table__
+    status = values.get("status")
+    status = getattr(status, "value", status)  # ArticleStatus
+    doc_id = connection.execute(
+        select(docs.c.id).where(docs.c.article_id == article_id)
+    ).scalar()
+    if doc_id is None:
+        doc_id = connection.execute(
+            docs.insert().values(article_id=article_id, status=status)
+        ).inserted_primary_key[0]
+        text = True
+    else:
+        connection.execute(docs.update().where(docs.c.id == doc_id).values(status=status))
+        if text:
+            connection.execute(article_search.delete().where(article_search.c.rowid == doc_id))
+    if text:
+        connection.execute(article_search.insert().values(rowid=doc_id, **search_values(values)))
+
+def unindex_article(connection: Connection, article_id: Any) -> None:
+    docs = ArticleSearchDoc.__table__
+    doc_id = connection.execute(
+        select(docs.c.id).where(docs.c.article_id == article_id)
+    ).scalar()
+    if doc_id is not None:
+        connection.execute(article_search.delete().where(article_search.c.rowid == doc_id))
+        connection.execute(docs.delete().where(docs.c.id == doc_id))
+
+# Kept in the flush that writes the article, like the psychologist side tables.
+# Core bulk inserts must call index_article() themselves.
+
+def _article_values(target: Article) -> Dict[str, Any]:
+    return {name: getattr(target, name) for name in SEARCH_COLUMNS + ("status",)}
+
+@event.listens_for(Article, "after_insert")
+def _index_inserted(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        index_article(connection, target.id, _article_values(target))
+
+@event.listens_for(Article, "after_update")
+def _index_updated(mapper, connection, target):
+    if connection.dialect.name != "sqlite":
+        return
+    state = inspect(target)
+    text = any(state.attrs[name].history.has_changes() for name in SEARCH_COLUMNS)
+    if text or state.attrs.status.history.has_changes():
+        index_article(connection, target.id, _article_values(target), text=text)
+
+@event.listens_for(Article, "before_delete")
+def _unindex_deleted(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        unindex_article(connection, target.id)
+
+# Indexed copy of the tags JSON list, one row per (value, article) like the
+# psychologist term tables, and the number of published articles per tag.
+# Both move in the flush that writes the article, so tag pages are index
+# lookups and the tag cloud reads the counts instead of counting. Core writes
+# bypass these hooks; rebuild_article_tags() repairs any drift.
+
+class ArticleTag(Base):
+    __tablename__ = "article_tags"
+
+    value = Column(String, primary_key=True)
+    article_id = Column(
+        String, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+class ArticleTagCount(Base):
+    __tablename__ = "article_tag_counts"
+    __table_args__ = (
+        # Tag cloud order, most used first
+        Index("ix_article_tag_counts_published_value", "published", "value"),
+    )
+
+    value = Column(String, primary_key=True)
+    published = Column(Integer, nullable=False, default=0, server_default="0")
+
+def tag_rows(article_id: Any, tags: Iterable[str]) -> List[Dict[str, Any]]:
+    return [{"value": value, "article_id": article_id} for value in dict.fromkeys(tags or [])]
+
+def stored_tags(connection: Connection, article_ids: Sequence[Any]) -> Dict[Any, List[str]]:
+    """Article id -> its tags as article_tags has them, i.e. before the write."""
+    t = ArticleTag.__table__
+    tags: Dict[Any, List[str]] = {}
+    for value, article_id in connection.execute(
+        select(t.c.value, t.c.article_id).where(t.c.article_id.in_(article_ids))
+    ):
+        tags.setdefault(article_id, []).append(value)
+    return tags
+
+def replace_tags(connection: Connection, tags: Mapping[Any, Iterable[str]]) -> None:
+    """Replace the article_tags rows of the articles in `tags`."""
+    if not tags:
+        return
+    t = ArticleTag.__table__
+    connection.execute(t.delete().where(t.c.article_id.in_(list(tags))))
+    rows = [row for article_id, values in tags.items() for row in tag_rows(article_id, values)]
+    if rows:
+        connection.execute(t.insert(), rows)
+
+def count_tags(deltas: Counter, tags: Iterable[str], status: Any, sign: int) -> None:
+    """Add `sign` to the delta of each tag of an article, if it is published."""
+    if status == ArticleStatus.PUBLISHED:
+        for value in dict.fromkeys(tags or []):
+            deltas[value] += sign
+
+def shift_tag_counts(connection: Connection, deltas: Mapping[str, int]) -> None:
+    """Add tag -> delta to the published counts, creating missing tags."""
+    deltas = {value: delta for value, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    c = ArticleTagCount.__table__
+    existing = set(connection.scalars(select(c.c.value).where(c.c.value.in_(list(deltas)))))
+    if existing:
+        connection.execute(
+            update(c)
+            .where(c.c.value == bindparam("tag"))
+            .values(published=c.c.published + bindparam("delta")),
+            [{"tag": value, "delta": deltas[value]} for value in existing],
+        )
+    missing = [
+        {"value": value, "published": delta}
+        for value, delta in deltas.items() if value not in existing
+    ]
+    if missing:
+        connection.execute(c.insert(), missing)
+
+@event.listens_for(Article, "after_insert")
+def _insert_tags(mapper, connection, target):
+    replace_tags(connection, {target.id: target.tags})
+    deltas: Counter = Counter()
+    count_tags(deltas, target.tags, target.status, 1)
+    shift_tag_counts(connection, deltas)
+
+@event.listens_for(Article, "after_update")
+def _update_tags(mapper, connection, target):
+    state = inspect(target)
+    tags_changed = state.attrs.tags.history.has_changes()
+    status = state.attrs.status.history
+    if not tags_changed and not status.has_changes():
+        return
+    before = stored_tags(connection, [target.id]).get(target.id, [])
+    deltas: Counter = Counter()
+    count_tags(deltas, before, status.deleted[0] if status.deleted else target.status, -1)
+    count_tags(deltas, target.tags if tags_changed else before, target.status, 1)
+    if tags_changed:
+        replace_tags(connection, {target.id: target.tags})
+    shift_tag_counts(connection, deltas)
+
+@event.listens_for(Article, "before_delete")
+def _delete_tags(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    deltas: Counter = Counter()
+    count_tags(
+        deltas,
+        stored_tags(connection, [target.id]).get(target.id, []),
+        history.deleted[0] if history.deleted else target.status,
+        -1,
+    )
+    shift_tag_counts(connection, deltas)
+    t = ArticleTag.__table__
+    connection.execute(t.delete().where(t.c.article_id == target.id))
+
+def rebuild_article_tags(connection: Connection) -> int:
+    """
+    Rebuild article_tags from the tags column and the published counts from
+    article_tags. Returns the number of tags used by published articles.
+    """
+    a = Article.__table__
+    t = ArticleTag.__table__
+    c = ArticleTagCount.__table__
+    connection.execute(t.delete())
+    rows: List[Dict[str, Any]] = []
+    for article_id, tags in connection.execute(select(a.c.id, a.c.tags)):
+        rows.extend(tag_rows(article_id, tags))
+        if len(rows) >= 10000:
+            connection.execute(t.insert(), rows)
+            rows = []
+    if rows:
+        connection.execute(t.insert(), rows)
+    connection.execute(c.delete())
+    counts = (
+        select(t.c.value, func.count().label("published"))
+        .join(a, a.c.id == t.c.article_id)
+        .where(a.c.status == ArticleStatus.PUBLISHED)
+        .group_by(t.c.value)
+    )
+    result = connection.execute(c.insert().from_select(["value", "published"], counts))
+    return result.rowcount
@@ -1,17 +1,43 @@
-from sqlalchemy import Column, String, Integer, Boolean, JSON, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Boolean, Float, JSON, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
+from api.core.geo import encode_geohash
+from api.core.text import city_from_address, normalize_city
 from api.db.base_class import Base
 
 class Institution(Base):
     __tablename__ = "institutions"
+    __table_args__ = (
+        # City filter followed by the listing sort key
+        Index("ix_institutions_city_key_id", "city_key", "id"),
+        # Cell ranges of near= searches, covering their distances and ids
+        Index("ix_institutions_geohash", "geohash", "latitude", "longitude", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     description = Column(Text)
     address = Column(String)
+    city_key = Column(String)  # normalize_city() of the address city
+    # Optional WGS84 coordinates in degrees, and their geohash for the near=
+    # searches, see validate_coordinates
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String)
     psychologists_count = Column(Integer, default=0)
     services = Column(JSON)  # List of services/programs
     contacts = Column(JSON)  # Contact information
     is_verified = Column(Boolean, default=False)
 
-    user = relationship("User", backref="institution_profile")
\ No newline at end of file
+    user = relationship("User", backref="institution_profile")
+
+    @validates("address")
+    def validate_address(self, key, address):
+        self.city_key = normalize_city(city_from_address(address))
+        return address
+
+    @validates("latitude", "longitude")
+    def validate_coordinates(self, key, value):
+        latitude = value if key == "latitude" else self.latitude
+        longitude = value if key == "longitude" else self.longitude
+        self.geohash = encode_geohash(latitude, longitude)
+        return value
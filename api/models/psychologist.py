@@ -1,17 +1,41 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from typing import Any, Iterable, List, Dict, Mapping
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON, Text, Index, bindparam, event, func, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import column_property, relationship, validates
+from api.core.geo import encode_geohash
+from api.core.text import normalize_city
 from api.db.base_class import Base
+from api.models.institution import Institution
 
 class Psychologist(Base):
     __tablename__ = "psychologists"
+    __table_args__ = (
+        # Catalog sort key, see CRUDPsychologist keyset pagination
+        Index("ix_psychologists_rating_id", "rating", "id"),
+        # City filter followed by the same sort key
+        Index("ix_psychologists_city_key_rating_id", "city_key", "rating", "id"),
+        # Cell ranges of near= searches, covering their distances and ids
+        Index("ix_psychologists_geohash", "geohash", "latitude", "longitude", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     description = Column(Text)
     experience = Column(Integer)
-    institution_id = Column(String, ForeignKey("institutions.id"))
-    rating = Column(Float, default=0.0)
+    # active_history: the count hooks need the old value even when it wasn't loaded
+    institution_id = column_property(
+        Column(String, ForeignKey("institutions.id")), active_history=True
+    )
+    # Review aggregates, maintained by the hooks in api.models.review:
+    # rating = rating_sum / reviews_count, ratings_N = number of N-star reviews
+    rating = Column(Float, nullable=False, default=0.0, server_default="0")
     reviews_count = Column(Integer, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    ratings_5 = Column(Integer, nullable=False, default=0, server_default="0")
     specializations = Column(JSON)  # List of specializations
     languages = Column(JSON)  # List of languages
     memberships = Column(JSON)  # List of professional memberships
@@ -19,7 +43,176 @@ class Psychologist(Base):
     certifications = Column(JSON)  # List of certifications
     gallery = Column(JSON)  # List of image URLs
     location = Column(JSON)  # {country: str, city: str}
+    city_key = Column(String)  # normalize_city(location["city"]), see validate_location
+    # Optional WGS84 coordinates in degrees, and their geohash for the near=
+    # searches, see validate_coordinates
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String)
     contacts = Column(JSON)  # Contact information
 
     user = relationship("User", backref="psychologist_profile")
-    institution = relationship("Institution", backref="psychologists")
\ No newline at end of file
+    institution = relationship("Institution", backref="psychologists")
+
+    @property
+    def rating_histogram(self) -> List[int]:
+        return [self.ratings_1, self.ratings_2, self.ratings_3, self.ratings_4, self.ratings_5]
+
+    @validates("location")
+    def validate_location(self, key, location):
+        self.city_key = normalize_city((location or {}).get("city"))
+        return location
+
+    @validates("latitude", "longitude")
+    def validate_coordinates(self, key, value):
+        latitude = value if key == "latitude" else self.latitude
+        longitude = value if key == "longitude" else self.longitude
+        self.geohash = encode_geohash(latitude, longitude)
+        return value
+
+# Ids of the psychologists a transaction wrote, collected in the info of its
+# connection for the in-memory catalog facets (api.db.facets), which pick
+# them up once the connection goes back to the pool after the commit.
+CHANGED_PSYCHOLOGISTS = "changed_psychologists"
+
+def mark_changed(connection: Connection, psychologist_ids: Iterable[Any]) -> None:
+    connection.info.setdefault(CHANGED_PSYCHOLOGISTS, set()).update(
+        id for id in psychologist_ids if id is not None
+    )
+
+@event.listens_for(Psychologist, "after_insert")
+@event.listens_for(Psychologist, "after_update")
+@event.listens_for(Psychologist, "after_delete")
+def _mark_changed(mapper, connection, target):
+    mark_changed(connection, [target.id])
+
+# Indexed copies of the specializations and languages JSON lists, one row per
+# (value, psychologist). The primary key leads with value, so catalog filters
+# are index lookups instead of scans over the JSON text.
+
+class PsychologistSpecialization(Base):
+    __tablename__ = "psychologist_specializations"
+
+    value = Column(String, primary_key=True)
+    psychologist_id = Column(
+        String, ForeignKey("psychologists.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+class PsychologistLanguage(Base):
+    __tablename__ = "psychologist_languages"
+
+    value = Column(String, primary_key=True)
+    psychologist_id = Column(
+        String, ForeignKey("psychologists.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+# JSON list column -> side table holding its values
+TERM_TABLES = {
+    "specializations": PsychologistSpecialization.__table__,
+    "languages": PsychologistLanguage.__table__,
+}
+
+def term_rows(psychologist_id: Any, values: Iterable[str]) -> List[Dict[str, Any]]:
+    return [
+        {"value": value, "psychologist_id": psychologist_id}
+        for value in dict.fromkeys(values or [])
+    ]
+
+def sync_terms(
+    connection: Connection, psychologist_id: Any, column: str, values: Iterable[str]
+) -> None:
+    """Replace the side table rows of one psychologist's `column` list."""
+    table = TERM_TABLES[column]
+    connection.execute(table.delete().where(table.c.psychologist_id == psychologist_id))
+    rows = term_rows(psychologist_id, values)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+# The side tables are maintained in the flush that writes the psychologist, so
+# they commit or roll back together with it. Core bulk inserts bypass these
+# hooks and must call sync_terms() themselves.
+
+@event.listens_for(Psychologist, "after_insert")
+def _insert_terms(mapper, connection, target):
+    for column, table in TERM_TABLES.items():
+        rows = term_rows(target.id, getattr(target, column))
+        if rows:
+            connection.execute(table.insert(), rows)
+
+@event.listens_for(Psychologist, "after_update")
+def _update_terms(mapper, connection, target):
+    state = inspect(target)
+    for column in TERM_TABLES:
+        if state.attrs[column].history.has_changes():
+            sync_terms(connection, target.id, column, getattr(target, column))
+
+@event.listens_for(Psychologist, "before_delete")
+def _delete_terms(mapper, connection, target):
+    for table in TERM_TABLES.values():
+        connection.execute(table.delete().where(table.c.psychologist_id == target.id))
+
+# Institution.psychologists_count moves by one in the same flush as each
+# psychologist insert, delete or institution_id change, so listings read it
+# instead of counting. Core writes bypass these hooks; recount_institutions()
+# repairs any drift.
+
+def shift_psychologists_counts(connection: Connection, deltas: Mapping[Any, int]) -> None:
+    """Add institution id -> delta to the counts, one executemany for all."""
+    params = [
+        {"row_id": institution_id, "delta": delta}
+        for institution_id, delta in deltas.items()
+        if institution_id is not None and delta
+    ]
+    if not params:
+        return
+    i = Institution.__table__
+    stmt = (
+        update(i)
+        .where(i.c.id == bindparam("row_id"))
+        .values(psychologists_count=func.coalesce(i.c.psychologists_count, 0) + bindparam("delta"))
+    )
+    connection.execute(stmt, params)
+
+def shift_psychologists_count(connection: Connection, institution_id: Any, delta: int) -> None:
+    shift_psychologists_counts(connection, {institution_id: delta})
+
+@event.listens_for(Psychologist, "after_insert")
+def _insert_count(mapper, connection, target):
+    shift_psychologists_count(connection, target.institution_id, 1)
+
+@event.listens_for(Psychologist, "after_update")
+def _update_count(mapper, connection, target):
+    history = inspect(target).attrs.institution_id.history
+    if history.has_changes():
+        for old in history.deleted:
+            shift_psychologists_count(connection, old, -1)
+        shift_psychologists_count(connection, target.institution_id, 1)
+
+@event.listens_for(Psychologist, "after_delete")
+def _delete_count(mapper, connection, target):
+    history = inspect(target).attrs.institution_id.history
+    # A psychologist moved and deleted in one flush was counted at the old one
+    institution_id = history.deleted[0] if history.deleted else target.institution_id
+    shift_psychologists_count(connection, institution_id, -1)
+
+def recount_institutions(connection: Connection) -> int:
+    """
+    Recompute every institution's psychologists_count with two set-based
+    UPDATEs: reset all, then fill in from one GROUP BY over psychologists.
+    Returns the number of institutions that have psychologists.
+    """
+    i = Institution.__table__
+    p = Psychologist.__table__
+    connection.execute(update(i).values(psychologists_count=0))
+    counts = (
+        select(p.c.institution_id, func.count().label("psychologists_count"))
+        .where(p.c.institution_id.is_not(None))
+        .group_by(p.c.institution_id)
+        .subquery()
+    )
+    result = connection.execute(
+        update(i)
+        .where(i.c.id == counts.c.institution_id)
+        .values(psychologists_count=counts.c.psychologists_count)
+    )
+    return result.rowcount
\ No newline at end of file
@@ -0,0 +1,188 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+from sqlalchemy import (
+    CheckConstraint, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text,
+    bindparam, case, cast, event, func, inspect, select, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import backref, column_property, relationship
+from api.db.base_class import Base
+from api.models.psychologist import Psychologist, mark_changed
+from api.models.user import User
+
+RATINGS = range(1, 6)
+
+class Review(Base):
+    __tablename__ = "reviews"
+    __table_args__ = (
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_reviews_rating"),
+        # A psychologist's reviews, newest first, see CRUDReview keyset pagination
+        Index("ix_reviews_psychologist_id_created_at_id", "psychologist_id", "created_at", "id"),
+    )
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    author_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # active_history: the rating hooks need the old values even when they
+    # weren't loaded
+    psychologist_id = column_property(
+        Column(String, ForeignKey("psychologists.id", ondelete="CASCADE"), nullable=False),
+        active_history=True,
+    )
+    rating = column_property(Column(Integer, nullable=False), active_history=True)
+    comment = Column(Text)
+    reply = Column(Text)  # Psychologist's answer
+    # Set in Python so that it has the same text format as the keyset cursor
+    # values it is compared with (CURRENT_TIMESTAMP drops the microseconds)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, default=datetime.utcnow, server_default=func.now()
+    )
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Deleting an author or a psychologist deletes their reviews through
+    # delete_reviews(), not by the ORM setting the foreign keys to NULL
+    author = relationship("User", backref=backref("reviews", passive_deletes="all"))
+    psychologist = relationship(
+        "Psychologist", backref=backref("reviews", passive_deletes="all")
+    )
+
+# Psychologist.rating_sum, reviews_count and the ratings_1..ratings_5
+# histogram are kept in step with the reviews by adding or removing one
+# review at a time: a single UPDATE by primary key in the flush that writes
+# the review, so they commit or roll back together. Psychologist.rating is
+# derived from the sum and count in the same statement, which keeps the
+# min_rating filter and the rating sort on plain indexed columns.
+# Core writes to reviews bypass these hooks; reconcile_ratings() rebuilds
+# everything from the reviews table.
+
+def _average(total, count):
+    return case((count > 0, cast(total, Float) / count), else_=0.0)
+
+def apply_reviews(
+    connection: Connection, changes: Iterable[Tuple[Any, Optional[int], int]]
+) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) reviews in their psychologists'
+    aggregates, given as (psychologist_id, rating, sign). Changes are summed
+    per psychologist and written with one executemany UPDATE.
+    """
+    deltas: Dict[Any, Dict[str, int]] = {}
+    for psychologist_id, rating, sign in changes:
+        if psychologist_id is None or rating not in RATINGS:
+            continue
+        delta = deltas.setdefault(
+            psychologist_id, {"d_count": 0, "d_sum": 0, **{f"d_{n}": 0 for n in RATINGS}}
+        )
+        delta["d_count"] += sign
+        delta["d_sum"] += sign * rating
+        delta[f"d_{rating}"] += sign
+    if not deltas:
+        return
+    mark_changed(connection, deltas)
+    p = Psychologist.__table__
+    count = func.coalesce(p.c.reviews_count, 0) + bindparam("d_count", type_=Integer)
+    total = p.c.rating_sum + bindparam("d_sum", type_=Integer)
+    stmt = (
+        update(p)
+        .where(p.c.id == bindparam("row_id"))
+        # SET expressions all see the row as it was before the update
+        .values(
+            reviews_count=count,
+            rating_sum=total,
+            rating=_average(total, count),
+            **{
+                f"ratings_{n}": p.c[f"ratings_{n}"] + bindparam(f"d_{n}", type_=Integer)
+                for n in RATINGS
+            },
+        )
+    )
+    connection.execute(stmt, [
+        {"row_id": psychologist_id, **delta} for psychologist_id, delta in deltas.items()
+    ])
+
+def apply_review(
+    connection: Connection, psychologist_id: Any, rating: Optional[int], sign: int
+) -> None:
+    """Add (sign=1) or remove (sign=-1) one review in the psychologist's aggregates."""
+    apply_reviews(connection, [(psychologist_id, rating, sign)])
+
+@event.listens_for(Review, "after_insert")
+def _insert_review(mapper, connection, target):
+    apply_review(connection, target.psychologist_id, target.rating, 1)
+
+@event.listens_for(Review, "after_update")
+def _update_review(mapper, connection, target):
+    state = inspect(target)
+    rating = state.attrs.rating.history
+    psychologist_id = state.attrs.psychologist_id.history
+    if not (rating.has_changes() or psychologist_id.has_changes()):
+        return
+    old_rating = rating.deleted[0] if rating.deleted else target.rating
+    old_psychologist_id = (
+        psychologist_id.deleted[0] if psychologist_id.deleted else target.psychologist_id
+    )
+    apply_review(connection, old_psychologist_id, old_rating, -1)
+    apply_review(connection, target.psychologist_id, target.rating, 1)
+
+@event.listens_for(Review, "after_delete")
+def _delete_review(mapper, connection, target):
+    apply_review(connection, target.psychologist_id, target.rating, -1)
+
+# SQLite leaves the ON DELETE CASCADE of the review foreign keys unenforced
+# (no storage profile sets PRAGMA foreign_keys), so the deletes of users and
+# psychologists delete their reviews themselves: the hooks below, and the
+# bulk_deleting() of their CRUD classes.
+
+def delete_reviews(connection: Connection, where: Any) -> None:
+    """Delete the reviews matching `where` and take them out of the aggregates."""
+    r = Review.__table__
+    removed = connection.execute(select(r.c.psychologist_id, r.c.rating).where(where)).all()
+    if not removed:
+        return
+    apply_reviews(connection, (
+        (psychologist_id, rating, -1) for psychologist_id, rating in removed
+    ))
+    connection.execute(r.delete().where(where))
+
+@event.listens_for(Psychologist, "before_delete")
+def _delete_psychologist_reviews(mapper, connection, target):
+    delete_reviews(connection, Review.__table__.c.psychologist_id == target.id)
+
+@event.listens_for(User, "before_delete")
+def _delete_author_reviews(mapper, connection, target):
+    delete_reviews(connection, Review.__table__.c.author_id == target.id)
+
+def reconcile_ratings(connection: Connection) -> int:
+    """
+    Recompute every psychologist's review aggregates from the reviews table
+    with two set-based UPDATEs: reset all, then fill in from one GROUP BY.
+    Returns the number of psychologists that have reviews.
+    """
+    p = Psychologist.__table__
+    r = Review.__table__
+    counts = {f"ratings_{n}": 0 for n in RATINGS}
+    connection.execute(update(p).values(reviews_count=0, rating_sum=0, rating=0.0, **counts))
+    totals = (
+        select(
+            r.c.psychologist_id,
+            func.count().label("reviews_count"),
+            func.sum(r.c.rating).label("rating_sum"),
+            *(
+                func.sum(case((r.c.rating == n, 1), else_=0)).label(f"ratings_{n}")
+                for n in RATINGS
+            ),
+        )
+        .group_by(r.c.psychologist_id)
+        .subquery()
+    )
+    result = connection.execute(
+        update(p)
+        .where(p.c.id == totals.c.psychologist_id)
+        .values(
+            reviews_count=totals.c.reviews_count,
+            rating_sum=totals.c.rating_sum,
+            rating=_average(totals.c.rating_sum, totals.c.reviews_count),
+            **{f"ratings_{n}": totals.c[f"ratings_{n}"] for n in RATINGS},
+        )
+    )
+    return result.rowcount
\ No newline at end of file
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Boolean, Enum
 from sqlalchemy.orm import relationship
-from api.db.base import Base
+from api.db.base_class import Base
 import enum
 
 class UserRole(str, enum.Enum):
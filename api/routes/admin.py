@@ -1,33 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Any
-from api.crud import crud_user, crud_psychologist, crud_institution
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Any, Tuple, Type
+from api.crud import (
+    async_crud_user, async_crud_psychologist, async_crud_institution, async_crud_article,
+    async_crud_review,
+)
+from api.crud.base import MAX_PAGE_SIZE, BulkResult
+from api.schemas.article import ArticleCreate, ArticleUpdate
+from api.schemas.institution import Institution, InstitutionCreate, InstitutionUpdate
+from api.schemas.psychologist import PsychologistCreate, PsychologistUpdate
+from api.schemas.review import ReviewCreate, ReviewUpdate
 from api.schemas.user import User
-from api.core.deps import get_current_user, get_db
+from fastapi.responses import FileResponse
+from api.core.cache import invalidate_catalogs, response_cache, user_cache
+from api.core.config import settings
+from api.core.profiler import list_profiles, profile_path
+from api.core.deps import get_current_user, get_async_db
+from api.db.facets import psychologist_facets
+from api.db.reconcile import JOB_CATALOGS, JOBS
+from api.db.session import pool_status
 
 router = APIRouter()
 
+# Entities writable through /batch: CRUD object, create and update schemas,
+# and the keys a create line may carry beyond the create schema
+BATCH_ENTITIES: Dict[str, Tuple[Any, Type[BaseModel], Type[BaseModel], Tuple[str, ...]]] = {
+    "psychologists": (async_crud_psychologist, PsychologistCreate, PsychologistUpdate, ("id",)),
+    "institutions": (async_crud_institution, InstitutionCreate, InstitutionUpdate, ("id",)),
+    "articles": (async_crud_article, ArticleCreate, ArticleUpdate, ("id",)),
+    "reviews": (async_crud_review, ReviewCreate, ReviewUpdate, ("id", "author_id")),
+}
+
+def _batch_entity(entity: str, current_user: Any) -> Tuple[Any, Type[BaseModel], Type[BaseModel], Tuple[str, ...]]:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    if entity not in BATCH_ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown entity, expected one of {sorted(BATCH_ENTITIES)}"
+        )
+    return BATCH_ENTITIES[entity]
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+async def _ndjson_rows(
+    request: Request, schema: Optional[Type[BaseModel]], keep: Tuple[str, ...], partial: bool
+) -> Tuple[List[Any], List[int], List[Dict[str, Any]]]:
+    """
+    Parse an NDJSON body into rows for the bulk CRUD methods. Returns the
+    rows, the 1-based line number of each row and the errors of the lines
+    that didn't parse. Without a schema each line is just an id.
+    """
+    rows: List[Any] = []
+    lines: List[int] = []
+    errors: List[Dict[str, Any]] = []
+    body = (await request.body()).decode("utf-8", errors="replace")
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            if schema is None:
+                row = data.get("id") if isinstance(data, dict) else data
+                if not isinstance(row, str):
+                    raise ValueError("Expected an id or an object with an id")
+            else:
+                if not isinstance(data, dict):
+                    raise ValueError("Expected a JSON object")
+                row = schema.model_validate(data).model_dump(exclude_unset=partial)
+                row.update((key, data[key]) for key in keep if key in data)
+        except ValidationError as exc:
+            errors.append({"line": number, "error": _validation_message(exc)})
+            continue
+        except ValueError as exc:  # json.JSONDecodeError included
+            errors.append({"line": number, "error": str(exc)})
+            continue
+        rows.append(row)
+        lines.append(number)
+    return rows, lines, errors
+
+def _batch_response(
+    result: BulkResult, lines: List[int], errors: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    errors = errors + [
+        {"line": lines[position], "error": error} for position, error in result.errors
+    ]
+    errors.sort(key=lambda error: error["line"])
+    return {"written": len(result.ids), "ids": result.ids, "errors": errors}
+
 @router.get("/users", response_model=List[User])
 async def get_all_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Get all users. Only for admins.
+
+    Pages are ordered by id. Pass the X-Next-Cursor header of a
+    response as `cursor` to get the next page; `skip` is kept for older clients.
     """
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_user.get_multi(db, skip=skip, limit=limit)
+    try:
+        users, next_cursor = await async_crud_user.get_page(
+            db, skip=skip, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
-@router.post("/verify-psychologist/{psychologist_id}")
+@router.post("/verify-psychologist/{psychologist_id}", response_model=User)
 async def verify_psychologist(
     psychologist_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
 ) -> Any:
     """
@@ -38,19 +140,19 @@ async def verify_psychologist(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    psychologist = crud_psychologist.get(db, id=psychologist_id)
+    psychologist = await async_crud_psychologist.get(db, id=psychologist_id)
     if not psychologist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Psychologist not found"
         )
-    user = crud_user.get(db, id=psychologist.user_id)
-    return crud_user.update(db, db_obj=user, obj_in={"is_verified": True})
+    user = await async_crud_user.get(db, id=psychologist.user_id)
+    return await async_crud_user.update(db, db_obj=user, obj_in={"is_verified": True})
 
-@router.post("/verify-institution/{institution_id}")
+@router.post("/verify-institution/{institution_id}", response_model=Institution)
 async def verify_institution(
     institution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
 ) -> Any:
     """
@@ -61,10 +163,187 @@ async def verify_institution(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    institution = crud_institution.get(db, id=institution_id)
+    institution = await async_crud_institution.get(db, id=institution_id)
     if not institution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Institution not found"
         )
-    return crud_institution.update(db, db_obj=institution, obj_in={"is_verified": True})
\ No newline at end of file
+    return await async_crud_institution.update(
+        db, db_obj=institution, obj_in={"is_verified": True}, load={"user": "joined"}
+    )
+
+@router.post("/deactivate-user/{user_id}", response_model=User)
+async def deactivate_user(
+    user_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Deactivate a user: their tokens stop working and they can't log in. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    user = await async_crud_user.get(db, id=user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return await async_crud_user.update(db, db_obj=user, obj_in={"is_active": False})
+
+@router.post("/batch/{entity}")
+async def batch_create(
+    entity: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Create many rows from an NDJSON body, one object per line. Only for admins.
+
+    Lines that fail to parse or to insert are reported by line number; the
+    other rows are written in one transaction.
+    """
+    crud, create_schema, _, keep = _batch_entity(entity, current_user)
+    rows, lines, errors = await _ndjson_rows(request, create_schema, keep, partial=False)
+    result = await crud.create_many(db, objs_in=rows)
+    return _batch_response(result, lines, errors)
+
+@router.patch("/batch/{entity}")
+async def batch_update(
+    entity: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Update many rows from an NDJSON body; each line holds the id and the
+    fields to change. Only for admins.
+    """
+    crud, _, update_schema, _ = _batch_entity(entity, current_user)
+    rows, lines, errors = await _ndjson_rows(request, update_schema, ("id",), partial=True)
+    result = await crud.update_many(db, objs_in=rows)
+    return _batch_response(result, lines, errors)
+
+@router.delete("/batch/{entity}")
+async def batch_delete(
+    entity: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Delete many rows; each NDJSON line is an id or an object with an id. Only for admins.
+    """
+    crud, _, _, _ = _batch_entity(entity, current_user)
+    ids, lines, errors = await _ndjson_rows(request, None, (), partial=False)
+    result = await crud.remove_many(db, ids=ids)
+    return _batch_response(result, lines, errors)
+
+@router.post("/reconcile/{job}")
+async def reconcile(
+    job: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Rebuild one set of denormalized aggregates, see api.db.reconcile. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    if job not in JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown job, expected one of {sorted(JOBS)}"
+        )
+    rows = await db.run_sync(lambda session: JOBS[job](session.connection()))
+    await db.commit()
+    invalidate_catalogs(*JOB_CATALOGS[job])
+    if "psychologists" in JOB_CATALOGS[job]:
+        # Core updates of every row, not tracked by the facet index
+        psychologist_facets.invalidate()
+    return {"job": job, "rows": rows}
+
+@router.get("/db-pool")
+async def get_db_pool_status(
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Live connection pool statistics for the sync and async engines. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return pool_status()
+
+@router.get("/user-cache")
+async def get_user_cache_status(
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Size and hit/miss counters of the authenticated-user cache. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return user_cache.stats()
+
+@router.get("/response-cache")
+async def get_response_cache_status(
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Size and hit/miss counters of the public listing cache. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return response_cache.stats()
+
+@router.get("/profiles")
+async def get_profiles(
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    Saved request profiles, newest first, see api.core.profiler. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return list_profiles(settings.PROFILE_DIR)
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    current_user = Depends(get_current_user),
+) -> Any:
+    """
+    One profile as folded stacks, for flamegraph.pl or speedscope. Only for admins.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    path = profile_path(settings.PROFILE_DIR, profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
\ No newline at end of file
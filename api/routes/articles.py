@@ -1,44 +1,164 @@
-```python
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Any, Union
 from datetime import datetime
-from api.crud import crud_article
-from api.schemas.article import Article, ArticleCreate, ArticleUpdate
-from api.core.deps import get_current_user, get_db
+from api.crud import async_crud_article
+from api.crud.base import MAX_PAGE_SIZE
+from api.schemas.article import (
+    Article, ArticleCard, ArticleCreate, ArticleHit, ArticleUpdate, TagCount, serialize_article,
+    serialize_article_hit,
+)
+from api.schemas.serializers import projection
+from api.core.config import settings
+from api.core.deps import get_current_user, get_async_db
+from api.core.responses import fast_json
+from api.db.counters import article_views
 from api.models.article import ArticleStatus
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Article])
+# Relations embedded in the Article response model
+article_load = {"author": "joined"}
+
+@router.get("/", response_model=Union[List[ArticleHit], List[ArticleCard]])
 async def get_articles(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
-    tag: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    tag: List[str] = Query([]),
+    tag_match: Literal["any", "all"] = "any",
     author_id: Optional[str] = None,
     institution_id: Optional[str] = None,
     psychologist_id: Optional[str] = None,
-    status: Optional[str] = ArticleStatus.PUBLISHED
+    status: Optional[str] = ArticleStatus.PUBLISHED,
+    fields: Optional[str] = None,
 ) -> Any:
     """
     Retrieve articles with optional filtering.
+
+    `tag` may be repeated; `tag_match` decides whether an article needs any
+    or all of the given tags.
+
+    Pages are ordered newest published first. Pass the X-Next-Cursor header of a
+    response as `cursor` to get the next page; `skip` is kept for older clients.
+
+    With `q`, returns a full-text search instead: best matches first, each with
+    a `snippet` where matched words are wrapped in <mark>. Search results are
+    paged with `skip` only.
+
+    `fields` trims each item to what the page shows: "card" for the compact
+    listing card (ArticleCard), or comma-separated field names such as
+    "id,title,preview". Text and JSON columns outside them are not read from
+    the database. Items of a field list carry just those ArticleHit fields;
+    unknown names are a 422.
+    """
+    load = article_load
+    view = None
+    if fields:
+        try:
+            view = projection(ArticleHit, fields, card=ArticleCard)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        load = async_crud_article.projection_load(load, view.fields)
+    if q:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Search results are paged with skip, not cursor")
+        hits = await async_crud_article.search(
+            db,
+            q,
+            load=load,
+            skip=skip,
+            limit=limit,
+            tag=tag,
+            tag_match=tag_match,
+            author_id=author_id,
+            institution_id=institution_id,
+            psychologist_id=psychologist_id,
+            status=status
+        )
+        if view is not None:
+            items = []
+            for article, snippet in hits:
+                item = view.serialize(article)
+                if "snippet" in item:
+                    item["snippet"] = snippet
+                items.append(item)
+            return fast_json(items)
+        if settings.FAST_JSON:
+            return fast_json([
+                dict(serialize_article_hit(article), snippet=snippet) for article, snippet in hits
+            ])
+        return [
+            ArticleHit.model_validate(article).model_copy(update={"snippet": snippet})
+            for article, snippet in hits
+        ]
+    try:
+        articles, next_cursor = await async_crud_article.get_page(
+            db,
+            load=load,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            tag=tag,
+            tag_match=tag_match,
+            author_id=author_id,
+            institution_id=institution_id,
+            psychologist_id=psychologist_id,
+            status=status
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if view is not None:
+        return fast_json([view.serialize(a) for a in articles], response)
+    if settings.FAST_JSON:
+        return fast_json([serialize_article_hit(a) for a in articles], response)
+    return articles
+
+@router.get("/tags", response_model=List[TagCount])
+async def get_tags(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+) -> Any:
+    """
+    Tags of published articles with the number of articles using each, most
+    used first. The counts are kept up to date as articles are written.
     """
-    return crud_article.get_multi(
-        db,
-        skip=skip,
-        limit=limit,
-        tag=tag,
-        author_id=author_id,
-        institution_id=institution_id,
-        psychologist_id=psychologist_id,
-        status=status
+    counts = await async_crud_article.get_tag_counts(db, limit=limit)
+    return [{"tag": tag, "count": count} for tag, count in counts]
+
+@router.get("/{article_id}", response_model=Article)
+async def get_article(
+    article_id: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get a specific article by ID. Counts a view if it is published.
+    """
+    article = await async_crud_article.get(db, id=article_id, load=article_load)
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Article not found"
+        )
+    if article.status == ArticleStatus.PUBLISHED:
+        article_views.hit(article.id)
+    # Views not flushed yet are added on top of the stored count
+    views = article_views.total(article.id, article.views)
+    if settings.FAST_JSON:
+        return fast_json(dict(serialize_article(article), views=views))
+    return Article.model_validate(article).model_copy(
+        update={"views": views}
     )
 
 @router.post("/", response_model=Article)
 async def create_article(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     article_in: ArticleCreate,
     current_user = Depends(get_current_user)
 ) -> Any:
@@ -50,12 +170,12 @@ async def create_article(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_article.create(db, obj_in=article_in)
+    return await async_crud_article.create(db, obj_in=article_in, load=article_load)
 
 @router.put("/{article_id}", response_model=Article)
 async def update_article(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     article_id: str,
     article_in: ArticleUpdate,
     current_user = Depends(get_current_user)
@@ -63,7 +183,7 @@ async def update_article(
     """
     Update an article.
     """
-    article = crud_article.get(db, id=article_id)
+    article = await async_crud_article.get(db, id=article_id, load=article_load)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,19 +194,21 @@ async def update_article(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_article.update(db, db_obj=article, obj_in=article_in)
+    return await async_crud_article.update(
+        db, db_obj=article, obj_in=article_in, load=article_load
+    )
 
 @router.post("/{article_id}/publish", response_model=Article)
 async def publish_article(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     article_id: str,
     current_user = Depends(get_current_user)
 ) -> Any:
     """
     Publish an article.
     """
-    article = crud_article.get(db, id=article_id)
+    article = await async_crud_article.get(db, id=article_id, load=article_load)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,19 +219,19 @@ async def publish_article(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_article.publish(db, db_obj=article)
+    return await async_crud_article.publish(db, db_obj=article, load=article_load)
 
 @router.post("/{article_id}/archive", response_model=Article)
 async def archive_article(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     article_id: str,
     current_user = Depends(get_current_user)
 ) -> Any:
     """
     Archive an article.
     """
-    article = crud_article.get(db, id=article_id)
+    article = await async_crud_article.get(db, id=article_id, load=article_load)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,5 +242,4 @@ async def archive_article(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_article.archive(db, db_obj=article)
-```
\ No newline at end of file
+    return await async_crud_article.archive(db, db_obj=article, load=article_load)
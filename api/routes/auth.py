@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
 from datetime import timedelta
 
 from api.core.config import settings
-from api.core.security import create_access_token, verify_password
+from api.core.security import create_access_token
 from api.schemas.token import Token
-from api.crud import crud_user
-from api.db.session import get_db
+from api.crud import async_crud_user
+from api.db.session import get_async_db
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -16,9 +16,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
-    user = crud_user.authenticate(
+    user = await async_crud_user.authenticate(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
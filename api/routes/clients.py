@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
-from api.crud import crud_client
+from api.crud import async_crud_client
 from api.schemas.client import Client, ClientCreate, ClientUpdate
-from api.core.deps import get_current_user, get_db
+from api.core.deps import get_current_user, get_async_db
 
 router = APIRouter()
 
+# Relations embedded in the Client response model
+client_load = {"user": "joined"}
+
 @router.get("/me", response_model=Client)
 async def get_my_profile(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
 ) -> Any:
     """
@@ -20,7 +23,9 @@ async def get_my_profile(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a client user"
         )
-    client = crud_client.get_by_user_id(db, user_id=current_user.id)
+    client = await async_crud_client.get_by_user_id(
+        db, user_id=current_user.id, load=client_load
+    )
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,7 +36,7 @@ async def get_my_profile(
 @router.put("/me", response_model=Client)
 async def update_my_profile(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     client_in: ClientUpdate,
     current_user = Depends(get_current_user),
 ) -> Any:
@@ -43,10 +48,12 @@ async def update_my_profile(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a client user"
         )
-    client = crud_client.get_by_user_id(db, user_id=current_user.id)
+    client = await async_crud_client.get_by_user_id(
+        db, user_id=current_user.id, load=client_load
+    )
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client profile not found"
         )
-    return crud_client.update(db, db_obj=client, obj_in=client_in)
\ No newline at end of file
+    return await async_crud_client.update(db, db_obj=client, obj_in=client_in)
\ No newline at end of file
@@ -1,51 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional, Any
-from api.crud import crud_institution
-from api.schemas.institution import Institution, InstitutionCreate, InstitutionUpdate
-from api.core.deps import get_current_user, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Any, Union
+from api.crud import async_crud_institution
+from api.crud.base import MAX_PAGE_SIZE
+from api.schemas.institution import (
+    Institution, InstitutionCard, InstitutionCreate, InstitutionUpdate, serialize_institution,
+)
+from api.schemas.serializers import projection
+from api.core.config import settings
+from api.core.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, parse_near
+from api.core.deps import get_current_user, get_async_db
+from api.core.responses import fast_json
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Institution])
+# Relations embedded in the Institution response model
+institution_load = {"user": "joined"}
+
+@router.get("/", response_model=Union[List[Institution], List[InstitutionCard]])
 async def get_institutions(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     city: Optional[str] = None,
     is_verified: Optional[bool] = None,
+    near: Optional[str] = None,
+    radius_km: float = Query(DEFAULT_RADIUS_KM, gt=0, le=MAX_RADIUS_KM),
+    fields: Optional[str] = None,
 ) -> Any:
     """
     Retrieve institutions with optional filtering.
+
+    Pages are ordered by id. Pass the X-Next-Cursor header of a
+    response as `cursor` to get the next page; `skip` is kept for older clients.
+
+    `near` ("latitude,longitude") keeps the institutions with coordinates
+    within `radius_km` of the point and orders them nearest first.
+
+    `fields` trims each item to what the page shows: "card" for the compact
+    catalog card (InstitutionCard), or comma-separated field names such as
+    "id,address,user". Text and JSON columns outside them are not read from
+    the database. Items of a field list carry just those Institution
+    fields; unknown names are a 422.
     """
-    return crud_institution.get_multi(
-        db,
-        skip=skip,
-        limit=limit,
-        city=city,
-        is_verified=is_verified
-    )
+    load = institution_load
+    view = None
+    if fields:
+        try:
+            view = projection(Institution, fields, card=InstitutionCard)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        load = async_crud_institution.projection_load(load, view.fields)
+    point = None
+    if near:
+        try:
+            point = parse_near(near)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        institutions, next_cursor = await async_crud_institution.get_page(
+            db,
+            load=load,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            city=city,
+            is_verified=is_verified,
+            near=point,
+            radius_km=radius_km
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if view is not None:
+        return fast_json([view.serialize(i) for i in institutions], response)
+    if settings.FAST_JSON:
+        return fast_json([serialize_institution(i) for i in institutions], response)
+    return institutions
 
 @router.get("/{institution_id}", response_model=Institution)
 async def get_institution(
     institution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get a specific institution by ID.
     """
-    institution = crud_institution.get(db, id=institution_id)
+    institution = await async_crud_institution.get(
+        db, id=institution_id, load=institution_load
+    )
     if not institution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Institution not found"
         )
+    if settings.FAST_JSON:
+        return fast_json(serialize_institution(institution))
     return institution
 
 @router.post("/", response_model=Institution)
 async def create_institution(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     institution_in: InstitutionCreate,
     current_user = Depends(get_current_user)
 ) -> Any:
@@ -57,12 +116,14 @@ async def create_institution(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_institution.create(db, obj_in=institution_in)
+    return await async_crud_institution.create(
+        db, obj_in=institution_in, load=institution_load
+    )
 
 @router.put("/{institution_id}", response_model=Institution)
 async def update_institution(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     institution_id: str,
     institution_in: InstitutionUpdate,
     current_user = Depends(get_current_user)
@@ -70,7 +131,9 @@ async def update_institution(
     """
     Update an institution profile.
     """
-    institution = crud_institution.get(db, id=institution_id)
+    institution = await async_crud_institution.get(
+        db, id=institution_id, load=institution_load
+    )
     if not institution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,4 +144,6 @@ async def update_institution(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_institution.update(db, db_obj=institution, obj_in=institution_in)
\ No newline at end of file
+    return await async_crud_institution.update(
+        db, db_obj=institution, obj_in=institution_in, load=institution_load
+    )
\ No newline at end of file
@@ -1,53 +1,177 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional, Any
-from api.crud import crud_psychologist
-from api.schemas.psychologist import Psychologist, PsychologistCreate, PsychologistUpdate
-from api.core.deps import get_current_user, get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from api.crud import async_crud_psychologist
+from api.crud.base import MAX_PAGE_SIZE
+from api.schemas.psychologist import (
+    Psychologist, PsychologistCard, PsychologistCreate, PsychologistFacetPage,
+    PsychologistUpdate, serialize_psychologist,
+)
+from api.schemas.serializers import Projection, projection
+from api.core.config import settings
+from api.core.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, parse_near
+from api.core.deps import get_current_user, get_async_db
+from api.core.responses import fast_json
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Psychologist])
+# Relations embedded in the Psychologist response model
+psychologist_load = {"user": "joined"}
+
+def _view(fields: Optional[str]) -> Tuple[Dict[str, str], Optional[Projection]]:
+    """Load plan and projection of a listing's `fields` parameter."""
+    if not fields:
+        return psychologist_load, None
+    try:
+        view = projection(Psychologist, fields, card=PsychologistCard)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return async_crud_psychologist.projection_load(psychologist_load, view.fields), view
+
+@router.get("/", response_model=Union[List[Psychologist], List[PsychologistCard]])
 async def get_psychologists(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
-    specialization: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    specialization: List[str] = Query([]),
+    language: List[str] = Query([]),
+    match: Literal["any", "all"] = "any",
     city: Optional[str] = None,
     min_rating: Optional[float] = None,
+    near: Optional[str] = None,
+    radius_km: float = Query(DEFAULT_RADIUS_KM, gt=0, le=MAX_RADIUS_KM),
+    fields: Optional[str] = None,
 ) -> Any:
     """
     Retrieve psychologists with optional filtering.
+
+    `specialization` and `language` may be repeated; `match` decides whether
+    a psychologist needs any or all of the given values of each.
+
+    Pages are ordered by rating, best first. Pass the X-Next-Cursor header of a
+    response as `cursor` to get the next page; `skip` is kept for older clients.
+
+    `near` ("latitude,longitude") keeps the psychologists with coordinates
+    within `radius_km` of the point and orders them nearest first.
+
+    `fields` trims each item to what the page shows: "card" for the compact
+    catalog card (PsychologistCard), or comma-separated field names such as
+    "id,rating,user". Text and JSON columns outside them are not read from
+    the database. Items of a field list carry just those Psychologist
+    fields; unknown names are a 422.
+    """
+    load, view = _view(fields)
+    point = None
+    if near:
+        try:
+            point = parse_near(near)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        psychologists, next_cursor = await async_crud_psychologist.get_page(
+            db,
+            load=load,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            specialization=specialization,
+            language=language,
+            match=match,
+            city=city,
+            min_rating=min_rating,
+            near=point,
+            radius_km=radius_km
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if view is not None:
+        return fast_json([view.serialize(p) for p in psychologists], response)
+    if settings.FAST_JSON:
+        return fast_json([serialize_psychologist(p) for p in psychologists], response)
+    return psychologists
+
+@router.get("/facets", response_model=PsychologistFacetPage)
+async def get_psychologist_facets(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    specialization: List[str] = Query([]),
+    language: List[str] = Query([]),
+    match: Literal["any", "all"] = "any",
+    city: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    fields: Optional[str] = None,
+) -> Any:
+    """
+    A page of psychologists, as from the listing, with the number of matches
+    and the count of each specialization, language and city under the same
+    filters.
+
+    A facet value's count is the number of results with that value selected
+    too: with `match` "any" the facet's own selection is left out of its
+    counts, with "all" it is kept. City counts leave out the `city` filter.
+    Values the results no longer have are omitted unless selected.
     """
-    return crud_psychologist.get_multi(
-        db,
-        skip=skip,
-        limit=limit,
+    filters = dict(
         specialization=specialization,
+        language=language,
+        match=match,
         city=city,
-        min_rating=min_rating
+        min_rating=min_rating,
     )
+    load, view = _view(fields)
+    try:
+        psychologists, next_cursor = await async_crud_psychologist.get_page(
+            db, load=load, cursor=cursor, limit=limit, **filters
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    facets = await async_crud_psychologist.get_facets(db, **filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    page = {
+        "total": facets.total,
+        "facets": {
+            facet: [{"value": value, "count": count} for value, count in counts]
+            for facet, counts in facets.counts.items()
+        },
+        "items": psychologists,
+    }
+    if view is not None or settings.FAST_JSON:
+        serialize = view.serialize if view is not None else serialize_psychologist
+        page["items"] = [serialize(p) for p in psychologists]
+        return fast_json(page, response)
+    return page
 
 @router.get("/{psychologist_id}", response_model=Psychologist)
 async def get_psychologist(
     psychologist_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get a specific psychologist by ID.
     """
-    psychologist = crud_psychologist.get(db, id=psychologist_id)
+    psychologist = await async_crud_psychologist.get(
+        db, id=psychologist_id, load=psychologist_load
+    )
     if not psychologist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Psychologist not found"
         )
+    if settings.FAST_JSON:
+        return fast_json(serialize_psychologist(psychologist))
     return psychologist
 
 @router.post("/", response_model=Psychologist)
 async def create_psychologist(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     psychologist_in: PsychologistCreate,
     current_user = Depends(get_current_user)
 ) -> Any:
@@ -59,12 +183,14 @@ async def create_psychologist(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_psychologist.create(db, obj_in=psychologist_in)
+    return await async_crud_psychologist.create(
+        db, obj_in=psychologist_in, load=psychologist_load
+    )
 
 @router.put("/{psychologist_id}", response_model=Psychologist)
 async def update_psychologist(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     psychologist_id: str,
     psychologist_in: PsychologistUpdate,
     current_user = Depends(get_current_user)
@@ -72,7 +198,9 @@ async def update_psychologist(
     """
     Update a psychologist profile.
     """
-    psychologist = crud_psychologist.get(db, id=psychologist_id)
+    psychologist = await async_crud_psychologist.get(
+        db, id=psychologist_id, load=psychologist_load
+    )
     if not psychologist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,4 +211,6 @@ async def update_psychologist(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return crud_psychologist.update(db, db_obj=psychologist, obj_in=psychologist_in)
\ No newline at end of file
+    return await async_crud_psychologist.update(
+        db, db_obj=psychologist, obj_in=psychologist_in, load=psychologist_load
+    )
\ No newline at end of file
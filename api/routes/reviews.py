@@ -0,0 +1,128 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Any
+from api.crud import async_crud_psychologist, async_crud_review
+from api.crud.base import MAX_PAGE_SIZE
+from api.schemas.review import Review, ReviewCreate, ReviewUpdate, serialize_review
+from api.core.config import settings
+from api.core.deps import get_current_user, get_async_db
+from api.core.responses import fast_json
+
+router = APIRouter()
+
+# Relations embedded in the Review response model
+review_load = {"author": "joined"}
+
+@router.get("/", response_model=List[Review])
+async def get_reviews(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    psychologist_id: Optional[str] = None,
+    author_id: Optional[str] = None,
+) -> Any:
+    """
+    Retrieve reviews, newest first, optionally for one psychologist or author.
+
+    Pass the X-Next-Cursor header of a response as `cursor` to get the next page.
+    """
+    try:
+        reviews, next_cursor = await async_crud_review.get_page(
+            db,
+            load=review_load,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            psychologist_id=psychologist_id,
+            author_id=author_id
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if settings.FAST_JSON:
+        return fast_json([serialize_review(r) for r in reviews], response)
+    return reviews
+
+@router.post("/", response_model=Review)
+async def create_review(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    review_in: ReviewCreate,
+    current_user = Depends(get_current_user)
+) -> Any:
+    """
+    Review a psychologist. The psychologist's rating is updated with it.
+    """
+    psychologist = await async_crud_psychologist.get(db, id=review_in.psychologist_id)
+    if not psychologist:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Psychologist not found"
+        )
+    if psychologist.user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Psychologists can't review themselves"
+        )
+    return await async_crud_review.create_with_author(
+        db, obj_in=review_in, author_id=current_user.id, load=review_load
+    )
+
+@router.put("/{review_id}", response_model=Review)
+async def update_review(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    review_id: str,
+    review_in: ReviewUpdate,
+    current_user = Depends(get_current_user)
+) -> Any:
+    """
+    Update a review. Its author may change the rating and comment; the
+    reviewed psychologist may only set the reply.
+    """
+    review = await async_crud_review.get(
+        db, id=review_id, load={**review_load, "psychologist": "joined"}
+    )
+    if not review:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Review not found"
+        )
+    fields = set(review_in.dict(exclude_unset=True))
+    if current_user.role != "admin" and not (
+        (current_user.id == review.author_id and "reply" not in fields)
+        or (current_user.id == review.psychologist.user_id and fields <= {"reply"})
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return await async_crud_review.update(
+        db, db_obj=review, obj_in=review_in, load=review_load
+    )
+
+@router.delete("/{review_id}", response_model=Review)
+async def delete_review(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    review_id: str,
+    current_user = Depends(get_current_user)
+) -> Any:
+    """
+    Delete a review. Only its author or an admin can.
+    """
+    review = await async_crud_review.get(db, id=review_id, load=review_load)
+    if not review:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Review not found"
+        )
+    if current_user.role != "admin" and current_user.id != review.author_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return await async_crud_review.remove(db, id=review_id)
\ No newline at end of file
@@ -1,8 +1,8 @@
-```python
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-from .user import User
+from .serializers import compile_serializer
+from .user import User, UserCard
 
 class ArticleBase(BaseModel):
     title: str
@@ -40,4 +40,31 @@ class ArticleInDBBase(ArticleBase):
 
 class Article(ArticleInDBBase):
     author: User
-```
\ No newline at end of file
+
+
+class ArticleHit(Article):
+    # Highlighted excerpt, set when the listing is a `q` search
+    snippet: Optional[str] = None
+
+class TagCount(BaseModel):
+    tag: str
+    count: int  # published articles with the tag
+
+class ArticleCard(BaseModel):
+    # Listing card, `fields=card`: the preview instead of the content
+    id: str
+    title: str
+    preview: Optional[str] = None
+    image: Optional[str] = None
+    tags: List[str] = []
+    author_id: str
+    views: int
+    published_at: Optional[datetime] = None
+    author: UserCard
+    snippet: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+serialize_article = compile_serializer(Article)
+serialize_article_hit = compile_serializer(ArticleHit)
@@ -1,10 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
-from .user import User
+from .serializers import compile_serializer
+from .user import User, UserCard
 
 class InstitutionBase(BaseModel):
     description: str
     address: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     services: List[Dict[str, str]]
     contacts: Dict[str, str]
 
@@ -14,6 +17,8 @@ class InstitutionCreate(InstitutionBase):
 class InstitutionUpdate(BaseModel):
     description: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     services: Optional[List[Dict[str, str]]] = None
     contacts: Optional[Dict[str, str]] = None
 
@@ -27,4 +32,20 @@ class InstitutionInDBBase(InstitutionBase):
         from_attributes = True
 
 class Institution(InstitutionInDBBase):
-    user: User
\ No newline at end of file
+    user: User
+
+class InstitutionCard(BaseModel):
+    # Catalog card, `fields=card`: no description, services or contacts
+    id: str
+    user_id: str
+    address: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    psychologists_count: int
+    is_verified: bool
+    user: UserCard
+
+    class Config:
+        from_attributes = True
+
+serialize_institution = compile_serializer(Institution)
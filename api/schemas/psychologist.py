@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
-from .user import User
+from .serializers import compile_serializer
+from .user import User, UserCard
 
 class PsychologistBase(BaseModel):
     description: str
@@ -14,6 +15,8 @@ class PsychologistBase(BaseModel):
     gallery: List[str]
     location: Dict[str, str]
     contacts: Dict[str, str]
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class PsychologistCreate(PsychologistBase):
     user_id: str
@@ -29,6 +32,8 @@ class PsychologistUpdate(BaseModel):
     certifications: Optional[List[Dict[str, str]]] = None
     gallery: Optional[List[str]] = None
     location: Optional[Dict[str, str]] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     contacts: Optional[Dict[str, str]] = None
 
 class PsychologistInDBBase(PsychologistBase):
@@ -36,9 +41,43 @@ class PsychologistInDBBase(PsychologistBase):
     user_id: str
     rating: float
     reviews_count: int
+    rating_histogram: List[int]  # number of 1- to 5-star reviews
 
     class Config:
         from_attributes = True
 
 class Psychologist(PsychologistInDBBase):
-    user: User
\ No newline at end of file
+    user: User
+
+class PsychologistCard(BaseModel):
+    # Catalog card, `fields=card`: no description or profile JSON blobs
+    id: str
+    user_id: str
+    experience: int
+    specializations: List[str]
+    languages: List[str]
+    location: Dict[str, str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    rating: float
+    reviews_count: int
+    user: UserCard
+
+    class Config:
+        from_attributes = True
+
+class FacetCount(BaseModel):
+    value: str
+    count: int  # psychologists the filters give with this value selected
+
+class PsychologistFacets(BaseModel):
+    specialization: List[FacetCount]
+    language: List[FacetCount]
+    city: List[FacetCount]
+
+class PsychologistFacetPage(BaseModel):
+    total: int  # psychologists matching the filters
+    facets: PsychologistFacets
+    items: List[Psychologist]
+
+serialize_psychologist = compile_serializer(Psychologist)
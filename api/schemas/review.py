@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from datetime import datetime
+from .serializers import compile_serializer
+from .user import User
+
+class ReviewBase(BaseModel):
+    rating: int = Field(ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewCreate(ReviewBase):
+    psychologist_id: str
+
+class ReviewUpdate(BaseModel):
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    comment: Optional[str] = None
+    reply: Optional[str] = None
+
+    @field_validator("rating")
+    @classmethod
+    def rating_not_null(cls, rating: Optional[int]) -> int:
+        # Left out keeps the rating; the column is NOT NULL
+        if rating is None:
+            raise ValueError("rating may be left out but not null")
+        return rating
+
+class ReviewInDBBase(ReviewBase):
+    id: str
+    author_id: str
+    psychologist_id: str
+    reply: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class Review(ReviewInDBBase):
+    author: User
+
+serialize_review = compile_serializer(Review)
@@ -0,0 +1,91 @@
+"""
+Precompiled response serializers.
+
+compile_serializer(Schema) generates a function that turns an ORM object
+into the dict Schema.model_validate(obj).model_dump(mode="json") would give,
+key for key and in the same order, without validating: the values come
+from our own database, which the write schemas already checked. Nested
+schemas get serializers of their own; datetimes and enums are left to the
+JSON encoder (api.core.responses.fast_json), which writes them the way
+Pydantic does.
+
+The response_model of the routes stays the documented contract; the
+serializers are used when settings.FAST_JSON is on, and for listings asked
+for a subset of their fields (projection()).
+"""
+import functools
+import typing
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Type
+from pydantic import BaseModel
+
+Serializer = Callable[[Any], Dict[str, Any]]
+
+def _converter(annotation: Any) -> Any:
+    """A function for values of `annotation` that need converting, else None."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) != 1:
+            return None
+        convert = _converter(options[0])
+        if convert is None:
+            return None
+        return lambda value: None if value is None else convert(value)
+    if origin in (list, List) and args:
+        convert = _converter(args[0])
+        if convert is None:
+            return None
+        return lambda values: [convert(value) for value in values]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compile_serializer(annotation)
+    if annotation is float:
+        # Pydantic writes 4 as 4.0 in a float field
+        return float
+    return None
+
+# Bounded: `fields` combinations come from query strings
+@functools.lru_cache(maxsize=256)
+def compile_serializer(
+    schema: Type[BaseModel], fields: Optional[FrozenSet[str]] = None
+) -> Serializer:
+    """Serializer of `schema`, or of only its `fields` (in schema order)."""
+    namespace: Dict[str, Any] = {}
+    items: List[str] = []
+    for i, (name, field) in enumerate(schema.model_fields.items()):
+        if fields is not None and name not in fields:
+            continue
+        if field.is_required():
+            value = f"obj.{name}"
+        else:
+            # Attributes the object lacks, such as ArticleHit.snippet
+            namespace[f"_d{i}"] = field.get_default(call_default_factory=True)
+            value = f"getattr(obj, {name!r}, _d{i})"
+        convert = _converter(field.annotation)
+        if convert is not None:
+            namespace[f"_c{i}"] = convert
+            value = f"_c{i}({value})"
+        items.append(f"        {name!r}: {value},")
+    source = "def serialize(obj):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    exec(compile(source, f"<serializer {schema.__name__}>", "exec"), namespace)
+    return namespace["serialize"]
+
+class Projection(NamedTuple):
+    fields: FrozenSet[str]  # top-level fields in the output
+    serialize: Serializer
+
+def projection(schema: Type[BaseModel], fields: str, *, card: Type[BaseModel]) -> Projection:
+    """
+    Parse the `fields` parameter of a listing: "card" for the compact `card`
+    schema, or comma-separated names of `schema` fields. Raises ValueError
+    for unknown names.
+    """
+    if fields == "card":
+        return Projection(frozenset(card.model_fields), compile_serializer(card))
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = sorted(names - set(schema.model_fields))
+    if unknown or not names:
+        raise ValueError(
+            f"Unknown fields {', '.join(unknown)}" if unknown else "No fields given"
+        )
+    return Projection(names, compile_serializer(schema, names))
@@ -28,5 +28,14 @@ class UserInDBBase(UserBase):
 class User(UserInDBBase):
     pass
 
+class UserCard(BaseModel):
+    # Author/owner part of the listing cards
+    id: str
+    name: str
+    avatar: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class UserInDB(UserInDBBase):
     hashed_password: str
\ No newline at end of file
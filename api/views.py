@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from api.core.text import normalize_city
 from .models import User, Institution, Psychologist, Client, Article
 from .serializers import (
     UserSerializer, InstitutionSerializer, PsychologistSerializer,
@@ -20,7 +21,7 @@ class InstitutionViewSet(viewsets.ModelViewSet):
         queryset = Institution.objects.all()
         city = self.request.query_params.get('city', None)
         if city:
-            queryset = queryset.filter(address__icontains=city)
+            queryset = queryset.filter(city_key=normalize_city(city))
         return queryset
 
 class PsychologistViewSet(viewsets.ModelViewSet):
@@ -37,7 +38,7 @@ class PsychologistViewSet(viewsets.ModelViewSet):
         if specialization:
             queryset = queryset.filter(specializations__contains=[specialization])
         if city:
-            queryset = queryset.filter(location__city=city)
+            queryset = queryset.filter(city_key=normalize_city(city))
         if min_rating:
             queryset = queryset.filter(rating__gte=float(min_rating))
         return queryset
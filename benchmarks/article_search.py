@@ -0,0 +1,77 @@
+"""
+Latency of article full-text search (CRUDArticle.search) on a generated corpus.
+
+Queries are picked by how many articles contain them, from words in nearly
+every article down to rare ones, plus two-word and phrase-like queries. Each
+time includes ranking, loading the page of articles and building snippets.
+
+    python -m benchmarks.article_search --rows 50000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy.orm import sessionmaker
+
+from api.core.config import Settings
+from api.core.text import search_stems
+from api.crud.crud_article import crud_article
+from api.db.engine import PoolStats, build_engine
+from api.models.article import ArticleStatus
+from benchmarks.catalog import article_vocabulary, load_articles
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--profile", default="prod-read-heavy")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "articles.db")
+    engine = build_engine(
+        Settings(DATABASE_URL=f"sqlite:///{path}", DB_STORAGE_PROFILE=args.profile), PoolStats()
+    )
+    started = time.perf_counter()
+    load_articles(engine, args.rows)
+    print(f"loaded {args.rows} articles in {time.perf_counter() - started:.1f}s")
+
+    words = article_vocabulary()
+    queries = {
+        "very common word": [words[i] for i in (50, 55, 60)],
+        "common word": [words[i] for i in (120, 150, 200)],
+        "rare word": [words[i] for i in (2000, 5000, 20000)],
+        "two words": [f"{words[60]} {words[150]}", f"{words[120]} {words[300]}"],
+        "deep page (skip 200)": [words[150]],
+        "no match": ["несуществующееслово"],
+    }
+    Session = sessionmaker(bind=engine)
+    print(f"{'query':<22} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    with Session() as db:
+        for label, texts in queries.items():
+            skip = 200 if label.startswith("deep") else 0
+            samples: List[float] = []
+            for text in texts:
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    crud_article.search(db, text, skip=skip, limit=args.limit)
+                    samples.append((time.perf_counter() - started) * 1000)
+                    db.expunge_all()
+            matches = sum(
+                db.execute(crud_article.select_search_count(
+                    crud_article.search_match(search_stems(texts[0]), head=head),
+                    status=ArticleStatus.PUBLISHED,
+                )).scalar()
+                for head in (True, False)
+            )
+            print(
+                f"{label:<22} {matches:>8} {statistics.median(samples):>8.2f} "
+                f"{statistics.quantiles(samples, n=20)[18]:>8.2f} {max(samples):>8.2f}"
+            )
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Latency of concurrent GET /api/psychologists/ calls, sync vs async DB path.
+
+The "sync" mode replays the previous handler (a blocking Session used from an
+async def handler); the "async" mode is the real api.main:app. Both run
+in-process over httpx's ASGI transport against the same SQLite file. While
+the listing load runs, a probe keeps calling GET / to show how long an
+unrelated request waits behind the database work.
+
+Keep --concurrency below the sync pool size (5 + 10 overflow): past that the
+sync handler blocks the loop on pool checkout while the sessions holding the
+connections wait for the same loop to close them, and the run stalls until
+the pool timeout fires.
+
+    python -m benchmarks.async_db --rows 2000 --requests 400 --concurrency 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, List, Tuple
+
+_tmpdir = tempfile.mkdtemp(prefix="cbt-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from api.crud import crud_psychologist  # noqa: E402
+from api.db.base import Base  # noqa: E402
+from api.db.session import SessionLocal, engine  # noqa: E402
+from api.main import app  # noqa: E402
+from api.models.psychologist import Psychologist  # noqa: E402
+from api.schemas.psychologist import Psychologist as PsychologistSchema  # noqa: E402
+from benchmarks.catalog import load_psychologists  # noqa: E402
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if db.query(Psychologist).count() >= rows:
+            return
+    load_psychologists(engine, rows)
+
+def sync_app() -> FastAPI:
+    """The pre-async handler: blocking Session queries on the event loop."""
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    baseline = FastAPI()
+
+    @baseline.get("/api/psychologists/", response_model=List[PsychologistSchema])
+    async def get_psychologists(
+        db: Session = Depends(get_db), skip: int = 0, limit: int = 100
+    ) -> Any:
+        return crud_psychologist.get_multi(db, skip=skip, limit=limit)
+
+    @baseline.get("/")
+    async def root():
+        return {"message": "Welcome to CBT Marketplace API"}
+
+    return baseline
+
+async def run(
+    target: FastAPI, requests: int, concurrency: int, limit: int
+) -> Tuple[List[float], List[float]]:
+    latencies: List[float] = []
+    probes: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/psychologists/", params={"skip": (i * limit) % 1000, "limit": limit}
+                )
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        async def probe() -> None:
+            while True:
+                started = time.perf_counter()
+                await client.get("/")
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        prober = asyncio.create_task(probe())
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        prober.cancel()
+    return latencies, probes
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    print(
+        f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'probe p50':>10} {'probe p99':>10}"
+    )
+    for mode, target in (("sync", sync_app()), ("async", app)):
+        started = time.perf_counter()
+        latencies, probes = asyncio.run(
+            run(target, args.requests, args.concurrency, args.limit)
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f"{mode:<6} {args.requests / elapsed:>8.1f} "
+            f"{statistics.median(latencies) * 1000:>8.1f} "
+            f"{percentile(latencies, 99) * 1000:>8.1f} "
+            f"{statistics.median(probes) * 1000:>10.1f} "
+            f"{percentile(probes, 99) * 1000:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
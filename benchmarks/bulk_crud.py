@@ -0,0 +1,101 @@
+"""
+Per-row CRUD calls vs the create_many/update_many/remove_many batch path.
+
+"row" is what an import script did before: one crud_psychologist.create(),
+update() or remove() per row, each its own commit. "bulk" writes the same
+rows through the executemany methods in one transaction. Both run on a
+fresh SQLite file per mode and keep the side tables and counters in sync.
+
+    python -m benchmarks.bulk_crud --rows 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from api.core.config import Settings
+from api.crud.crud_psychologist import crud_psychologist
+from api.db.base import Base
+from api.db.engine import PoolStats, build_engine
+from api.models.institution import Institution
+from api.models.user import User
+from benchmarks.catalog import CITIES, psychologist_rows
+
+DERIVED = ("city_key", "rating", "reviews_count", "rating_sum")
+
+def measure(mode: str, rows: int, profile: str) -> Dict[str, float]:
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), f"{mode}.db")
+    engine = build_engine(
+        Settings(DATABASE_URL=f"sqlite:///{path}", DB_STORAGE_PROFILE=profile), PoolStats()
+    )
+    Base.metadata.create_all(bind=engine)
+    users, psychologists = [], []
+    for user, psychologist in psychologist_rows(rows):
+        users.append(user)
+        psychologists.append({
+            key: value for key, value in psychologist.items() if key not in DERIVED
+        })
+        psychologists[-1]["institution_id"] = "i0" if len(psychologists) % 2 else None
+    with engine.begin() as conn:
+        conn.execute(insert(User), users)
+        conn.execute(insert(Institution), [{
+            "id": "i0", "user_id": users[0]["id"], "description": "", "address": "",
+            "services": [], "contacts": {},
+        }])
+    changes: List[Dict[str, object]] = [
+        {"id": p["id"], "location": {"country": "Россия", "city": CITIES[i % len(CITIES)]},
+         "institution_id": None if p["institution_id"] else "i0"}
+        for i, p in enumerate(psychologists)
+    ]
+    ids = [p["id"] for p in psychologists]
+
+    Session = sessionmaker(bind=engine, autoflush=False)
+    timings: Dict[str, float] = {}
+    with Session() as db:
+        started = time.perf_counter()
+        if mode == "row":
+            for data in psychologists:
+                crud_psychologist.create(db, obj_in=data)
+        else:
+            assert not crud_psychologist.create_many(db, objs_in=psychologists).errors
+        timings["create"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if mode == "row":
+            for change in changes:
+                db_obj = crud_psychologist.get(db, id=change["id"])
+                crud_psychologist.update(db, db_obj=db_obj, obj_in=change)
+        else:
+            assert not crud_psychologist.update_many(db, objs_in=changes).errors
+        timings["update"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if mode == "row":
+            for id in ids:
+                crud_psychologist.remove(db, id=id)
+        else:
+            assert not crud_psychologist.remove_many(db, ids=ids).errors
+        timings["remove"] = time.perf_counter() - started
+    engine.dispose()
+    return {step: rows / seconds for step, seconds in timings.items()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--profile", default="dev")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'create/s':>10} {'update/s':>10} {'remove/s':>10}")
+    for mode in ("row", "bulk"):
+        result = measure(mode, args.rows, args.profile)
+        print(
+            f"{mode:<6} {result['create']:>10.0f} {result['update']:>10.0f} "
+            f"{result['remove']:>10.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Deterministic synthetic catalog rows shared by the benchmarks.
+
+catalog_records() generates a whole marketplace in the format of
+api.db.loader; run this module to write one as NDJSON for
+api.management.commands.load_test_data:
+
+    python -m benchmarks.catalog --scale 100k --out catalog.ndjson
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from api.core.geo import encode_geohash
+from api.core.text import normalize_city
+from api.crud.crud_article import crud_article
+from api.db.base import Base
+from api.db.loader import FixtureLoader, SectionStats
+from api.models.article import Article, ArticleStatus
+from api.models.psychologist import Psychologist, TERM_TABLES, term_rows
+from api.models.user import User, UserRole
+
+CITIES = ["Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород"]
+CITY_CENTERS = {
+    "Москва": (55.7558, 37.6173),
+    "Санкт-Петербург": (59.9343, 30.3351),
+    "Новосибирск": (55.0084, 82.9357),
+    "Екатеринбург": (56.8389, 60.6057),
+    "Казань": (55.7887, 49.1221),
+    "Нижний Новгород": (56.2965, 43.9361),
+}
+SPECIALIZATIONS = ["Тревожность", "Депрессия", "ОКР", "Панические атаки", "Зависимости", "Семейная терапия"]
+LANGUAGES = ["Русский", "Английский", "Татарский", "Немецкий"]
+
+def coordinates(city: str, rnd: random.Random) -> Dict[str, Any]:
+    """A point within about 15 km of the city center."""
+    latitude, longitude = CITY_CENTERS[city]
+    return {
+        "latitude": round(latitude + rnd.gauss(0, 0.07), 6),
+        "longitude": round(longitude + rnd.gauss(0, 0.12), 6),
+    }
+
+def psychologist_rows(count: int, seed: int = 42) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Yield (user, psychologist) column dicts for `count` psychologists. 90%
+    have coordinates near their city, drawn from a generator of their own so
+    the other columns stay as they were for a seed.
+    """
+    rnd = random.Random(seed)
+    places = random.Random(seed + 1)
+    for i in range(count):
+        user = {
+            "id": f"u{i}",
+            "email": f"psy{i}@example.com",
+            "hashed_password": "x",
+            "name": f"Психолог {i}",
+            "role": UserRole.PSYCHOLOGIST,
+            "is_active": True,
+            "is_verified": rnd.random() < 0.7,
+        }
+        psychologist = {
+            "id": f"p{i}",
+            "user_id": user["id"],
+            "description": "Когнитивно-поведенческая терапия. " * rnd.randint(1, 20),
+            "experience": rnd.randint(0, 30),
+            "rating": round(rnd.uniform(3, 5), 1),
+            "reviews_count": rnd.randint(0, 200),
+            "specializations": rnd.sample(SPECIALIZATIONS, rnd.randint(1, 3)),
+            "languages": rnd.sample(LANGUAGES, rnd.randint(1, 2)),
+            "memberships": [],
+            "education": [{"institution": "МГУ", "degree": "Магистр"}],
+            "certifications": [],
+            "gallery": [],
+            "location": {"country": "Россия", "city": rnd.choice(CITIES)},
+            "contacts": {},
+        }
+        psychologist["city_key"] = normalize_city(psychologist["location"]["city"])
+        if places.random() < 0.9:
+            psychologist.update(coordinates(psychologist["location"]["city"], places))
+        else:
+            psychologist.update(latitude=None, longitude=None)
+        psychologist["geohash"] = encode_geohash(psychologist["latitude"], psychologist["longitude"])
+        psychologist["rating_sum"] = round(psychologist["rating"] * psychologist["reviews_count"])
+        yield user, psychologist
+
+def load_psychologists(engine: Engine, count: int, *, batch: int = 1000, seed: int = 42) -> None:
+    """
+    Create the schema and bulk insert `count` psychologists with their users
+    and specialization/language side table rows. Core inserts skip the model
+    hooks, so the rows carry city_key and geohash and the side tables are
+    filled here.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    def flush(conn, users, psychologists):
+        conn.execute(insert(User), users)
+        conn.execute(insert(Psychologist), psychologists)
+        for column, table in TERM_TABLES.items():
+            rows = [
+                row for p in psychologists for row in term_rows(p["id"], p[column])
+            ]
+            conn.execute(table.insert(), rows)
+
+    users, psychologists = [], []
+    with engine.begin() as conn:
+        for user, psychologist in psychologist_rows(count, seed):
+            users.append(user)
+            psychologists.append(psychologist)
+            if len(users) >= batch:
+                flush(conn, users, psychologists)
+                users, psychologists = [], []
+        if users:
+            flush(conn, users, psychologists)
+
+def article_vocabulary(size: int = 40000, seed: int = 42) -> List[str]:
+    """
+    Word list for article text, most frequent first: the Russian words of the
+    sample articles in database/articles.sql, padded with made-up Cyrillic
+    words to a realistic vocabulary size.
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "database", "articles.sql")
+    with open(path, encoding="utf-8") as sample:
+        real = list(dict.fromkeys(w.lower() for w in re.findall(r"[А-Яа-яЁё]{3,}", sample.read())))
+    rnd = random.Random(seed)
+    letters = "абвгдежзиклмнопрстуфхцчшщэюя"
+    made_up = ["".join(rnd.choices(letters, k=rnd.randint(4, 10))) for _ in range(size - len(real))]
+    # A few made-up words rank above the real ones, like stop words would
+    return made_up[:50] + real + made_up[50:]
+
+def article_rows(count: int, author_id: str, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield article column dicts with Zipf-distributed words, 200-800 per body."""
+    rnd = random.Random(seed)
+    vocabulary = article_vocabulary(seed=seed)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    tags = vocabulary[50:80]
+    started = datetime(2024, 1, 1)
+
+    def words(k: int) -> str:
+        return " ".join(rnd.choices(vocabulary, cum_weights=weights, k=k))
+
+    for i in range(count):
+        published = rnd.random() < 0.8
+        yield {
+            "id": f"a{i}",
+            "title": words(8).capitalize(),
+            "preview": words(25),
+            "content": words(rnd.randint(200, 800)),
+            "author_id": author_id,
+            "views": rnd.randint(0, 5000),
+            "tags": rnd.sample(tags, 3),
+            "status": ArticleStatus.PUBLISHED if published else ArticleStatus.DRAFT,
+            "published_at": started + timedelta(minutes=i) if published else None,
+        }
+
+def load_articles(engine: Engine, count: int, *, batch: int = 1000, seed: int = 42) -> None:
+    """
+    Create the schema and bulk insert `count` articles by one author, with
+    their search index entries and tags.
+    """
+    Base.metadata.create_all(bind=engine)
+    author = {
+        "id": "author",
+        "email": "author@example.com",
+        "hashed_password": "x",
+        "name": "Автор",
+        "role": UserRole.PSYCHOLOGIST,
+        "is_active": True,
+        "is_verified": True,
+    }
+    with engine.begin() as conn:
+        conn.execute(insert(User), [author])
+        rows = article_rows(count, author["id"], seed)
+        while True:
+            chunk = list(itertools.islice(rows, batch))
+            if not chunk:
+                break
+            conn.execute(insert(Article), chunk)
+            crud_article.bulk_inserted(conn, chunk)
+
+# Catalog sizes by number of psychologists. Per psychologist there is also a
+# client, and per catalog_records() 1/50 institution, 1/4 article and 2 reviews.
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+REVIEW_COMMENTS = ["Очень помог", "Рекомендую", "Внимательный специалист", "Не подошёл формат", ""]
+
+def catalog_records(
+    psychologists: int, seed: int = 42
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (section, row) pairs for a marketplace with `psychologists`
+    psychologists, parents before children, as api.db.loader accepts them.
+    Users carry no password hash; the loader gives them a shared one.
+    """
+    rnd = random.Random(seed)
+    places = random.Random(seed + 2)
+    institutions = max(psychologists // 50, 1)
+    clients = max(psychologists, 2)
+    started = datetime(2024, 1, 1)
+
+    yield "users", {
+        "id": "admin", "email": "admin@example.com", "name": "Администратор",
+        "role": UserRole.ADMIN, "is_active": True, "is_verified": True,
+    }
+    for k in range(institutions):
+        city = rnd.choice(CITIES)
+        yield "users", {
+            "id": f"iu{k}", "email": f"institution{k}@example.com", "name": f"Институт {k}",
+            "role": UserRole.INSTITUTION, "is_active": True, "is_verified": True,
+        }
+        yield "institutions", {
+            "id": f"i{k}",
+            "user_id": f"iu{k}",
+            "description": "Обучение и супервизия КПТ. " * rnd.randint(1, 5),
+            "address": f"г. {city}, ул. Ленина, {k + 1}",
+            **coordinates(city, places),
+            "services": [{"id": "edu1", "name": "Базовый курс КПТ", "price": "45000"}],
+            "contacts": {"email": f"institution{k}@example.com"},
+            "is_verified": rnd.random() < 0.8,
+        }
+
+    for user, psychologist in psychologist_rows(psychologists, seed):
+        user = {key: value for key, value in user.items() if key != "hashed_password"}
+        psychologist = dict(psychologist)
+        if rnd.random() < 0.3:
+            psychologist["institution_id"] = f"i{rnd.randrange(institutions)}"
+        yield "users", user
+        yield "psychologists", psychologist
+
+    for i in range(clients):
+        yield "users", {
+            "id": f"c{i}", "email": f"client{i}@example.com", "name": f"Клиент {i}",
+            "role": UserRole.CLIENT, "is_active": True, "is_verified": True,
+        }
+        yield "clients", {
+            "id": f"cl{i}",
+            "user_id": f"c{i}",
+            "preferences": {"city": rnd.choice(CITIES)},
+            "saved_psychologists": [
+                f"p{rnd.randrange(psychologists)}" for _ in range(rnd.randint(0, 3))
+            ],
+            "saved_institutions": [],
+        }
+
+    for article in article_rows(psychologists // 4, "", seed):
+        j = rnd.randrange(psychologists)
+        yield "articles", dict(article, author_id=f"u{j}", psychologist_id=f"p{j}")
+
+    review = 0
+    for j in range(psychologists):
+        # Two distinct clients per psychologist
+        first = rnd.randrange(clients)
+        second = (first + 1 + rnd.randrange(clients - 1)) % clients
+        for author in (first, second):
+            yield "reviews", {
+                "id": f"r{review}",
+                "author_id": f"c{author}",
+                "psychologist_id": f"p{j}",
+                "rating": rnd.choices([1, 2, 3, 4, 5], weights=[3, 4, 10, 30, 53])[0],
+                "comment": rnd.choice(REVIEW_COMMENTS) or None,
+                "created_at": started + timedelta(minutes=review),
+            }
+            review += 1
+
+def load_catalog(
+    db: Session, psychologists: int, *, password_hash: str, seed: int = 42, **options: Any
+) -> Dict[str, SectionStats]:
+    """Load catalog_records() through api.db.loader; options go to FixtureLoader."""
+    Base.metadata.create_all(bind=db.get_bind())
+    loader = FixtureLoader(db, password_hash=password_hash, **options)
+    for section, row in catalog_records(psychologists, seed):
+        loader.add(section, row)
+    return loader.finish()
+
+def write_ndjson(records: Iterable[Tuple[str, Dict[str, Any]]], out: TextIO) -> None:
+    """Write records as the Django-style NDJSON api.db.loader reads."""
+    for section, row in records:
+        fields = {key: value for key, value in row.items() if key != "id"}
+        record = {"model": f"api.{section[:-1]}", "pk": row["id"], "fields": fields}
+        out.write(json.dumps(record, ensure_ascii=False, default=str))
+        out.write("\n")
+
+def scale_size(scale: str) -> int:
+    """A SCALES name or a plain number of psychologists."""
+    return SCALES[scale.lower()] if scale.lower() in SCALES else int(scale)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic catalog as NDJSON.")
+    parser.add_argument("--scale", default="1k", help=f"one of {sorted(SCALES)} or a number")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+    with open(args.out, "w", encoding="utf-8") as out:
+        write_ndjson(catalog_records(scale_size(args.scale), args.seed), out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+City catalog filter: JSON/ILIKE scan vs the indexed city_key column.
+
+"json" is the old filter as SQLite can run it (lower(json_extract(...)) on
+every row, and lower() only folds ASCII, so it is not even correct for
+Cyrillic input); "index" is the city_key equality the CRUD layer uses now.
+Each case times the first catalog page and the full match count.
+
+    python -m benchmarks.city_filter --rows 100000
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import func, select
+
+from api.core.config import Settings
+from api.core.text import normalize_city
+from api.crud.crud_psychologist import crud_psychologist
+from api.db.engine import PoolStats, build_engine
+from api.models.psychologist import Psychologist
+from benchmarks.catalog import CITIES, load_psychologists
+from benchmarks.term_filter import timed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "cities.db")
+    engine = build_engine(Settings(DATABASE_URL=f"sqlite:///{path}"), PoolStats())
+    load_psychologists(engine, args.rows)
+
+    print(f"{'city':<18} {'matches':>8} {'json page':>10} {'idx page':>10} {'json count':>11} {'idx count':>10}")
+    with engine.connect() as conn:
+        for city in CITIES[:3]:
+            filters = {
+                "json": func.lower(func.json_extract(Psychologist.location, "$.city")) == func.lower(city),
+                "index": Psychologist.city_key == normalize_city(city),
+            }
+            page = {
+                mode: crud_psychologist.paginate(
+                    select(Psychologist.id).where(condition), limit=50
+                )
+                for mode, condition in filters.items()
+            }
+            count = {
+                mode: select(func.count()).select_from(Psychologist).where(condition)
+                for mode, condition in filters.items()
+            }
+            matches = conn.execute(count["index"]).scalar()
+            print(
+                f"{city:<18} {matches:>8} "
+                f"{timed(lambda: conn.execute(page['json']).all(), args.repeat):>10.2f} "
+                f"{timed(lambda: conn.execute(page['index']).all(), args.repeat):>10.2f} "
+                f"{timed(lambda: conn.execute(count['json']).scalar(), args.repeat):>11.2f} "
+                f"{timed(lambda: conn.execute(count['index']).scalar(), args.repeat):>10.2f}"
+            )
+    print("times are median ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Catalog facet counts: SQL GROUP BY vs the in-memory bitmaps.
+
+"sql" counts each facet's values with one GROUP BY over the filtered
+catalog (leaving out the facet's own filter under match=any, as the facet
+index does); "bitmap" is FacetIndex.count() on an index built once. Both
+must give the same counts. Also times the full build and the refresh of
+changed rows that follows a write.
+
+    python -m benchmarks.facets --rows 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.core.config import Settings
+from api.core.text import normalize_city
+from api.crud.crud_psychologist import crud_psychologist
+from api.db.engine import PoolStats, build_engine
+from api.db.facets import FacetIndex, TERM_FACETS
+from api.models.psychologist import Psychologist
+from benchmarks.catalog import load_psychologists
+from benchmarks.term_filter import timed
+
+COLUMNS = {"specialization": "specializations", "language": "languages"}
+
+def sql_counts(
+    db: Session,
+    *,
+    specialization: Sequence[str] = (),
+    language: Sequence[str] = (),
+    match: str = "any",
+    city: Any = None,
+    min_rating: Any = None,
+) -> Tuple[int, Dict[str, List[Tuple[str, int]]]]:
+    selected = {"specialization": specialization, "language": language}
+
+    def conditions(without: Any = None) -> List[Any]:
+        where = [
+            crud_psychologist.has_terms(COLUMNS[facet], values, match)
+            for facet, values in selected.items()
+            if values and (facet != without or match == "all")
+        ]
+        if city and without != "city":
+            where.append(Psychologist.city_key == normalize_city(city))
+        if min_rating is not None:
+            where.append(Psychologist.rating >= min_rating)
+        return where
+
+    total = db.scalar(select(func.count()).select_from(Psychologist).where(*conditions()))
+    counts: Dict[str, List[Tuple[str, int]]] = {}
+    for facet, table in TERM_FACETS.items():
+        # Aliased, so has_terms() on the same table only correlates to Psychologist
+        table = table.alias()
+        query = (
+            select(table.c.value, func.count())
+            .join(Psychologist, Psychologist.id == table.c.psychologist_id)
+            .where(*conditions(facet))
+            .group_by(table.c.value)
+        )
+        counts[facet] = sorted(db.execute(query).tuples(), key=lambda item: (-item[1], item[0]))
+    query = (
+        select(Psychologist.city_key, func.count())
+        .where(Psychologist.city_key.is_not(None), *conditions("city"))
+        .group_by(Psychologist.city_key)
+    )
+    counts["city"] = sorted(db.execute(query).tuples(), key=lambda item: (-item[1], item[0]))
+    return total, counts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "facets.db")
+    engine = build_engine(Settings(DATABASE_URL=f"sqlite:///{path}"), PoolStats())
+    load_psychologists(engine, args.rows)
+
+    index = FacetIndex()
+    cases = [
+        ("no filters", {}),
+        ("1 specialization", {"specialization": ["ОКР"]}),
+        ("2 languages AND", {"language": ["Татарский", "Немецкий"], "match": "all"}),
+        ("city + rating", {"city": "Казань", "min_rating": 4.2}),
+        ("all filters", {
+            "specialization": ["ОКР", "Зависимости"], "language": ["Русский"],
+            "city": "Москва", "min_rating": 3.5,
+        }),
+    ]
+    with Session(engine) as db:
+        started = time.perf_counter()
+        index.state = index._build(db)
+        print(f"build of {args.rows} rows: {(time.perf_counter() - started) * 1000:.0f} ms")
+        ids = random.Random(1).sample(list(index.state.slots), min(500, args.rows))
+        for size in (1, 100, 500):
+            print(f"refresh of {size} rows: {timed(lambda: index._refresh(db, ids[:size]), args.repeat):.2f} ms")
+
+        print(f"{'case':<18} {'matches':>8} {'sql ms':>9} {'bitmap ms':>10}")
+        for label, filters in cases:
+            total, counts = sql_counts(db, **filters)
+            facets = index.count(**filters)
+            city_keys = {index.labels.get(key, key): key for key in index.state.bitmaps["city"]}
+            bitmap_counts = dict(facets.counts, city=[
+                (city_keys[name], n) for name, n in facets.counts["city"]
+            ])
+            # GROUP BY has no rows for the selected values nothing matches
+            bitmap_counts = {
+                facet: [(value, n) for value, n in values if n]
+                for facet, values in bitmap_counts.items()
+            }
+            if (facets.total, bitmap_counts) != (total, counts):
+                raise SystemExit(f"{label}: the bitmap counts differ from SQL")
+
+            def bitmap() -> None:
+                # Without the min_rating bitmap cached, as after every write
+                index.state._ratings = {}
+                index.count(**filters)
+            print(
+                f"{label:<18} {total:>8} "
+                f"{timed(lambda: sql_counts(db, **filters), args.repeat):>9.2f} "
+                f"{timed(bitmap, args.repeat):>10.2f}"
+            )
+    print("times are median ms")
+
+if __name__ == "__main__":
+    main()
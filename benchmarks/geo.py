@@ -0,0 +1,80 @@
+"""
+near= catalog searches: distance-ordered table scan vs geohash cells.
+
+"scan" is what the query costs without the spatial index: the distance of
+every psychologist with coordinates, filtered by the radius and sorted.
+"near" is CRUDPsychologist.get_page(near=...): growing circles, each read
+from the geohash index ranges of its cells, the page's ids first. Both must
+return the same page.
+
+    python -m benchmarks.geo --rows 100000
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.core.config import Settings
+from api.crud.crud_psychologist import crud_psychologist
+from api.db.engine import PoolStats, build_engine
+from api.models.psychologist import Psychologist
+from benchmarks.catalog import CITY_CENTERS, load_psychologists
+from benchmarks.term_filter import timed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "geo.db")
+    engine = build_engine(Settings(DATABASE_URL=f"sqlite:///{path}"), PoolStats())
+    load_psychologists(engine, args.rows)
+
+    moscow = CITY_CENTERS["Москва"]
+    cases = [
+        ("Moscow center, 5 km", moscow, 5.0, {}),
+        ("Moscow center, 25 km", moscow, 25.0, {}),
+        ("Moscow, 25 km + OKR", moscow, 25.0, {"specialization": ["ОКР"], "min_rating": 4.5}),
+        ("Kazan center, 50 km", CITY_CENTERS["Казань"], 50.0, {}),
+        ("between cities, 500 km", (56.0, 41.0), 500.0, {}),
+        ("nobody near, 100 km", (64.0, 100.0), 100.0, {}),
+    ]
+    print(f"{'case':<24} {'in radius':>9} {'scan ms':>8} {'near ms':>8}")
+    with Session(engine) as db:
+        for label, point, radius, filters in cases:
+            distance = crud_psychologist.near_distance(point)
+            scan = (
+                crud_psychologist.select_multi(limit=args.limit + 1, **filters)
+                .where(Psychologist.latitude.is_not(None), distance <= radius * radius)
+                .order_by(None)
+                .order_by(distance, Psychologist.id)
+            )
+            total = db.scalar(
+                select(func.count())
+                .select_from(Psychologist)
+                .where(*crud_psychologist.near_clauses(point, radius))
+            )
+
+            def run_scan():
+                return [p.id for p in db.scalars(scan).all()[:args.limit]]
+
+            def run_near():
+                page, _ = crud_psychologist.get_page(
+                    db, limit=args.limit, near=point, radius_km=radius, **filters
+                )
+                return [p.id for p in page]
+
+            if run_scan() != run_near():
+                raise SystemExit(f"{label}: the pages differ")
+            print(
+                f"{label:<24} {total:>9} "
+                f"{timed(run_scan, args.repeat):>8.2f} {timed(run_near, args.repeat):>8.2f}"
+            )
+    print("times are median ms of a first page")
+
+if __name__ == "__main__":
+    main()
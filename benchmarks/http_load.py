@@ -0,0 +1,269 @@
+"""
+Throughput and p50/p95/p99 latency per route of a mixed request load.
+
+Seeds a synthetic marketplace (benchmarks.catalog.catalog_records) into the
+database unless it already holds one of that size, then replays a weighted,
+seeded mix of catalog, search, detail, review, profile and login requests
+(MIX below) against api.main:app. Requests run in-process over httpx's ASGI
+transport, or with --url against a running server over a local socket; the
+server has to use the same DATABASE_URL.
+
+Results go to --out as JSON; --compare prints the change against an
+earlier result file. BCRYPT_ROUNDS defaults to 10 here, like login_storm.
+
+    python -m benchmarks.http_load --scale 1k --requests 5000 --out base.json
+    python -m benchmarks.http_load --scale 1k --requests 5000 --compare base.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_tmpdir = tempfile.mkdtemp(prefix="cbt-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from api.core.security import get_password_hash  # noqa: E402
+from api.db.session import SessionLocal  # noqa: E402
+from api.main import app  # noqa: E402
+from api.models.psychologist import Psychologist  # noqa: E402
+from benchmarks.async_db import percentile  # noqa: E402
+from benchmarks.catalog import (  # noqa: E402
+    CITIES, LANGUAGES, SCALES, SPECIALIZATIONS, load_catalog, scale_size,
+)
+
+PASSWORD = "bench-password"
+
+class Request(NamedTuple):
+    route: str  # label results are grouped by
+    method: str
+    url: str
+    params: Dict[str, Any] = {}
+    data: Optional[Dict[str, str]] = None
+    token: bool = False  # send a client's bearer token
+
+class Catalog(NamedTuple):
+    psychologists: int
+    institutions: int
+    articles: int
+    clients: int
+
+def _psychologist_list(rnd: random.Random, catalog: Catalog) -> Request:
+    params: Dict[str, Any] = {"limit": 20}
+    roll = rnd.random()
+    if roll < 0.3:
+        params["city"] = rnd.choice(CITIES)
+    elif roll < 0.5:
+        params["specialization"] = rnd.sample(SPECIALIZATIONS, rnd.randint(1, 2))
+    elif roll < 0.6:
+        params["language"] = rnd.choice(LANGUAGES)
+        params["min_rating"] = 4
+    return Request("GET /api/psychologists/", "GET", "/api/psychologists/", params)
+
+# Route label -> (weight, request factory). Weights follow a browsing
+# session: mostly catalog pages and profiles, some reading, rare logins.
+MIX: Dict[str, Tuple[int, Callable[[random.Random, Catalog], Request]]] = {
+    "GET /api/psychologists/": (30, _psychologist_list),
+    "GET /api/psychologists/{id}": (18, lambda rnd, c: Request(
+        "GET /api/psychologists/{id}", "GET",
+        f"/api/psychologists/p{rnd.randrange(c.psychologists)}",
+    )),
+    "GET /api/reviews/": (12, lambda rnd, c: Request(
+        "GET /api/reviews/", "GET", "/api/reviews/",
+        {"psychologist_id": f"p{rnd.randrange(c.psychologists)}", "limit": 20},
+    )),
+    "GET /api/institutions/": (8, lambda rnd, c: Request(
+        "GET /api/institutions/", "GET", "/api/institutions/",
+        {"limit": 20, **({"city": rnd.choice(CITIES)} if rnd.random() < 0.5 else {})},
+    )),
+    "GET /api/institutions/{id}": (4, lambda rnd, c: Request(
+        "GET /api/institutions/{id}", "GET", f"/api/institutions/i{rnd.randrange(c.institutions)}",
+    )),
+    "GET /api/articles/": (10, lambda rnd, c: Request(
+        "GET /api/articles/", "GET", "/api/articles/", {"limit": 20},
+    )),
+    "GET /api/articles/?q=": (5, lambda rnd, c: Request(
+        "GET /api/articles/?q=", "GET", "/api/articles/",
+        {"q": rnd.choice(["тревога", "депрессия", "терапия", "страх", "отношения"]), "limit": 20},
+    )),
+    "GET /api/articles/{id}": (7, lambda rnd, c: Request(
+        "GET /api/articles/{id}", "GET", f"/api/articles/a{rnd.randrange(max(c.articles, 1))}",
+    )),
+    "GET /api/users/me": (4, lambda rnd, c: Request(
+        "GET /api/users/me", "GET", "/api/users/me", token=True,
+    )),
+    "POST /api/auth/token": (2, lambda rnd, c: Request(
+        "POST /api/auth/token", "POST", "/api/auth/token",
+        data={"username": f"client{rnd.randrange(c.clients)}@example.com", "password": PASSWORD},
+    )),
+}
+
+def seed(psychologists: int) -> Catalog:
+    # api.main created the schema on import
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Psychologist))
+        if existing == 0:
+            load_catalog(db, psychologists, password_hash=get_password_hash(PASSWORD))
+        elif existing != psychologists:
+            raise SystemExit(
+                f"The database holds {existing} psychologists, not {psychologists}; "
+                "point DATABASE_URL at an empty one"
+            )
+    return Catalog(
+        psychologists=psychologists,
+        institutions=max(psychologists // 50, 1),
+        articles=psychologists // 4,
+        clients=max(psychologists, 2),
+    )
+
+def plan(count: int, catalog: Catalog, seed: int) -> List[Request]:
+    rnd = random.Random(seed)
+    labels = list(MIX)
+    weights = [MIX[label][0] for label in labels]
+    return [
+        MIX[label][1](rnd, catalog)
+        for label in rnd.choices(labels, weights=weights, k=count)
+    ]
+
+async def replay(
+    client: httpx.AsyncClient, requests: List[Request], concurrency: int, tokens: List[str]
+) -> Tuple[List[Tuple[str, int, float]], float]:
+    samples: List[Tuple[str, int, float]] = []
+    queue = iter(enumerate(requests))
+
+    async def worker() -> None:
+        for i, request in queue:
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"} if request.token else None
+            started = time.perf_counter()
+            response = await client.request(
+                request.method, request.url, params=request.params, data=request.data,
+                headers=headers,
+            )
+            samples.append((request.route, response.status_code, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def run(args: argparse.Namespace, catalog: Catalog) -> Dict[str, Any]:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+    async with client:
+        tokens = []
+        for i in range(min(8, catalog.clients)):
+            response = await client.post("/api/auth/token", data={
+                "username": f"client{i}@example.com", "password": PASSWORD,
+            })
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+        if args.warmup:
+            await replay(client, plan(args.warmup, catalog, args.seed + 1), args.concurrency, tokens)
+        samples, elapsed = await replay(
+            client, plan(args.requests, catalog, args.seed), args.concurrency, tokens
+        )
+
+    by_route: Dict[str, List[Tuple[int, float]]] = {}
+    for route, status_code, latency in samples:
+        by_route.setdefault(route, []).append((status_code, latency))
+    return {
+        "meta": {
+            "scale": args.scale,
+            "psychologists": catalog.psychologists,
+            "seed": args.seed,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "target": args.url or "asgi",
+            "started": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+        },
+        "total": summarize(
+            [latency for _, _, latency in samples],
+            sum(1 for _, status_code, _ in samples if status_code >= 400),
+            elapsed,
+        ),
+        "routes": {
+            route: summarize(
+                [latency for _, latency in results],
+                sum(1 for status_code, _ in results if status_code >= 400),
+                elapsed,
+            )
+            for route, results in sorted(by_route.items())
+        },
+    }
+
+def print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    def change(section: Dict[str, Any], old: Optional[Dict[str, Any]], key: str) -> str:
+        if not old or not old.get(key):
+            return ""
+        return f"{(section[key] / old[key] - 1) * 100:+.0f}%"
+
+    print(
+        f"{'route':<30} {'count':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        + (f" {'p50 Δ':>7} {'p99 Δ':>7}" if baseline else "")
+    )
+    rows = list(result["routes"].items()) + [("total", result["total"])]
+    for route, section in rows:
+        old = None
+        if baseline:
+            old = baseline["total"] if route == "total" else baseline["routes"].get(route)
+        print(
+            f"{route:<30} {section['count']:>6} {section['errors']:>4} "
+            f"{section['p50_ms']:>8.1f} {section['p95_ms']:>8.1f} {section['p99_ms']:>8.1f}"
+            + (f" {change(section, old, 'p50_ms'):>7} {change(section, old, 'p99_ms'):>7}" if baseline else "")
+        )
+    total = result["total"]
+    print(f"{total['rps']:.1f} req/s" + (
+        f" ({change(total, baseline['total'], 'rps')})" if baseline else ""
+    ))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", default="1k", help=f"one of {sorted(SCALES)} or a number")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="base URL of a running server instead of in-process")
+    parser.add_argument("--out", help="write the result JSON here")
+    parser.add_argument("--compare", help="an earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    catalog = seed(scale_size(args.scale))
+    result = asyncio.run(run(args, catalog))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            baseline = json.load(previous)
+    print_result(result, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out:
+            json.dump(result, out, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
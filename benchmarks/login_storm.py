@@ -0,0 +1,136 @@
+"""
+Catalog latency during a login storm, bcrypt on the event loop vs the pool.
+
+Bursts of POST /api/auth/token run against the real api.main:app (in-process,
+over httpx's ASGI transport) while a probe keeps paging GET /api/psychologists/.
+"inline" sets PASSWORD_HASH_WORKERS=0, which is how logins used to run: every
+bcrypt check holds the event loop, so the probe waits behind it. "pool" is
+the default thread pool. "idle" is the probe alone, for reference.
+
+BCRYPT_ROUNDS defaults to 10 here to keep runs short; set it in the
+environment to measure the production cost.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+_tmpdir = tempfile.mkdtemp(prefix="cbt-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from api.core.config import settings  # noqa: E402
+from api.core.security import get_password_hash, password_hasher  # noqa: E402
+from api.db.session import engine  # noqa: E402
+from api.main import app  # noqa: E402
+from api.models.user import User, UserRole  # noqa: E402
+from benchmarks.async_db import percentile  # noqa: E402
+from benchmarks.catalog import load_psychologists  # noqa: E402
+
+PASSWORD = "storm-password"
+
+def seed(rows: int, users: int) -> None:
+    load_psychologists(engine, rows)
+    hashed = get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "id": f"login{i}",
+                "email": f"login{i}@example.com",
+                "hashed_password": hashed,
+                "name": f"Клиент {i}",
+                "role": UserRole.CLIENT,
+                "is_active": True,
+                "is_verified": True,
+            }
+            for i in range(users)
+        ])
+
+async def run(
+    client: httpx.AsyncClient, logins: int, concurrency: int, users: int
+) -> Tuple[List[float], List[float], float]:
+    login_times: List[float] = []
+    probes: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    async def login(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/auth/token", data={
+                "username": f"login{i % users}@example.com", "password": PASSWORD,
+            })
+            login_times.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async def probe() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            (await client.get("/api/psychologists/", params={"limit": 20})).raise_for_status()
+            probes.append(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    if logins:
+        await asyncio.gather(*(login(i) for i in range(logins)))
+    else:
+        await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    return login_times, probes, elapsed
+
+async def storm(logins: int, concurrency: int, users: int) -> None:
+    # One event loop for every mode: the async engine's pool is bound to it
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        workers = password_hasher.workers
+        print(row("idle", await run(client, 0, concurrency, users), 0))
+        for mode, mode_workers in (("inline", 0), ("pool", workers)):
+            password_hasher.workers = mode_workers
+            print(row(mode, await run(client, logins, concurrency, users), logins))
+
+def row(mode: str, result: Tuple[List[float], List[float], float], logins: int) -> str:
+    login_times, probes, elapsed = result
+
+    def ms(values: List[float], pct: Optional[float] = None) -> str:
+        if not values:
+            return f"{'-':>9}"
+        value = statistics.median(values) if pct is None else percentile(values, pct)
+        return f"{value * 1000:>9.1f}"
+
+    return (
+        f"{mode:<7} {logins / elapsed if logins else 0:>9.1f} "
+        f"{ms(login_times)} {ms(login_times, 99)} {ms(probes)} {ms(probes, 99)}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    seed(args.rows, args.users)
+    print(
+        f"bcrypt rounds {settings.BCRYPT_ROUNDS}, "
+        f"{settings.PASSWORD_HASH_WORKERS} hash workers, queue {settings.PASSWORD_HASH_QUEUE}"
+    )
+    print(
+        f"{'mode':<7} {'logins/s':>9} {'login p50':>9} {'login p99':>9} "
+        f"{'cat p50':>9} {'cat p99':>9}"
+    )
+    asyncio.run(storm(args.logins, args.concurrency, args.users))
+    print("times are ms")
+
+if __name__ == "__main__":
+    main()
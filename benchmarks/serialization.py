@@ -0,0 +1,86 @@
+"""
+Response serialization: FastAPI's response_model path vs FAST_JSON.
+
+"model" is what a route returning ORM objects costs after the query:
+FastAPI's serialize_response() validating every row into the route's
+response_model, then JSONResponse encoding the dump. "fast" is the
+FAST_JSON path: the precompiled serializer of api.schemas.serializers per
+row, then orjson. Pages of psychologists, articles and reviews are loaded
+once from a synthetic catalog and serialized repeatedly; both paths must
+produce the same bytes.
+
+    python -m benchmarks.serialization --pages 100 1000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from typing import Any, Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import Session
+
+from api.core.config import Settings
+from api.core.responses import FastJSONResponse
+from api.crud import crud_article, crud_psychologist, crud_review
+from api.db.engine import PoolStats, build_engine
+from api.schemas.article import Article, serialize_article
+from api.schemas.psychologist import Psychologist, serialize_psychologist
+from api.schemas.review import Review, serialize_review
+from benchmarks.catalog import load_catalog
+from benchmarks.term_filter import timed
+
+CASES = {
+    "psychologists": (crud_psychologist, Psychologist, serialize_psychologist, {"user": "joined"}),
+    "articles": (crud_article, Article, serialize_article, {"author": "joined"}),
+    "reviews": (crud_review, Review, serialize_review, {"author": "joined"}),
+}
+
+def model_path(schema: Any, rows: List[Any]) -> Callable[[], bytes]:
+    field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+
+    def run() -> bytes:
+        content = asyncio.run(
+            serialize_response(field=field, response_content=rows, is_coroutine=True)
+        )
+        return JSONResponse(content).body
+    return run
+
+def fast_path(serialize: Callable[[Any], Any], rows: List[Any]) -> Callable[[], bytes]:
+    return lambda: FastJSONResponse([serialize(row) for row in rows]).body
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "serialization.db")
+    engine = build_engine(Settings(DATABASE_URL=f"sqlite:///{path}"), PoolStats())
+    largest = max(args.pages)
+    with Session(engine) as db:
+        # Enough psychologists for `largest` articles and reviews each
+        load_catalog(db, largest * 4, password_hash="x")
+
+    print(f"{'page':<20} {'bytes':>9} {'model ms':>9} {'fast ms':>8} {'speedup':>8}")
+    with Session(engine) as db:
+        for name, (crud, schema, serialize, load) in CASES.items():
+            everything = crud.get_multi(db, limit=largest, load=load)
+            for size in args.pages:
+                rows = everything[:size]
+                model, fast = model_path(schema, rows), fast_path(serialize, rows)
+                body = model()
+                if fast() != body:
+                    raise SystemExit(f"{name}: the fast path gave different JSON")
+                model_ms = timed(model, args.repeat)
+                fast_ms = timed(fast, args.repeat)
+                print(
+                    f"{f'{name} x{len(rows)}':<20} {len(body):>9} "
+                    f"{model_ms:>9.2f} {fast_ms:>8.2f} {model_ms / fast_ms:>7.1f}x"
+                )
+    print("times are median ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Read/write throughput of the SQLite storage profiles on a generated catalog.
+
+For each profile in api.db.engine.STORAGE_PROFILES a fresh database is
+bulk-loaded (write rows/s), then reader threads page through the catalog
+while one writer keeps committing single-row updates, which is where the
+rollback journal makes readers queue behind the writer.
+
+    python -m benchmarks.storage_profiles --rows 20000 --seconds 5 --readers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import select, update
+
+from api.core.config import Settings
+from api.core.text import normalize_city
+from api.db.engine import STORAGE_PROFILES, PoolStats, build_engine
+from api.models.psychologist import Psychologist
+from benchmarks.catalog import CITIES, load_psychologists
+
+def measure(profile: str, rows: int, seconds: float, readers: int) -> Dict[str, float]:
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), f"{profile}.db")
+    settings = Settings(
+        DATABASE_URL=f"sqlite:///{path}",
+        DB_STORAGE_PROFILE=profile,
+        DB_POOL_SIZE=readers + 1,
+    )
+    engine = build_engine(settings, PoolStats())
+
+    started = time.perf_counter()
+    load_psychologists(engine, rows)
+    load_rate = rows / (time.perf_counter() - started)
+
+    stop = threading.Event()
+    reads: List[int] = [0] * readers
+    writes = [0]
+
+    def reader(slot: int) -> None:
+        rnd = random.Random(slot)
+        with engine.connect() as conn:
+            while not stop.is_set():
+                page = rnd.randrange(0, max(rows // 50, 1))
+                conn.execute(
+                    select(Psychologist.id, Psychologist.rating, Psychologist.location)
+                    .order_by(Psychologist.id)
+                    .offset(page * 50)
+                    .limit(50)
+                ).all()
+                conn.rollback()
+                reads[slot] += 1
+
+    def writer() -> None:
+        rnd = random.Random(0)
+        while not stop.is_set():
+            city = rnd.choice(CITIES)
+            with engine.begin() as conn:
+                conn.execute(
+                    update(Psychologist)
+                    .where(Psychologist.id == f"p{rnd.randrange(rows)}")
+                    .values(
+                        rating=round(rnd.uniform(3, 5), 1),
+                        location={"country": "Россия", "city": city},
+                        city_key=normalize_city(city),
+                    )
+                )
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "load_rows_per_s": load_rate,
+        "reads_per_s": sum(reads) / seconds,
+        "writes_per_s": writes[0] / seconds,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profile", action="append", choices=sorted(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<16} {'load rows/s':>12} {'reads/s':>10} {'writes/s':>10}")
+    for profile in args.profile or list(STORAGE_PROFILES):
+        result = measure(profile, args.rows, args.seconds, args.readers)
+        print(
+            f"{profile:<16} {result['load_rows_per_s']:>12.0f} "
+            f"{result['reads_per_s']:>10.1f} {result['writes_per_s']:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Specialization/language catalog filters: JSON scan vs indexed side tables.
+
+"json" is the best the old JSON column allows on SQLite (a json_each probe per
+row); "index" is PsychologistQuery.has_terms() over the side tables. Each case
+times the first catalog page and the full match count.
+
+    python -m benchmarks.term_filter --rows 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, List, Sequence
+
+from sqlalchemy import and_, func, or_, select, text
+
+from api.core.config import Settings
+from api.crud.crud_psychologist import crud_psychologist
+from api.db.engine import PoolStats, build_engine
+from api.models.psychologist import Psychologist
+from benchmarks.catalog import load_psychologists
+
+def json_has(column: str, values: Sequence[str], match: str):
+    probes = [
+        text(
+            f"EXISTS (SELECT 1 FROM json_each(psychologists.{column}) AS j "
+            f"WHERE j.value = :{column}_{i})"
+        ).bindparams(**{f"{column}_{i}": value})
+        for i, value in enumerate(values)
+    ]
+    return and_(*probes) if match == "all" else or_(*probes)
+
+def timed(run: Callable[[], object], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cbt-bench-"), "terms.db")
+    engine = build_engine(Settings(DATABASE_URL=f"sqlite:///{path}"), PoolStats())
+    load_psychologists(engine, args.rows)
+
+    cases = [
+        ("1 specialization", "specializations", ["ОКР"], "any"),
+        ("2 specializations OR", "specializations", ["ОКР", "Зависимости"], "any"),
+        ("2 specializations AND", "specializations", ["ОКР", "Зависимости"], "all"),
+        ("2 languages AND", "languages", ["Татарский", "Немецкий"], "all"),
+    ]
+    print(f"{'case':<24} {'matches':>8} {'json page':>10} {'idx page':>10} {'json count':>11} {'idx count':>10}")
+    with engine.connect() as conn:
+        for label, column, values, match in cases:
+            filters = {
+                "json": json_has(column, values, match),
+                "index": crud_psychologist.has_terms(column, values, match),
+            }
+            page = {
+                mode: crud_psychologist.paginate(
+                    select(Psychologist.id).where(condition), limit=50
+                )
+                for mode, condition in filters.items()
+            }
+            count = {
+                mode: select(func.count()).select_from(Psychologist).where(condition)
+                for mode, condition in filters.items()
+            }
+            matches = conn.execute(count["index"]).scalar()
+            assert matches == conn.execute(count["json"]).scalar()
+            print(
+                f"{label:<24} {matches:>8} "
+                f"{timed(lambda: conn.execute(page['json']).all(), args.repeat):>10.2f} "
+                f"{timed(lambda: conn.execute(page['index']).all(), args.repeat):>10.2f} "
+                f"{timed(lambda: conn.execute(count['json']).scalar(), args.repeat):>11.2f} "
+                f"{timed(lambda: conn.execute(count['index']).scalar(), args.repeat):>10.2f}"
+            )
+    print("times are median ms")
+
+if __name__ == "__main__":
+    main()
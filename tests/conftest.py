@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+# Settings are read on import of api.core.config: point them at a scratch
+# database first. The response cache is off so every request reaches the
+# routes and their statements are counted.
+_scratch = tempfile.mkdtemp(prefix="cbt-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+os.environ["PROFILE_DIR"] = os.path.join(_scratch, "profiles")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.db.session import SessionLocal
+from api.main import app
+from benchmarks.catalog import load_catalog
+
+# Psychologists of the synthetic catalog; also gives 5 institutions,
+# 62 articles and 2 reviews per psychologist
+CATALOG_SIZE = 250
+
+@pytest.fixture(scope="session")
+def catalog() -> None:
+    with SessionLocal() as db:
+        load_catalog(db, CATALOG_SIZE, password_hash="x")
+
+@pytest.fixture(scope="session")
+def client(catalog) -> TestClient:
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def db():
+    with SessionLocal() as db:
+        yield db
@@ -0,0 +1,20 @@
+"""
+Full-text article search: every match is ranked, and paging with skip
+walks all of them, across both search tiers.
+"""
+from api.crud.crud_article import crud_article
+from benchmarks.catalog import article_vocabulary
+
+def test_search_pages_cover_every_match(db, catalog):
+    word = article_vocabulary()[0]
+    everything = [article.id for article, _ in crud_article.search(db, word, limit=1000)]
+    assert len(everything) > 10
+
+    paged, skip = [], 0
+    while True:
+        page = crud_article.search(db, word, skip=skip, limit=7)
+        if not page:
+            break
+        paged += [article.id for article, _ in page]
+        skip += len(page)
+    assert paged == everything
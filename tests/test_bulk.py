@@ -0,0 +1,43 @@
+"""
+Bulk CRUD writes keep the good rows of a batch and report the bad ones
+by input position, whatever the reason a row fails.
+"""
+from sqlalchemy import select
+
+from api.crud.crud_user import crud_user
+from api.models.user import User, UserRole
+
+def user(id: str, **values):
+    return {
+        "id": id, "email": f"{id}@example.com", "hashed_password": "x", "name": id,
+        "role": UserRole.CLIENT, **values,
+    }
+
+def stored(db, ids):
+    return set(db.scalars(select(User.id).where(User.id.in_(ids))))
+
+def test_constraint_violations_are_reported_per_row(db):
+    rows = [user("bulk-a"), user("bulk-b", email="bulk-a@example.com"), user("bulk-c")]
+    result = crud_user.create_many(db, objs_in=rows)
+    assert result.ids == ["bulk-a", "bulk-c"]
+    assert [position for position, _ in result.errors] == [1]
+    assert "UNIQUE" in result.errors[0][1]
+    assert stored(db, ["bulk-a", "bulk-b", "bulk-c"]) == {"bulk-a", "bulk-c"}
+
+def test_values_of_the_wrong_type_are_reported_per_row(db):
+    rows = [user("bulk-d"), user("bulk-e", is_active="yes"), user("bulk-f")]
+    result = crud_user.create_many(db, objs_in=rows)
+    assert result.ids == ["bulk-d", "bulk-f"]
+    assert [position for position, _ in result.errors] == [1]
+    assert "boolean" in result.errors[0][1]
+    assert stored(db, ["bulk-d", "bulk-e", "bulk-f"]) == {"bulk-d", "bulk-f"}
+
+def test_updates_of_the_wrong_type_keep_the_other_rows(db):
+    crud_user.create_many(db, objs_in=[user("bulk-g"), user("bulk-h")])
+    result = crud_user.update_many(db, objs_in=[
+        {"id": "bulk-g", "is_verified": "no"},
+        {"id": "bulk-h", "is_verified": True},
+    ])
+    assert result.ids == ["bulk-h"]
+    assert [position for position, _ in result.errors] == [0]
+    assert db.get(User, "bulk-h").is_verified
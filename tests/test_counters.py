@@ -0,0 +1,30 @@
+"""
+WriteBehindCounter: a failing flush keeps the counts and does not take down
+the task that runs it.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.db.counters import WriteBehindCounter
+from api.models.article import Article
+
+def test_a_failing_final_flush_is_logged(caplog):
+    views = WriteBehindCounter(Article.views)
+    # No articles table there, so every flush fails
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async def scenario() -> None:
+        runner = asyncio.create_task(views.run(engine, 3600))
+        await asyncio.sleep(0)
+        views.hit("counters-a", 2)
+        runner.cancel()
+        # As the app's lifespan sees it: cancelled, not the flush error
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert "Final flush" in caplog.text
+    assert views.pending("counters-a") == 2
@@ -0,0 +1,47 @@
+"""
+Catalog facet counts: committed writes reach the counts, and rebuilds run in
+the background while the previous bitmaps keep answering.
+"""
+import asyncio
+
+from api.db.facets import FacetIndex
+from api.db.session import engine
+from api.models.psychologist import Psychologist
+from api.models.user import User, UserRole
+
+def city_counts(client) -> dict:
+    response = client.get("/api/psychologists/facets?limit=1")
+    assert response.status_code == 200, response.text
+    return {item["value"]: item["count"] for item in response.json()["facets"]["city"]}
+
+def test_counts_follow_committed_writes(client, db):
+    assert "Тестоград" not in city_counts(client)
+    db.add(User(id="facets-u", email="facets@example.com", hashed_password="x", name="facets",
+                role=UserRole.PSYCHOLOGIST))
+    db.add(Psychologist(id="facets-p", user_id="facets-u", location={"city": "Тестоград"}))
+    db.commit()
+    assert city_counts(client)["Тестоград"] == 1
+
+def test_rebuilds_run_in_the_background(catalog):
+    index = FacetIndex(ttl=3600)
+
+    async def scenario() -> None:
+        runner = asyncio.create_task(index.run(engine))
+        try:
+            while index.state is None:
+                await asyncio.sleep(0.01)
+            stale, built_at = index.state, index.built_at
+            index.invalidate()
+            # Served until the new bitmaps are swapped in
+            assert index.state is stale
+            while index.built_at == built_at:
+                await asyncio.sleep(0.01)
+            assert index.state is not stale
+            assert index.state.count() == stale.count()
+            assert index.count().counts["city"] == [
+                (index.labels[key], n) for key, n in stale.count().counts["city"]
+            ]
+        finally:
+            runner.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+"""
+Streaming fixture loads: bad records are reported and skipped, the rest
+is written.
+"""
+import io
+import json
+
+from api.db.loader import load_fixture
+from api.models.user import User
+
+def user_line(id: str) -> str:
+    fields = {"email": f"{id}@example.com", "name": id, "role": "client"}
+    return json.dumps({"model": "api.user", "pk": id, "fields": fields})
+
+def test_a_malformed_ndjson_line_is_reported_and_skipped(db):
+    stream = io.StringIO("\n".join([
+        user_line("loader-1"),
+        '{"model": "api.user", "pk": "loader-2", "fields": {',
+        user_line("loader-3"),
+    ]))
+    errors = []
+    stats = load_fixture(
+        db, stream, ndjson=True, password_hash="x",
+        on_error=lambda section, number, error: errors.append((section, number)),
+    )
+    assert errors == [("ndjson", 2)]
+    assert stats["users"].rows == 2
+    assert stats["ndjson"].errors == 1
+    assert db.get(User, "loader-1") and db.get(User, "loader-3")
+    assert db.get(User, "loader-2") is None
@@ -0,0 +1,27 @@
+"""
+Page sizes of the listing routes: out of range is a 422, and the CRUD pages
+of no rows do not fail.
+"""
+import pytest
+
+from api.crud import crud_psychologist
+from api.crud.base import MAX_PAGE_SIZE
+
+PAGED = [
+    "/api/psychologists/",
+    "/api/psychologists/facets",
+    "/api/institutions/",
+    "/api/articles/",
+    "/api/articles/tags",
+    "/api/reviews/",
+]
+
+@pytest.mark.parametrize("path", PAGED)
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+def test_out_of_range_limits_are_rejected(client, path, limit):
+    response = client.get(f"{path}?limit={limit}")
+    assert response.status_code == 422, response.text
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_get_page_of_no_rows(catalog, db, limit):
+    assert crud_psychologist.get_page(db, limit=limit) == ([], None)
@@ -0,0 +1,44 @@
+"""
+fields= projections of the catalog listings: each item is the full item
+cut down to the requested fields, and the OpenAPI schema lists both shapes.
+"""
+import pytest
+
+from api.main import app
+
+LISTINGS = {
+    "/api/psychologists/": ("Psychologist", "PsychologistCard", "id,rating,user"),
+    "/api/institutions/": ("Institution", "InstitutionCard", "id,address,user"),
+    "/api/articles/": ("ArticleHit", "ArticleCard", "id,title,preview"),
+}
+
+def cut(whole, part):
+    """`whole` reduced to the keys of `part`, nested objects included."""
+    if isinstance(part, dict):
+        return {name: cut(whole[name], value) for name, value in part.items()}
+    return whole
+
+@pytest.mark.parametrize("path", LISTINGS)
+@pytest.mark.parametrize("projected", ["card", "list"])
+def test_projected_items_are_cut_from_the_full_items(client, path, projected):
+    fields = "card" if projected == "card" else LISTINGS[path][2]
+    full = client.get(f"{path}?limit=5").json()
+    items = client.get(f"{path}?limit=5&fields={fields}").json()
+    assert len(items) == len(full) > 0
+    for item, whole in zip(items, full):
+        assert item == cut(whole, item)
+        if projected == "list":
+            assert set(item) == set(fields.split(","))
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_unknown_fields_are_rejected(client, path):
+    response = client.get(f"{path}?fields=id,no_such_field")
+    assert response.status_code == 422
+    assert "no_such_field" in response.json()["detail"]
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_openapi_lists_the_full_and_card_items(path):
+    full, card, _ = LISTINGS[path]
+    schema = app.openapi()["paths"][path]["get"]["responses"]["200"]["content"]
+    shapes = schema["application/json"]["schema"]["anyOf"]
+    assert [shape["items"]["$ref"].rsplit("/", 1)[1] for shape in shapes] == [full, card]
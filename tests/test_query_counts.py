@@ -0,0 +1,33 @@
+"""
+Statements per request of the catalog endpoints. A listing runs the same
+number of statements whatever its page size, a detail page the same for
+every row: a statement per row (an N+1 lazy load) fails the budget.
+"""
+import pytest
+
+from api.db.query_stats import query_budget
+
+LISTINGS = ["/api/psychologists/", "/api/institutions/", "/api/articles/"]
+
+def count(client, url: str) -> int:
+    with query_budget(1000) as stats:
+        response = client.get(url)
+    assert response.status_code == 200, response.text
+    return stats.count
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_listing_statements_do_not_grow_with_the_page(client, path):
+    client.get(f"{path}?limit=2")  # first use of the route and connection
+    small = count(client, f"{path}?limit=2")
+    with query_budget(small, max_repeats=1):
+        response = client.get(f"{path}?limit=20")
+    assert len(response.json()) > 2
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_detail_statements_are_the_same_for_every_row(client, path):
+    first, second = (row["id"] for row in client.get(f"{path}?limit=2").json())
+    client.get(f"{path}{first}")
+    budget = count(client, f"{path}{first}")
+    with query_budget(budget, max_repeats=1):
+        response = client.get(f"{path}{second}")
+    assert response.json()["id"] == second
@@ -0,0 +1,45 @@
+"""
+query_budget() and the per-request statement counts of QueryStatsMiddleware.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from api.core.middleware import QueryStatsMiddleware
+from api.db.query_stats import QueryBudgetExceeded, query_budget
+from api.main import app
+from api.models.user import User
+
+def test_query_budget_passes_within_the_budget(db):
+    with query_budget(2, max_repeats=2) as stats:
+        db.execute(select(User.id).limit(1)).all()
+        db.execute(select(User.id).limit(1)).all()
+    assert stats.count == 2
+
+def test_query_budget_fails_over_the_count(db):
+    with pytest.raises(QueryBudgetExceeded, match="3 statements, budget 2"):
+        with query_budget(2):
+            for _ in range(3):
+                db.execute(select(User.id).limit(1)).all()
+
+def test_query_budget_fails_on_a_repeated_statement(db):
+    with pytest.raises(QueryBudgetExceeded, match="2x \\(budget 1\\)"):
+        with query_budget(10, max_repeats=1):
+            db.execute(select(User.id).where(User.id == "a")).all()
+            db.execute(select(User.id).where(User.id == "b")).all()
+
+def test_query_budget_counts_requests_of_the_test_client(client):
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(0):
+            client.get("/api/psychologists/?limit=5")
+
+def test_middleware_reports_the_statements_of_the_request(catalog):
+    client = TestClient(QueryStatsMiddleware(app, repeat_threshold=2))
+    with query_budget(100) as stats:
+        response = client.get("/api/institutions/?limit=5")
+    assert response.status_code == 200
+    fields = dict(
+        field.split("=") for field in response.headers["x-db-queries"].split("; ")
+    )
+    assert int(fields["count"]) == stats.count > 0
+    assert fields["repeated"] == "0"
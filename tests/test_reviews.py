@@ -0,0 +1,82 @@
+"""
+Deleting a psychologist or a review author deletes their reviews, through
+the ORM and through the bulk CRUD deletes, and keeps the ratings right.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from api.core.security import create_access_token
+from api.crud.crud_psychologist import crud_psychologist
+from api.crud.crud_user import crud_user
+from api.models.psychologist import Psychologist
+from api.models.review import Review
+from api.models.user import User, UserRole
+
+def add_user(db, id: str, role: UserRole) -> User:
+    user = User(id=id, email=f"{id}@example.com", hashed_password="x", name=id, role=role)
+    db.add(user)
+    return user
+
+def add_reviewed_psychologist(db, key: str, ratings) -> Psychologist:
+    add_user(db, f"{key}-u", UserRole.PSYCHOLOGIST)
+    psychologist = Psychologist(id=f"{key}-p", user_id=f"{key}-u", location={"city": "Казань"})
+    db.add(psychologist)
+    for n, rating in enumerate(ratings):
+        add_user(db, f"{key}-c{n}", UserRole.CLIENT)
+        db.flush()
+        db.add(Review(author_id=f"{key}-c{n}", psychologist_id=psychologist.id, rating=rating))
+    db.commit()
+    return psychologist
+
+def reviews_of(db, psychologist_id: str) -> int:
+    return db.scalar(
+        select(func.count()).select_from(Review).where(Review.psychologist_id == psychologist_id)
+    )
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_deleting_a_psychologist_deletes_their_reviews(db, bulk):
+    key = f"del-psychologist-{bulk}"
+    psychologist_id = add_reviewed_psychologist(db, key, [5, 4, 2]).id
+    assert reviews_of(db, psychologist_id) == 3
+    if bulk:
+        result = crud_psychologist.remove_many(db, ids=[psychologist_id])
+        assert not result.errors
+    else:
+        crud_psychologist.remove(db, id=psychologist_id)
+    db.expunge_all()
+    assert db.get(Psychologist, psychologist_id) is None
+    assert reviews_of(db, psychologist_id) == 0
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_deleting_an_author_takes_their_review_out_of_the_rating(db, bulk):
+    key = f"del-author-{bulk}"
+    psychologist = add_reviewed_psychologist(db, key, [5, 1])
+    assert (psychologist.reviews_count, psychologist.rating) == (2, 3.0)
+    if bulk:
+        result = crud_user.remove_many(db, ids=[f"{key}-c1"])
+        assert not result.errors
+    else:
+        crud_user.remove(db, id=f"{key}-c1")
+    db.refresh(psychologist)
+    assert reviews_of(db, psychologist.id) == 1
+    assert (psychologist.reviews_count, psychologist.rating) == (1, 5.0)
+    assert psychologist.rating_histogram == [0, 0, 0, 0, 1]
+
+def test_a_null_rating_is_rejected(client, db):
+    key = "null-rating"
+    psychologist = add_reviewed_psychologist(db, key, [4])
+    review = db.scalars(select(Review).where(Review.psychologist_id == psychologist.id)).one()
+    token = create_access_token({"sub": f"{key}-c0@example.com"})
+    response = client.put(
+        f"/api/reviews/{review.id}",
+        json={"rating": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422, response.text
+    response = client.put(
+        f"/api/reviews/{review.id}",
+        json={"comment": "Обновлено"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["rating"] == 4